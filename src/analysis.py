@@ -0,0 +1,66 @@
+"""Vectorized metrics of a finished simulation (requires NumPy)."""
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+def task_arrays(tasks) -> dict:
+    """Build the per-task arrays (arrival, start, end, cpu, io) in one pass over the tasks."""
+    n = len(tasks)
+    arrival = np.fromiter((t.arrival_time for t in tasks), dtype=np.float64, count=n)
+    end = np.fromiter((t.end_time for t in tasks), dtype=np.float64, count=n)
+    start = np.fromiter((t.arrival_time if t.start_time is None else t.start_time for t in tasks), dtype=np.float64, count=n)
+
+    #bursts of every task, flattened, then summed per task and kind
+    lengths = np.fromiter((len(t.bursts) for t in tasks), dtype=np.int64, count=n)
+    nb_bursts = int(lengths.sum())
+    owner = np.repeat(np.arange(n), lengths)
+    durations = np.fromiter((b[1] for t in tasks for b in t.bursts), dtype=np.float64, count=nb_bursts)
+    is_cpu = np.fromiter((b[0] == "CPU" for t in tasks for b in t.bursts), dtype=bool, count=nb_bursts)
+
+    cpu = np.bincount(owner, weights=np.where(is_cpu, durations, 0.0), minlength=n)
+    io = np.bincount(owner, weights=np.where(is_cpu, 0.0, durations), minlength=n)
+
+    return {"arrival": arrival, "start": start, "end": end, "cpu": cpu, "io": io}
+
+def compute_metrics(arrays: dict) -> dict:
+    """Add the per-task response, turnaround and waiting arrays to task arrays."""
+    turnaround = arrays["end"] - arrays["arrival"]
+    return arrays | {
+        "response": arrays["start"] - arrays["arrival"],
+        "turnaround": turnaround,
+        "waiting": np.maximum(turnaround - (arrays["cpu"] + arrays["io"]), 0.0),
+    }
+
+def aggregate(per_task: dict) -> dict:
+    """Return the averages, tail percentiles and CPU utilization of per-task metrics."""
+    if per_task["end"].size == 0:
+        return {"avg_response": 0.0, "avg_turnaround": 0.0, "avg_waiting": 0.0, "cpu_utilization": 0.0}
+
+    simulation_end_time = per_task["end"].max()
+    summary = {
+        "avg_response": float(per_task["response"].mean()),
+        "avg_turnaround": float(per_task["turnaround"].mean()),
+        "avg_waiting": float(per_task["waiting"].mean()),
+        "cpu_utilization": float(per_task["cpu"].sum() / simulation_end_time * 100) if simulation_end_time > 0 else 0.0,
+    }
+    for name in ("response", "turnaround"):
+        for p, value in zip(PERCENTILES, np.percentile(per_task[name], PERCENTILES)):
+            summary[f"p{p}_{name}"] = float(value)
+    return summary
+
+def summarize(tasks) -> tuple[dict, dict]:
+    """Return (per-task metric arrays, aggregates) of a finished simulation."""
+    per_task = compute_metrics(task_arrays(tasks))
+    return per_task, aggregate(per_task)
+
+def select_rows(per_task: dict, max_rows: int, order: str = "turnaround", sample: bool = False, seed: int = 0) -> np.ndarray:
+    """Return the indices of the rows to show: the max_rows largest `order` values, or a sorted random sample."""
+    n = per_task["end"].size
+    if n <= max_rows:
+        return np.arange(n)
+    if sample:
+        return np.sort(np.random.default_rng(seed).choice(n, size=max_rows, replace=False))
+    values = per_task[order]
+    top = np.argpartition(-values, max_rows - 1)[:max_rows]
+    return top[np.argsort(-values[top], kind="stable")]
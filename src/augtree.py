@@ -0,0 +1,134 @@
+"""Augmented search tree for the EEVDF runqueue of simpleCFS."""
+
+import random
+
+class _Node:
+    __slots__ = ("key", "item", "deadline", "prio", "left", "right", "min_node")
+
+    def __init__(self, key: tuple, item, deadline: float, prio: float):
+        self.key = key
+        self.item = item
+        self.deadline = deadline
+        self.prio = prio
+        self.left = None
+        self.right = None
+        self.min_node = self  # node holding the earliest deadline in this subtree
+
+
+class DeadlineTree:
+    """Treap ordered by (vruntime, seq), augmented with the earliest deadline of each subtree."""
+
+    def __init__(self):
+        self.root = None
+        self.nodes = {}     #item -> node
+        self._rand = random.Random(0)   #fixed seed: tree shape never changes results, keep it reproducible
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, item):
+        return item in self.nodes
+
+    def __iter__(self):
+        """Iterate items in key order."""
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.item
+            node = node.right
+
+    @staticmethod
+    def _update(node: _Node) -> None:
+        """Recompute the augmented field of a node from its children."""
+        best = node
+        for child in (node.left, node.right):
+            if child is not None:
+                cand = child.min_node
+                if (cand.deadline, cand.key) < (best.deadline, best.key):
+                    best = cand
+        node.min_node = best
+
+    def _split(self, node, key):
+        """Split a subtree into (< key, >= key)."""
+        if node is None:
+            return None, None
+        if node.key < key:
+            node.right, right = self._split(node.right, key)
+            self._update(node)
+            return node, right
+        left, node.left = self._split(node.left, key)
+        self._update(node)
+        return left, node
+
+    def _merge(self, left, right):
+        """Merge two subtrees, every key of left being lower than every key of right."""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.prio > right.prio:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+
+    def insert(self, item, key: tuple, deadline: float) -> None:
+        """Insert an item with its ordering key and its virtual deadline."""
+        node = _Node(key, item, deadline, self._rand.random())
+        left, right = self._split(self.root, key)
+        self.root = self._merge(self._merge(left, node), right)
+        self.nodes[item] = node
+
+    def remove(self, item) -> None:
+        """Remove an item from the tree."""
+        node = self.nodes.pop(item)
+        left, right = self._split(self.root, node.key)
+        _, right = self._split_first(right)
+        self.root = self._merge(left, right)
+
+    def _split_first(self, node):
+        """Detach the leftmost node of a subtree, return (leftmost, rest)."""
+        if node is None:
+            return None, None
+        if node.left is None:
+            rest = node.right
+            node.right = None
+            self._update(node)
+            return node, rest
+        first, node.left = self._split_first(node.left)
+        self._update(node)
+        return first, node
+
+    def first(self):
+        """Return the item with the lowest key."""
+        node = self.root
+        if node is None:
+            return None
+        while node.left is not None:
+            node = node.left
+        return node.item
+
+    def earliest_eligible(self, is_eligible):
+        """Return the item with the earliest deadline among the eligible ones.
+
+        Eligibility must be monotonic in key order (a prefix of the tree), which
+        holds for `vruntime <= avg_vruntime`. Runs in O(log n).
+        """
+        node = self.root
+        best = None
+        while node is not None:
+            if is_eligible(node.item):
+                # the node and its whole left subtree are eligible
+                for cand in (node.left.min_node if node.left else None, node):
+                    if cand is not None and (best is None or (cand.deadline, cand.key) < (best.deadline, best.key)):
+                        best = cand
+                node = node.right
+            else:
+                node = node.left
+        return best.item if best is not None else None
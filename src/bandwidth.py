@@ -0,0 +1,45 @@
+"""CPU bandwidth control (quota/period) for simpleCFS."""
+
+import math
+
+DEFAULT_PERIOD = 100.0  #ms, kernel default cfs_period_us
+
+class CFSBandwidth:
+    def __init__(self, quota: float, period: float = DEFAULT_PERIOD):
+        if quota <= 0 or period <= 0:
+            raise ValueError(f"quota and period must be positive, got {quota}/{period}")
+        self.quota = quota
+        self.period = period
+        self.runtime = quota    #runtime left in the current period
+        self.period_start = 0.0 #periods are aligned on t=0
+        self.throttled = False
+        self.throttled_since = 0.0
+        self.throttled_time = 0.0
+        self.nr_throttled = 0   #number of periods the entity got throttled in
+
+    def next_refill(self) -> float:
+        """Return the time of the next runtime refill."""
+        return self.period_start + self.period
+
+    def refresh(self, now: float) -> None:
+        """Refill the runtime if a new period started."""
+        if now >= self.next_refill():
+            self.period_start = math.floor(now / self.period) * self.period
+            if self.period_start + self.period <= now: #float rounding of the division
+                self.period_start += self.period
+            self.runtime = self.quota
+
+    def charge(self, amount: float, now: float) -> bool:
+        """Charge CPU time, return True if the quota of the period is exhausted."""
+        self.runtime -= amount
+        self.refresh(now)
+        return self.runtime <= 0
+
+    def throttle(self, now: float) -> None:
+        self.throttled = True
+        self.throttled_since = now
+        self.nr_throttled += 1
+
+    def unthrottle(self, now: float) -> None:
+        self.throttled = False
+        self.throttled_time += now - self.throttled_since
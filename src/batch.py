@@ -0,0 +1,228 @@
+"""Lockstep simulation of many small CFS workloads at once (requires NumPy)."""
+
+import numpy as np
+
+from . import cfscalc
+from . import fastengine
+from . import simulation
+from . import task
+from . import utils
+
+#task states
+PENDING, READY, RUNNING, IO, DONE = range(5)
+
+WEIGHTS = np.array(task.PRIO_TO_WEIGHT, dtype=np.int64)
+LAST = np.iinfo(np.int64).max  #order key of the tasks out of the queue
+
+def batchable(raw_tasks_data: list, directives: list = []) -> bool:
+    """True if BatchCFSEngine gives the schedule of CFSEngine for this workload."""
+    tasks = utils.build_tasks(raw_tasks_data)
+    return fastengine.supports(tasks, *simulation.make_scheduler(tasks, directives), simulation.renice_events(tasks, directives),
+                               simulation.overhead_model(directives), simulation.dvfs_model(directives))
+
+class BatchCFSEngine:
+    """Default CFS policy run on K workloads in lockstep, task fields as (K, N) arrays.
+
+    Each step handles the next event of every unfinished workload, with the
+    event order, placement and tie-breaking of CFSEngine (the runqueue order
+    is kept as an enqueue counter), so that each workload gets the schedule
+    of its own CFSEngine run. Workloads are padded to N tasks and B bursts.
+    """
+
+    def __init__(self, scenarios: list, params: (None | dict | list) = None):
+        """scenarios are lists of formatted tasks, params CFSCalculator keyword arguments (one dict, or one per scenario)."""
+        k = len(scenarios)
+        if params is None or isinstance(params, dict):
+            params = [params or {}] * k
+        if len(params) != k:
+            raise ValueError(f"{len(params)} parameter sets for {k} scenarios")
+        calculators = [cfscalc.CFSCalculator(**p) for p in params]
+        self.L = np.array([c.L for c in calculators], dtype=np.float64)
+        self.min_granularity = np.array([c.MIN_GRANULARITY for c in calculators], dtype=np.float64)
+        self.nice_0_weight = cfscalc.CFSCalculator.NICE_0_WEIGHT
+
+        #tasks sorted by arrival (stable), as the pending list of CFSEngine
+        scenarios = [sorted(rows, key=lambda data: data[1]) for rows in scenarios]
+        n = max((len(rows) for rows in scenarios), default=0)
+        b = max((len(data[3]) for rows in scenarios for data in rows), default=0)
+        self.ids = [[data[0] for data in rows] for rows in scenarios]
+        self.nb_tasks = np.array([len(rows) for rows in scenarios], dtype=np.int64)
+        self.arrival = np.full((k, n), np.inf)
+        self.weight = np.ones((k, n), dtype=np.int64)
+        self.durations = np.zeros((k, n, b))
+        self.is_cpu = np.zeros((k, n, b), dtype=bool)
+        self.nb_bursts = np.zeros((k, n), dtype=np.int64)
+        for i, rows in enumerate(scenarios):
+            for j, data in enumerate(rows):
+                self.arrival[i, j] = data[1]
+                self.weight[i, j] = WEIGHTS[data[2] + 20]
+                self.nb_bursts[i, j] = len(data[3])
+                for m, (kind, duration) in enumerate(data[3]):
+                    self.durations[i, j, m] = duration
+                    self.is_cpu[i, j, m] = kind == "CPU"
+
+        self.state = np.full((k, n), PENDING, dtype=np.int8)
+        self.vruntime = np.zeros((k, n))
+        self.current_burst = np.zeros((k, n), dtype=np.int64)
+        self.time_left = self.durations[:, :, 0].copy() if b else np.zeros((k, n))
+        self.io_return = np.full((k, n), np.inf)
+        self.order = np.zeros((k, n), dtype=np.int64)  #enqueue counter: runqueue and I/O list order
+        self.rq_key = np.full((k, n), np.inf)   #vruntime of the queued tasks, inf for the others
+        self.exec_time = np.zeros((k, n))
+        self.start_time = np.full((k, n), np.nan)
+        self.end_time = np.zeros((k, n))
+
+        self.next_arrival = np.zeros(k, dtype=np.int64)
+        self.counter = np.zeros(k, dtype=np.int64)
+        self.rq_weight = np.zeros(k, dtype=np.int64)
+        self.current = np.full(k, -1, dtype=np.int64)
+        self.allocated = np.zeros(k)
+        self.stop_time = np.zeros(k)
+        self.time = np.zeros(k)
+        self.nr_steps = 0
+
+    def run(self):
+        k, n = self.arrival.shape
+        rows = np.arange(k)
+        while True:
+            arrival_time = np.where(self.next_arrival < self.nb_tasks,
+                                    self.arrival[rows, np.minimum(self.next_arrival, max(n - 1, 0))] if n else np.inf, np.inf)
+            io_time = self.io_return.min(axis=1) if n else np.full(k, np.inf)
+            cpu_stop_time = np.where(self.current >= 0, self.stop_time, np.inf)
+
+            #same order as the (time, event_type) tuples: ARRIVAL < CPU_STOP < IO_RETURN
+            is_arrival = (arrival_time <= cpu_stop_time) & (arrival_time <= io_time) & (arrival_time < np.inf)
+            is_stop = ~is_arrival & (cpu_stop_time <= io_time) & (cpu_stop_time < np.inf)
+            is_io = ~is_arrival & ~is_stop & (io_time < np.inf)
+            if not (is_arrival | is_stop | is_io).any():
+                break   #every workload is finished
+            self.time = np.where(is_arrival, arrival_time, np.where(is_stop, cpu_stop_time, np.where(is_io, io_time, self.time)))
+            self.nr_steps += 1
+
+            self.handle_arrivals(np.flatnonzero(is_arrival))
+            self.handle_cpu_stops(np.flatnonzero(is_stop))
+            self.handle_io_returns(np.flatnonzero(is_io))
+            self.elect()
+
+    def handle_arrivals(self, rows: np.ndarray):
+        while rows.size:
+            j = self.next_arrival[rows]
+            rows, j = rows[j < self.nb_tasks[rows]], j[j < self.nb_tasks[rows]]
+            arrived = self.arrival[rows, j] <= self.time[rows]
+            rows, j = rows[arrived], j[arrived]
+            self.enqueue(rows, j)
+            self.next_arrival[rows] += 1
+
+    def handle_cpu_stops(self, rows: np.ndarray):
+        j = self.current[rows]
+        allocated = self.allocated[rows]
+        self.current[rows] = -1
+        self.exec_time[rows, j] += allocated
+        self.time_left[rows, j] -= allocated
+        self.vruntime[rows, j] += allocated * (self.nice_0_weight / self.weight[rows, j])
+
+        burst_over = self.time_left[rows, j] <= 0
+        self.enqueue(rows[~burst_over], j[~burst_over])     #time slice over
+        self.next_burst(rows[burst_over], j[burst_over])
+
+    def handle_io_returns(self, rows: np.ndarray):
+        """Return the tasks due at the current time, one per workload and pass, in I/O list order."""
+        while rows.size:
+            due = self.io_return[rows] <= self.time[rows, None]
+            has_due = due.any(axis=1)
+            rows, due = rows[has_due], due[has_due]
+            if not rows.size:
+                break
+            key = np.where(due, self.io_return[rows], np.inf)
+            first = due & (key == key.min(axis=1)[:, None])
+            j = np.where(first, self.order[rows], LAST).argmin(axis=1)
+            self.io_return[rows, j] = np.inf
+            self.next_burst(rows, j)
+
+    def next_burst(self, rows: np.ndarray, j: np.ndarray):
+        """Move tasks whose burst is over to their next burst (runqueue, I/O) or end them."""
+        self.current_burst[rows, j] += 1
+        burst = self.current_burst[rows, j]
+        finished = burst >= self.nb_bursts[rows, j]
+        self.state[rows[finished], j[finished]] = DONE
+        self.end_time[rows[finished], j[finished]] = self.time[rows[finished]]
+
+        rows, j, burst = rows[~finished], j[~finished], burst[~finished]
+        self.time_left[rows, j] = self.durations[rows, j, burst]
+        cpu = self.is_cpu[rows, j, burst]
+        self.enqueue(rows[cpu], j[cpu])
+
+        rows, j = rows[~cpu], j[~cpu]
+        self.io_return[rows, j] = self.time[rows] + self.time_left[rows, j]
+        self.state[rows, j] = IO
+        self.order[rows, j] = self.counter[rows]
+        self.counter[rows] += 1
+
+    def enqueue(self, rows: np.ndarray, j: np.ndarray):
+        """Put one task per workload in its runqueue, no lower than the minimum vruntime."""
+        if not rows.size:
+            return
+        min_vruntime = self.rq_key[rows].min(axis=1)
+        vruntime = self.vruntime[rows, j]
+        vruntime = np.where((min_vruntime > vruntime) & (min_vruntime < np.inf), min_vruntime, vruntime)
+        self.vruntime[rows, j] = vruntime
+        self.rq_key[rows, j] = vruntime
+        self.state[rows, j] = READY
+        self.order[rows, j] = self.counter[rows]
+        self.counter[rows] += 1
+        self.rq_weight[rows] += self.weight[rows, j]
+
+    def elect(self):
+        """Put the first task of minimum vruntime on the CPU of every idle workload."""
+        idle = (self.current < 0) & (self.rq_weight > 0)
+        if not idle.any():
+            return
+        first = self.rq_key == self.rq_key.min(axis=1)[:, None]
+        rows = np.flatnonzero(idle)
+        j = np.where(first, self.order, LAST).argmin(axis=1)[rows]
+        self.rq_key[rows, j] = np.inf
+
+        weight = self.weight[rows, j]
+        self.rq_weight[rows] -= weight
+        self.state[rows, j] = RUNNING
+        self.current[rows] = j
+        now = self.time[rows]
+        self.start_time[rows, j] = np.where(np.isnan(self.start_time[rows, j]), now, self.start_time[rows, j])
+        time_slice = np.maximum(self.L[rows] * (weight / (self.rq_weight[rows] + weight)), self.min_granularity[rows])
+        self.allocated[rows] = np.minimum(time_slice, self.time_left[rows, j])
+        self.stop_time[rows] = now + self.allocated[rows]
+
+    def task_arrays(self) -> dict:
+        """Return the (K, N) arrival, start, end, cpu and io arrays, NaN for padding."""
+        padding = np.arange(self.arrival.shape[1]) >= self.nb_tasks[:, None]
+        bursts = np.arange(self.durations.shape[2]) < self.nb_bursts[:, :, None]
+        arrays = {
+            "arrival": self.arrival,
+            "start": np.where(np.isnan(self.start_time), self.arrival, self.start_time),
+            "end": self.end_time,
+            "cpu": np.where(self.is_cpu & bursts, self.durations, 0.0).sum(axis=2),
+            "io": np.where(~self.is_cpu & bursts, self.durations, 0.0).sum(axis=2),
+        }
+        return {name: np.where(padding, np.nan, values) for name, values in arrays.items()}
+
+    def summaries(self) -> dict:
+        """Return the metrics.summarize() values of every workload as (K,) arrays."""
+        a = self.task_arrays()
+        turnaround = a["end"] - a["arrival"]
+        waiting = np.maximum(turnaround - (a["cpu"] + a["io"]), 0.0)
+        n = np.maximum(self.nb_tasks, 1)
+        simulation_end_time = np.where(np.isnan(a["end"]), -np.inf, a["end"]).max(axis=1, initial=-np.inf)
+        total_cpu = np.nansum(a["cpu"], axis=1)
+        return {
+            "avg_response": np.nansum(a["start"] - a["arrival"], axis=1) / n,
+            "avg_turnaround": np.nansum(turnaround, axis=1) / n,
+            "avg_waiting": np.nansum(waiting, axis=1) / n,
+            "cpu_utilization": np.divide(total_cpu * 100, simulation_end_time, out=np.zeros_like(total_cpu), where=simulation_end_time > 0),
+        }
+
+def simulate_batch(scenarios: list, params: (None | dict | list) = None) -> list[dict]:
+    """Run workloads in lockstep and return their metrics.summarize() dicts, in order."""
+    engine = BatchCFSEngine(scenarios, params)
+    engine.run()
+    summaries = engine.summaries()
+    return [{name: float(values[i]) for name, values in summaries.items()} for i in range(len(scenarios))]
@@ -0,0 +1,199 @@
+"""On-disk caches: simulation results keyed by their content, parsed task files keyed by their source."""
+
+import contextlib
+import gc
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+from . import task
+from . import utils
+
+ENGINE_VERSION = 4  #bump when the same workload and parameters can give another schedule, or the pickled engine state changes
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+WORKLOAD_FORMAT = 1 #bump when utils.parse_lines() gives other rows for the same text
+WORKLOAD_MAGIC = b"SCFSWL"
+
+def default_dir() -> str:
+    """Return $SCFS_CACHE_DIR, or scfs in the user cache directory."""
+    if "SCFS_CACHE_DIR" in os.environ:
+        return os.environ["SCFS_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "scfs")
+
+def cache_key(raw_tasks_data: list, directives: list, logic, rqueue=None) -> str:
+    """Return the sha256 of the normalized workload, the calculator parameters, the nice table and the engine version."""
+    placement = getattr(rqueue, "placement", "default")
+    content = {
+        "version": ENGINE_VERSION,
+        "tasks": [[d[0], d[1], d[2], [list(b) for b in d[3]], sorted((d[4] if len(d) > 4 else {}).items())] for d in raw_tasks_data],
+        "directives": [[name, fields, sorted(options.items())] for name, fields, options in directives],
+        "calculator": [type(logic).__name__, logic.L, logic.MIN_GRANULARITY, logic.NICE_0_WEIGHT],
+        "weights": task.PRIO_TO_WEIGHT,
+    }
+    if placement != "default":
+        content["placement"] = placement
+    return hashlib.sha256(json.dumps(content, separators=(",", ":")).encode()).hexdigest()
+
+def bandwidths(tasks: list, rqueue) -> list:
+    """Return the CFSBandwidth of the tasks, then of the groups, in a stable order."""
+    result = [t.bandwidth for t in tasks if t.bandwidth is not None]
+    groups = getattr(rqueue, "groups", {})
+    result += [g.bandwidth for _, g in sorted(groups.items()) if g.bandwidth is not None]
+    return result
+
+def snapshot(tasks: list, rqueue, sim_logger=None, switch_overhead=None, cpufreq=None) -> dict:
+    """Return the results of a finished simulation, with its Gantt trace and events if a logger is given."""
+    entry = {
+        "tasks": [[t.start_time, t.end_time, t.exec_time, t.vruntime] for t in tasks],
+        "bandwidth": [[bw.nr_throttled, bw.throttled_time] for bw in bandwidths(tasks, rqueue)],
+    }
+    if switch_overhead is not None:
+        entry["overhead"] = [switch_overhead.nr_switches, switch_overhead.switch_time, switch_overhead.refill_time]
+    if cpufreq is not None:
+        entry["dvfs"] = [cpufreq.energy, cpufreq.busy_time, cpufreq.freq_time, cpufreq.last_update, cpufreq.nr_changes]
+    if sim_logger is not None:
+        entry["gantt"] = sim_logger.gantt_data
+        entry["events"] = sim_logger.history
+    return entry
+
+def restore(entry: dict, tasks: list, rqueue, sim_logger=None, switch_overhead=None, cpufreq=None) -> None:
+    """Put cached results back on the tasks (and the logger), as if the simulation ran."""
+    for t, (start_time, end_time, exec_time, vruntime) in zip(tasks, entry["tasks"]):
+        t.start_time, t.end_time, t.exec_time, t.vruntime = start_time, end_time, exec_time, vruntime
+    for bw, (nr_throttled, throttled_time) in zip(bandwidths(tasks, rqueue), entry["bandwidth"]):
+        bw.nr_throttled, bw.throttled_time = nr_throttled, throttled_time
+    if switch_overhead is not None and "overhead" in entry:
+        switch_overhead.nr_switches, switch_overhead.switch_time, switch_overhead.refill_time = entry["overhead"]
+    if cpufreq is not None and "dvfs" in entry:
+        cpufreq.energy, cpufreq.busy_time, cpufreq.freq_time, cpufreq.last_update, cpufreq.nr_changes = entry["dvfs"]
+    if sim_logger is not None:
+        sim_logger.gantt_data = [tuple(g) for g in entry.get("gantt", [])]
+        sim_logger.history = list(entry.get("events", []))
+
+class ResultCache:
+    """Directory of <key>.json entries, least recently used ones evicted above max_bytes."""
+
+    def __init__(self, directory: (None | str) = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory if directory is not None else default_dir()
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> (None | dict):
+        """Return the entry of a key, None on a miss or an unreadable entry."""
+        path = self.path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)  #mark as recently used
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store an entry (atomically), then evict the oldest ones above max_bytes.
+
+        The cache is best effort: nothing is stored if the directory cannot be written.
+        """
+        tmp_path = f"{self.path(key)}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(".json"):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue    #removed by another process
+                        entries.append((st.st_mtime, st.st_size, e.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass    #removed by another process
+            total -= size
+
+    def clear(self) -> None:
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+
+@contextlib.contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector while building many containers (no cycles created)."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def workload_stamp(filename: str) -> tuple:
+    """Return what a parsed copy of a task file depends on: path, mtime, size and format versions."""
+    st = os.stat(filename)
+    return (os.path.abspath(filename), st.st_mtime_ns, st.st_size, WORKLOAD_FORMAT, sys.implementation.cache_tag)
+
+def workload_path(directory: str, filename: str) -> str:
+    return os.path.join(directory, "workloads", hashlib.sha256(os.path.abspath(filename).encode()).hexdigest() + ".bin")
+
+def read_workload(filename: str, directory: (None | str) = None) -> tuple[list, list]:
+    """utils.read_workload() through a parsed copy of the file, kept in <cache dir>/workloads.
+
+    The copy is `WORKLOAD_MAGIC`, the length of the marshalled stamp, the stamp,
+    then the marshalled (tasks, directives); it is read in one go and parsed
+    again when the source file changed. A copy that cannot be written is skipped.
+    """
+    directory = directory if directory is not None else default_dir()
+    stamp = workload_stamp(filename)
+    path = workload_path(directory, filename)
+    try:
+        with open(path, "rb") as f:
+            data = memoryview(f.read())
+        header = len(WORKLOAD_MAGIC) + 4
+        if data[:len(WORKLOAD_MAGIC)] == WORKLOAD_MAGIC:
+            stamp_end = header + int.from_bytes(data[len(WORKLOAD_MAGIC):header], "little")
+            if marshal.loads(data[header:stamp_end]) == stamp:
+                with paused_gc():
+                    raw_tasks_data, directives = marshal.loads(data[stamp_end:])
+                return raw_tasks_data, directives
+    except (OSError, ValueError, EOFError, TypeError):
+        pass    #missing or unreadable copy: parse the file
+
+    with paused_gc():
+        raw_tasks_data, directives = utils.read_workload(filename)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        encoded_stamp = marshal.dumps(stamp)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(WORKLOAD_MAGIC + len(encoded_stamp).to_bytes(4, "little") + encoded_stamp)
+            f.write(marshal.dumps((raw_tasks_data, directives)))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return raw_tasks_data, directives
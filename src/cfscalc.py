@@ -1,5 +1,6 @@
 """Logic part for simpleCFS."""
 
+from . import group
 from . import runqueue
 from . import task
 
@@ -8,6 +9,17 @@ class CFSCalculator:
     MIN_GRANULARITY = 0.75  # minimal granularity
     NICE_0_WEIGHT = 1024
 
+    def __init__(self, L: (None | float) = None, min_granularity: (None | float) = None):
+        """Override the scheduler latency and the minimal granularity (ms) of this calculator."""
+        if L is not None:
+            if L <= 0:
+                raise ValueError(f"L must be positive, got {L}")
+            self.L = L
+        if min_granularity is not None:
+            if min_granularity <= 0:
+                raise ValueError(f"min_granularity must be positive, got {min_granularity}")
+            self.MIN_GRANULARITY = min_granularity
+
     def calc_cur_time_slice(self, rqueue: runqueue.Runqueue, task: task.Task) -> float:
         """Calculate the time slice for a task."""
 
@@ -31,3 +43,64 @@ class CFSCalculator:
         
         weight_factor = self.NICE_0_WEIGHT / current_task.get_task_weight()
         current_task.vruntime += actual_duration * weight_factor
+
+    def reweight_current(self, current_task: task.Task, elapsed: float, nice: int) -> float:
+        """Renice the running task, `elapsed` ms of its allocated time being charged at the old weight.
+
+        update_vruntime() charges the whole allocation at the end of the slice
+        with the new weight: the difference for the elapsed part is added now.
+        Return the vruntime added.
+        """
+        old_factor = self.NICE_0_WEIGHT / current_task.get_task_weight()
+        current_task.nice = nice
+        delta = elapsed * (old_factor - self.NICE_0_WEIGHT / current_task.get_task_weight())
+        current_task.vruntime += delta
+        return delta
+
+
+class EEVDFCalculator(CFSCalculator):
+    """Time slices and vruntime accounting for the EEVDF mode."""
+
+    def calc_cur_time_slice(self, rqueue: runqueue.EEVDFRunqueue, task: task.Task) -> float:
+        """Return the slice requested by the task (base slice by default)."""
+
+        if task.slice is not None:
+            return task.slice
+        return self.MIN_GRANULARITY
+
+    def update_vruntime(self, current_task: task.Task, actual_duration: float) -> None:
+        """Update the vruntime, the running task consuming its lag."""
+
+        old_vruntime = current_task.vruntime
+        super().update_vruntime(current_task, actual_duration)
+        current_task.vlag -= current_task.vruntime - old_vruntime
+
+    def reweight_current(self, current_task: task.Task, elapsed: float, nice: int) -> float:
+        """Renice the running task, its lag following the vruntime correction."""
+
+        delta = super().reweight_current(current_task, elapsed, nice)
+        current_task.vlag -= delta
+        return delta
+
+
+class GroupCalculator(CFSCalculator):
+    """Time slices and vruntime accounting through a group hierarchy."""
+
+    def calc_cur_time_slice(self, rqueue: group.GroupRunqueue, task: task.Task) -> float:
+        """Calculate the time slice as the product of the entity shares at each level."""
+
+        slice_val = self.L
+        entity = task
+        for grp in task.sched_group.ancestors():
+            entity_weight = entity.get_task_weight()
+            slice_val *= entity_weight / (grp.load + entity_weight)  #running entities are not queued
+            entity = grp
+        return max(slice_val, self.MIN_GRANULARITY)
+
+    def update_vruntime(self, current_task: task.Task, actual_duration: float) -> None:
+        """Update the vruntime of the task and of its group entities."""
+
+        super().update_vruntime(current_task, actual_duration)
+        for grp in current_task.sched_group.ancestors():
+            if grp.parent is not None:
+                grp.vruntime += actual_duration * self.NICE_0_WEIGHT / grp.get_task_weight()
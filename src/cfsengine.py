@@ -1,149 +1,333 @@
 """simpleCFS Engine."""
 
+import bisect
+import copy
 from . import runqueue
 from . import task
 from . import logger
 from . import cfscalc
+from . import dvfs
+from . import overhead
+
+class Checkpoint:
+    """Copy of an engine state once every event before `horizon` is processed.
+
+    Tasks not arrived yet are not part of it, `tasks` are (key, task) pairs
+    copied along with the state, `nr_events`/`nr_gantt` the logger lengths.
+    """
+
+    def __init__(self, horizon: float, state: dict, tasks: list, nr_events: int, nr_gantt: int):
+        self.horizon = horizon
+        self.state = state
+        self.tasks = tasks
+        self.nr_events = nr_events
+        self.nr_gantt = nr_gantt
 
 class CFSEngine:
-    def __init__(self, logger: logger.CFSLogger, tasks:list[task.Task]=[]):
-        self.rqueue = runqueue.Runqueue()
+    def __init__(self, logger: logger.CFSLogger, tasks:list[task.Task]=[], rqueue=None, logic=None, renices: list = [],
+                 switch_overhead: (None | overhead.SwitchOverhead) = None, cpufreq: (None | dvfs.DVFS) = None):
+        self.rqueue = rqueue if rqueue is not None else runqueue.Runqueue()
         self.pending_tasks = sorted(tasks, key=lambda t: t.arrival_time)    #sort by arrival time
+        self.renices = sorted(renices, key=lambda r: r[0])  #(time, task, nice), applied after the other events of their time
         self.waiting_for_io = []    #tasks in I/O with format (return_time, task)
+        self.throttled = []     #entities out of quota with format (bandwidth, task or group)
         self.current_task = None
         self.time = 0.0
         self.logger = logger
-        self.logic = cfscalc.CFSCalculator()
+        self.logic = logic if logic is not None else cfscalc.CFSCalculator()
+        self.overhead = switch_overhead    #None: switches are free
+        self.cpufreq = cpufreq  #None: fixed frequency, bursts progress at 1 ms per ms
         #for time update in new scheduler events
         self.allocated_cpu_time = 0.0 
+        self.allocated_work = 0.0   #burst progress of the allocated time
         self.cpu_stop_time = 0.0
 
     def run(self):
-        self.logger.log_event(self.time, "START", message="CFS start")        
-
-        while self.pending_tasks or (len(self.rqueue) > 0) or self.waiting_for_io or self.current_task:
-
-            #next scheduler event
-            next_event_candidates = []
-
-            if self.pending_tasks:
-                next_event_candidates.append((self.pending_tasks[0].arrival_time,"ARRIVAL"))
+        self.start()
+        self.run_until(float("inf"))
 
-            if self.waiting_for_io:
-                next_event_candidates.append((min(self.waiting_for_io)[0], "IO_RETURN"))
+    def start(self):
+        self.logger.log_event(self.time, "START", message="CFS start")        
 
+    def add_task(self, new_task: task.Task):
+        """Add a task not arrived yet, during the simulation (live ingestion)."""
+        bisect.insort(self.pending_tasks, new_task, key=lambda t: t.arrival_time)
+
+    def checkpoint(self, horizon: float, tasks: list = []) -> Checkpoint:
+        """Copy the state of the engine (pending tasks excepted) and the given (key, task) pairs."""
+        state = {k: v for k, v in vars(self).items() if k not in ("logger", "pending_tasks")}
+        state, tasks = copy.deepcopy((state, tasks))
+        return Checkpoint(horizon, state, tasks, len(self.logger.history), len(self.logger.gantt_data))
+
+    def restore(self, checkpoint: Checkpoint, pending_tasks: list[task.Task]) -> list:
+        """Go back to a checkpoint with the tasks arriving after it, return a copy of its (key, task) pairs."""
+        state, tasks = copy.deepcopy((checkpoint.state, checkpoint.tasks))
+        vars(self).update(state)
+        self.pending_tasks = sorted(pending_tasks, key=lambda t: t.arrival_time)
+        return tasks
+
+    def is_active(self):
+        return self.pending_tasks or (len(self.rqueue) > 0) or self.waiting_for_io or self.current_task or self.throttled
+
+    def next_event(self):
+        """Return the next scheduler event as (time, event_type), None at the end of the simulation."""
+        next_event_candidates = []
+
+        if self.pending_tasks:
+            next_event_candidates.append((self.pending_tasks[0].arrival_time,"ARRIVAL"))
+
+        if self.waiting_for_io:
+            next_event_candidates.append((min(io[0] for io in self.waiting_for_io), "IO_RETURN"))
+
+        if self.current_task is not None:
+            next_event_candidates.append((self.cpu_stop_time, "CPU_STOP"))
+
+        if self.throttled:
+            next_event_candidates.append((min(bw.next_refill() for bw, _ in self.throttled), "REFILL"))
+
+        if self.renices:
+            next_event_candidates.append((self.renices[0][0], "RENICE"))
+
+        if not next_event_candidates:
+            return None #end of the simulation
+
+        return min(next_event_candidates)
+
+    def run_until(self, limit: float):
+        """Process the events happening strictly before `limit`, return the next one (None at the end)."""
+        while self.is_active():
+            next_event = self.next_event()
+            if next_event is None or next_event[0] >= limit:
+                return next_event
+            self.handle_event(next_event)
+        return None
+
+    def handle_event(self, next_event: tuple):
+        self.time = next_event[0]
+        event_type = next_event[1]
+
+        if event_type == "ARRIVAL":
+            arrived = bisect.bisect_right(self.pending_tasks, self.time, key=lambda t: t.arrival_time)
+            new_tasks = self.pending_tasks[:arrived]
+            del self.pending_tasks[:arrived]
+            self.enqueue_tasks(new_tasks, runqueue.ENQUEUE_INITIAL)
+            self.logger.log_batch(self.time, [("ARRIVAL", new_task) for new_task in new_tasks])
+
+        elif event_type == "IO_RETURN":
+            self.waiting_for_io.sort(key=lambda io: io[0])    #ties keep their I/O start order
+            returned = bisect.bisect_right(self.waiting_for_io, self.time, key=lambda io: io[0])
+            ios = self.waiting_for_io[:returned]
+            del self.waiting_for_io[:returned]
+            events = []
+            woken = []
+            for io in ios:
+                new_task = io[1]
+                new_task.current_burst += 1
+                if new_task.current_burst >= len(new_task.bursts):
+                    #task finished
+                    new_task.end_time = self.time
+                    events.append(("TASK_END", new_task))
+
+                else:
+                    #task having another burst
+                    new_cur_burst = new_task.bursts[new_task.current_burst]
+
+                    if new_cur_burst[0] == "CPU":
+                        #return to runqueue, with the other tasks waking up now
+                        new_task.time_left_cur_burst = new_cur_burst[1]
+                        woken.append(new_task)
+                        events.append(("RETURN_FROM_IO", new_task))
+
+                    elif new_cur_burst[0] == "IO":
+                        #go to I/O queue
+                        return_time = self.time + new_cur_burst[1]
+                        new_task.time_left_cur_burst = new_cur_burst[1]
+                        self.start_io(new_task, return_time)
+                        events.append(("NEW_IO_BURST", new_task))
+            self.enqueue_tasks(woken, runqueue.ENQUEUE_WAKEUP)
+            self.logger.log_batch(self.time, events)
+
+        elif event_type == "CPU_STOP":
             if self.current_task is not None:
-                next_event_candidates.append((self.cpu_stop_time, "CPU_STOP"))
-
-            if not next_event_candidates:
-                break #end of the simulation
-
-            next_event = min(next_event_candidates)
-    
-            self.time = next_event[0]
-            event_type = next_event[1]
-
-            if event_type == "ARRIVAL":
-                while self.pending_tasks and self.pending_tasks[0].arrival_time <= self.time:
-                    new_task = self.pending_tasks.pop(0)
-                    self.rqueue.add_task(new_task)
-                    self.logger.log_event(self.time, "ARRIVAL", new_task)
-
-            elif event_type == "IO_RETURN":
-                self.waiting_for_io = sorted(self.waiting_for_io)
-                while self.waiting_for_io and self.waiting_for_io[0][0] <= self.time:
-                    new_task = self.waiting_for_io.pop(0)[1]
-                    new_task.current_burst += 1
-                    if new_task.current_burst >= len(new_task.bursts):
+                self.current_task.exec_time += self.allocated_cpu_time
+                self.current_task.time_left_cur_burst -= self.allocated_work
+                self.logic.update_vruntime(self.current_task, self.allocated_cpu_time)
+                task_throttled = self.charge_bandwidth(self.current_task, self.allocated_cpu_time)
+
+                #for gantt chart
+                start_t = self.time - self.allocated_cpu_time
+                self.logger.record_gantt_entry(self.current_task.id, start_t, self.time)
+                if self.overhead is not None:
+                    self.overhead.ran(self.current_task.id, self.time)
+                if self.cpufreq is not None:
+                    self.cpufreq.update(self.time, False)
+
+                if self.current_task.time_left_cur_burst <= 0:
+                    #if the burst is finished
+                    self.current_task.current_burst += 1
+
+                    if self.current_task.current_burst >= len(self.current_task.bursts):
                         #task finished
-                        new_task.end_time = self.time
-                        self.logger.log_event(self.time, "TASK_END", new_task)
+                        self.current_task.end_time = self.time
+                        self.logger.log_event(self.time, "TASK_END", self.current_task)
 
                     else:
                         #task having another burst
-                        new_cur_burst = new_task.bursts[new_task.current_burst]
+                        new_cur_burst = self.current_task.bursts[self.current_task.current_burst]
 
                         if new_cur_burst[0] == "CPU":
                             #return to runqueue
-                            new_task.time_left_cur_burst = new_cur_burst[1]
-                            self.rqueue.add_task(new_task)
-                            self.logger.log_event(self.time, "RETURN_FROM_IO", new_task)
+                            self.current_task.time_left_cur_burst = new_cur_burst[1] 
+                            self.enqueue_task(self.current_task, task_throttled)
+                            self.logger.log_event(self.time, "NEW_CPU_BURST", self.current_task)
 
                         elif new_cur_burst[0] == "IO":
                             #go to I/O queue
                             return_time = self.time + new_cur_burst[1]
-                            new_task.time_left_cur_burst = new_cur_burst[1]
-                            self.waiting_for_io.append((return_time, new_task))
-                            self.logger.log_event(self.time, "NEW_IO_BURST", new_task)
-                
-
-            elif event_type == "CPU_STOP":
-                if self.current_task is not None:
-                    self.current_task.exec_time += self.allocated_cpu_time
-                    self.current_task.time_left_cur_burst -= self.allocated_cpu_time
-                    self.logic.update_vruntime(self.current_task, self.allocated_cpu_time)
+                            self.current_task.time_left_cur_burst = new_cur_burst[1]
+                            if isinstance(self.rqueue, runqueue.Runqueue):
+                                self.rqueue.put_to_sleep(self.current_task)
+                            self.start_io(self.current_task, return_time)
+                            self.logger.log_event(self.time, "NEW_IO_BURST", self.current_task)
 
-                    #for gantt chart
-                    start_t = self.time - self.allocated_cpu_time
-                    self.logger.record_gantt_entry(self.current_task.id, start_t, self.time)
+                            
 
-                    if self.current_task.time_left_cur_burst <= 0:
-                        #if the burst is finished
-                        self.current_task.current_burst += 1
+                else:
+                    #time slice finished but not burst
+                    self.enqueue_task(self.current_task, task_throttled)
+                    self.logger.log_event(self.time, "TIME_SLICE_OVER", self.current_task)
 
-                        if self.current_task.current_burst >= len(self.current_task.bursts):
-                            #task finished
-                            self.current_task.end_time = self.time
-                            self.logger.log_event(self.time, "TASK_END", self.current_task)
+                self.current_task = None
 
-                        else:
-                            #task having another burst
-                            new_cur_burst = self.current_task.bursts[self.current_task.current_burst]
+        elif event_type == "REFILL":
+            self.refill_bandwidth()
 
-                            if new_cur_burst[0] == "CPU":
-                                #return to runqueue
-                                self.current_task.time_left_cur_burst = new_cur_burst[1] 
-                                self.rqueue.add_task(self.current_task)
-                                self.logger.log_event(self.time, "NEW_CPU_BURST", self.current_task)
+        elif event_type == "RENICE":
+            while self.renices and self.renices[0][0] <= self.time:
+                _, reniced_task, nice = self.renices.pop(0)
+                old_nice = reniced_task.nice
+                self.renice_task(reniced_task, nice)
+                self.logger.log_event(self.time, "RENICE", reniced_task, message=f"nice {old_nice} -> {nice}")
 
-                            elif new_cur_burst[0] == "IO":
-                                #go to I/O queue
-                                return_time = self.time + new_cur_burst[1]
-                                self.current_task.time_left_cur_burst = new_cur_burst[1]
-                                self.waiting_for_io.append((return_time, self.current_task))
-                                self.logger.log_event(self.time, "NEW_IO_BURST", self.current_task)
-
-                                
-
-                    else:
-                        #time slice finished but not burst
-                        self.rqueue.add_task(self.current_task)
-                        self.logger.log_event(self.time, "TIME_SLICE_OVER", self.current_task)
 
-                    self.current_task = None
-
-
-            if self.current_task is None:
-                # election of the new task on CPU
-                next_task = self.rqueue.pick_next_task()
+        if self.current_task is None:
+            # election of the new task on CPU
+            next_task = self.rqueue.pick_next_task()
+            
+            if next_task:
+                self.current_task = next_task
                 
-                if next_task:
-                    self.current_task = next_task
-                    
-                    #for metrics
-                    if self.current_task.start_time is None:
-                        self.current_task.start_time = self.time
-                    
-                    cur_task_time_slice = self.logic.calc_cur_time_slice(self.rqueue, self.current_task)
-                    self.allocated_cpu_time = min(cur_task_time_slice, self.current_task.time_left_cur_burst)
-                    self.cpu_stop_time = self.time + self.allocated_cpu_time
-
+                #for metrics
+                if self.current_task.start_time is None:
+                    self.current_task.start_time = self.time
                 
-            
-
-
-            
-            
-
-
-
+                cur_task_time_slice = self.logic.calc_cur_time_slice(self.rqueue, self.current_task)
+                #at a lower frequency the rest of the burst takes longer; the frequency is kept for the whole slice
+                speed = self.cpufreq.select(self.time) if self.cpufreq is not None else 1.0
+                burst_time = self.current_task.time_left_cur_burst / speed
+                self.allocated_cpu_time = min(cur_task_time_slice, burst_time, self.runtime_left(self.current_task))
+                self.allocated_work = self.current_task.time_left_cur_burst if self.allocated_cpu_time == burst_time else self.allocated_cpu_time * speed
+                #the switch overhead is spent on the CPU before the slice, charged to no task
+                switch_cost = self.overhead.cost(self.current_task.id, self.time) if self.overhead is not None else 0.0
+                if switch_cost > 0:
+                    self.logger.record_gantt_entry(overhead.LANE, self.time, self.time + switch_cost)
+                self.cpu_stop_time = self.time + switch_cost + self.allocated_cpu_time
+
+    def start_io(self, task: task.Task, return_time: float):
+        """Put a task in the I/O queue until `return_time`."""
+        self.waiting_for_io.append((return_time, task))
+
+    def renice_task(self, task: task.Task, nice: int):
+        """Change the nice value of a task wherever it is.
+
+        The running task keeps its allocated time, the part already run being
+        charged at the old weight (none of it during a switch overhead); a
+        queued task is moved by its runqueue.
+        """
+        if task is self.current_task:
+            elapsed = max(0.0, self.time - (self.cpu_stop_time - self.allocated_cpu_time))
+            self.logic.reweight_current(task, elapsed, nice)
+        else:
+            self.rqueue.reweight_task(task, nice)
+
+    def bandwidth_owners(self, task: task.Task):
+        """Yield (bandwidth, owner) for the task and its groups having a quota."""
+        if task.bandwidth is not None:
+            yield task.bandwidth, task
+        if task.sched_group is not None:
+            for grp in task.sched_group.ancestors():
+                if grp.bandwidth is not None:
+                    yield grp.bandwidth, grp
+
+    def runtime_left(self, task: task.Task) -> float:
+        """Return the CPU time the task can use before hitting a quota."""
+        runtime = float("inf")
+        for bw, _ in self.bandwidth_owners(task):
+            bw.refresh(self.time)
+            runtime = min(runtime, bw.runtime)
+        return runtime
+
+    def charge_bandwidth(self, task: task.Task, amount: float) -> bool:
+        """Charge the quotas of a task, return True if the task itself is out of quota.
+
+        A group out of quota is throttled now if it still has runnable tasks,
+        otherwise when one of its tasks is enqueued again.
+        """
+        task_throttled = False
+        for bw, owner in self.bandwidth_owners(task):
+            if bw.charge(amount, self.time):
+                if owner is task:
+                    task_throttled = True
+                elif owner.nr_running > 0:
+                    self.throttle_group(bw, owner)
+        return task_throttled
+
+    def throttle_group(self, bw, grp):
+        bw.throttle(self.time)
+        self.throttled.append((bw, grp))
+        self.rqueue.throttle_group(grp)
+        self.logger.log_event(self.time, "THROTTLED", message=f"group {grp.path}")
+
+    def enqueue_task(self, task: task.Task, throttled: bool = False, flags: int = 0):
+        """Add a task to the runqueue (with placement flags), or hold it until its quota is refilled."""
+        for bw, owner in self.bandwidth_owners(task):
+            if owner is task:
+                if not throttled:
+                    bw.refresh(self.time)
+                    throttled = bw.runtime <= 0
+            elif not bw.throttled:
+                bw.refresh(self.time)
+                if bw.runtime <= 0:
+                    self.throttle_group(bw, owner)
+
+        if throttled:
+            task.bandwidth.throttle(self.time)
+            self.throttled.append((task.bandwidth, task))
+            self.logger.log_event(self.time, "THROTTLED", task)
+        else:
+            self.rqueue.add_task(task, flags)
+
+    def enqueue_tasks(self, tasks: list, flags: int = 0):
+        """Add tasks becoming runnable at the same time, in one runqueue operation when none has a quota."""
+        if any(True for t in tasks for _ in self.bandwidth_owners(t)):
+            for t in tasks:
+                self.enqueue_task(t, flags=flags)
+        else:
+            self.rqueue.add_tasks(tasks, flags)
+
+    def refill_bandwidth(self):
+        """Refill the quotas whose period ended and release the throttled entities."""
+        still_throttled = []
+        for bw, owner in self.throttled:
+            if bw.next_refill() > self.time:
+                still_throttled.append((bw, owner))
+                continue
+            bw.refresh(self.time)
+            bw.unthrottle(self.time)
+            if isinstance(owner, task.Task):
+                self.logger.log_event(self.time, "UNTHROTTLE", owner)
+                self.rqueue.add_task(owner)
+            else:
+                self.logger.log_event(self.time, "UNTHROTTLE", message=f"group {owner.path}")
+                self.rqueue.unthrottle_group(owner)
+        self.throttled = still_throttled
@@ -0,0 +1,77 @@
+"""CPU frequency scaling (DVFS) and energy accounting for simpleCFS."""
+
+import bisect
+
+#(frequency in MHz, active power in W) operating points of a small core
+DEFAULT_OPPS = [(800, 0.25), (1200, 0.45), (1600, 0.75), (2000, 1.2), (2400, 1.8)]
+DEFAULT_IDLE_POWER = 0.05   #W
+GOVERNORS = ("performance", "powersave", "schedutil")
+UTIL_HALF_LIFE = 32.0   #ms, PELT half-life
+HEADROOM = 1.25     #schedutil asks for 25% more than the utilization
+
+class DVFS:
+    """Frequency of the CPU, chosen by a governor, and the energy it uses.
+
+    CPU bursts are given in ms at the highest frequency: at frequency f a task
+    progresses f / f_max ms of its burst per ms. The governor picks the
+    frequency of each slice when it starts: the highest or lowest operating
+    point, or for schedutil the lowest one above HEADROOM x the utilization,
+    a frequency-invariant average of the busy time decaying with a
+    UTIL_HALF_LIFE half-life. Energy is in mJ (W x ms).
+    """
+
+    def __init__(self, governor: str = "schedutil", opps: (None | list) = None, idle_power: float = DEFAULT_IDLE_POWER):
+        if governor not in GOVERNORS:
+            raise ValueError(f"unknown governor {governor}, expected one of {', '.join(GOVERNORS)}")
+        opps = sorted(opps if opps else DEFAULT_OPPS)
+        if any(freq <= 0 or power < 0 for freq, power in opps) or idle_power < 0:
+            raise ValueError(f"frequencies must be positive and powers not negative, got {opps} / {idle_power}")
+        self.governor = governor
+        self.freqs = [freq for freq, _ in opps]
+        self.powers = [power for _, power in opps]
+        self.idle_power = idle_power
+        self.max_freq = self.freqs[-1]
+        self.level = len(self.freqs) - 1 if governor == "performance" else 0
+        self.busy = False
+        self.last_update = 0.0
+        self.util = 0.0     #0..1, in capacity at the highest frequency
+        self.energy = 0.0
+        self.busy_time = 0.0
+        self.freq_time = 0.0    #sum of frequency x busy time, for the average frequency
+        self.nr_changes = 0
+
+    @property
+    def speed(self) -> float:
+        """Burst progress per ms at the current frequency."""
+        return self.freqs[self.level] / self.max_freq
+
+    def update(self, now: float, busy: bool) -> None:
+        """Account for the time since the last update, then mark the CPU busy or idle."""
+        dt = now - self.last_update
+        if dt > 0:
+            if self.busy:
+                self.energy += self.powers[self.level] * dt
+                self.busy_time += dt
+                self.freq_time += self.freqs[self.level] * dt
+            else:
+                self.energy += self.idle_power * dt
+            decay = 0.5 ** (dt / UTIL_HALF_LIFE)
+            self.util = self.util * decay + (1 - decay) * (self.speed if self.busy else 0.0)
+        self.last_update = now
+        self.busy = busy
+
+    def select(self, now: float) -> float:
+        """Let the governor pick the frequency of a slice starting at `now`, return the speed."""
+        self.update(now, True)
+        if self.governor == "schedutil":
+            level = min(bisect.bisect_left(self.freqs, HEADROOM * self.util * self.max_freq), len(self.freqs) - 1)
+            if level != self.level:
+                self.level = level
+                self.nr_changes += 1
+        return self.speed
+
+    def average_power(self) -> float:
+        return self.energy / self.last_update if self.last_update > 0 else 0.0
+
+    def average_freq(self) -> float:
+        return self.freq_time / self.busy_time if self.busy_time > 0 else 0.0
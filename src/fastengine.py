@@ -0,0 +1,200 @@
+"""Optimized event loop for the default CFS policy, checked against CFSEngine."""
+
+import heapq
+import math
+
+from . import cfscalc
+from . import logger
+from . import runqueue
+from . import simulation
+from . import utils
+
+class FastCFSEngine:
+    """Same schedule and events as CFSEngine.run() with a Runqueue and a CFSCalculator.
+
+    The runqueue and the I/O queue are heaps keyed by (vruntime or return time,
+    enqueue order): ties go to the task enqueued first, like the first minimum
+    of Runqueue and the stable sort of the I/O list. The queue weight is kept
+    up to date instead of summed at each pick.
+    """
+
+    def __init__(self, logger: logger.CFSLogger, tasks: list = [], logic: (None | cfscalc.CFSCalculator) = None):
+        self.logger = logger
+        self.logic = logic if logic is not None else cfscalc.CFSCalculator()
+        self.pending_tasks = sorted(tasks, key=lambda t: t.arrival_time)
+        self.time = 0.0
+
+    def run(self):
+        log_event = self.logger.log_event
+        record_gantt_entry = self.logger.record_gantt_entry
+        latency = self.logic.L
+        min_granularity = self.logic.MIN_GRANULARITY
+        nice_0_weight = self.logic.NICE_0_WEIGHT
+        inf = math.inf
+
+        pending = self.pending_tasks
+        nb_pending = len(pending)
+        next_arrival = 0
+        rq = []     #(vruntime, seq, task)
+        rq_weight = 0
+        io = []     #(return_time, seq, task)
+        seq = 0
+        current = None
+        allocated = 0.0
+        stop_time = 0.0
+        now = 0.0
+
+        log_event(now, "START", message="CFS start")
+        while True:
+            arrival_time = pending[next_arrival].arrival_time if next_arrival < nb_pending else inf
+            io_time = io[0][0] if io else inf
+            cpu_stop_time = stop_time if current is not None else inf
+
+            #same order as the (time, event_type) tuples: ARRIVAL < CPU_STOP < IO_RETURN
+            if arrival_time <= cpu_stop_time and arrival_time <= io_time:
+                if arrival_time == inf:
+                    break   #end of the simulation
+                now = arrival_time
+                while next_arrival < nb_pending and pending[next_arrival].arrival_time <= now:
+                    t = pending[next_arrival]
+                    next_arrival += 1
+                    if rq and rq[0][0] > t.vruntime:
+                        t.vruntime = rq[0][0]
+                    heapq.heappush(rq, (t.vruntime, seq, t))
+                    seq += 1
+                    rq_weight += t.get_task_weight()
+                    log_event(now, "ARRIVAL", t)
+
+            elif cpu_stop_time <= io_time:
+                now = cpu_stop_time
+                t = current
+                current = None
+                t.exec_time += allocated
+                t.time_left_cur_burst -= allocated
+                t.vruntime += allocated * (nice_0_weight / t.get_task_weight())
+                record_gantt_entry(t.id, now - allocated, now)
+
+                if t.time_left_cur_burst <= 0:
+                    t.current_burst += 1
+                    if t.current_burst >= len(t.bursts):
+                        t.end_time = now
+                        log_event(now, "TASK_END", t)
+                    else:
+                        kind, duration = t.bursts[t.current_burst]
+                        t.time_left_cur_burst = duration
+                        if kind == "CPU":
+                            if rq and rq[0][0] > t.vruntime:
+                                t.vruntime = rq[0][0]
+                            heapq.heappush(rq, (t.vruntime, seq, t))
+                            seq += 1
+                            rq_weight += t.get_task_weight()
+                            log_event(now, "NEW_CPU_BURST", t)
+                        elif kind == "IO":
+                            heapq.heappush(io, (now + duration, seq, t))
+                            seq += 1
+                            log_event(now, "NEW_IO_BURST", t)
+                else:
+                    if rq and rq[0][0] > t.vruntime:
+                        t.vruntime = rq[0][0]
+                    heapq.heappush(rq, (t.vruntime, seq, t))
+                    seq += 1
+                    rq_weight += t.get_task_weight()
+                    log_event(now, "TIME_SLICE_OVER", t)
+
+            else:
+                now = io_time
+                while io and io[0][0] <= now:
+                    t = heapq.heappop(io)[2]
+                    t.current_burst += 1
+                    if t.current_burst >= len(t.bursts):
+                        t.end_time = now
+                        log_event(now, "TASK_END", t)
+                    else:
+                        kind, duration = t.bursts[t.current_burst]
+                        t.time_left_cur_burst = duration
+                        if kind == "CPU":
+                            if rq and rq[0][0] > t.vruntime:
+                                t.vruntime = rq[0][0]
+                            heapq.heappush(rq, (t.vruntime, seq, t))
+                            seq += 1
+                            rq_weight += t.get_task_weight()
+                            log_event(now, "RETURN_FROM_IO", t)
+                        elif kind == "IO":
+                            heapq.heappush(io, (now + duration, seq, t))
+                            seq += 1
+                            log_event(now, "NEW_IO_BURST", t)
+
+            if current is None and rq:
+                #election of the new task on CPU
+                current = heapq.heappop(rq)[2]
+                weight = current.get_task_weight()
+                rq_weight -= weight
+                if current.start_time is None:
+                    current.start_time = now
+                time_slice = max(latency * (weight / (rq_weight + weight)), min_granularity)
+                allocated = min(time_slice, current.time_left_cur_burst)
+                stop_time = now + allocated
+
+        self.time = now
+
+def supports(tasks: list, rqueue, logic, renices: list = [], switch_overhead=None, cpufreq=None) -> bool:
+    """True if FastCFSEngine gives the schedule of CFSEngine for this setup."""
+    return (type(rqueue) is runqueue.Runqueue and len(rqueue) == 0 and rqueue.placement == "default" and not renices
+            and switch_overhead is None and cpufreq is None and type(logic) is cfscalc.CFSCalculator and all(t.bandwidth is None for t in tasks))
+
+class Divergence(Exception):
+    """First event of the optimized engine that differs from the reference one."""
+
+    def __init__(self, index: int, expected: (None | tuple), got: (None | tuple)):
+        super().__init__(f"event #{index}: expected {expected}, got {got}")
+        self.index = index
+        self.expected = expected
+        self.got = got
+
+class EventRecorder(logger.CFSLogger):
+    """Logger keeping exact (time, event, task id, vruntime, message) tuples.
+
+    With the events of a reference run, each new event is checked against it.
+    """
+
+    def __init__(self, expected: (None | list) = None):
+        super().__init__(verbose=False)
+        self.events = []
+        self.expected = expected
+
+    def log_event(self, time: float, event_type: str, task=None, message: str = ""):
+        event = (time, event_type, task.id, task.vruntime, message) if task else (time, event_type, None, None, message)
+        if self.expected is not None:
+            index = len(self.events)
+            expected = self.expected[index] if index < len(self.expected) else None
+            if event != expected:
+                raise Divergence(index, expected, event)
+        self.events.append(event)
+
+def verify(raw_tasks_data: list, directives: list = [], params: (None | dict) = None) -> int:
+    """Replay the reference event log against FastCFSEngine, return the number of events.
+
+    Raise Divergence at the first differing event, task result or Gantt entry.
+    """
+    reference = EventRecorder()
+    ref_tasks, _ = simulation.simulate(raw_tasks_data, directives, sim_logger=reference, params=params)
+
+    tasks = utils.build_tasks(raw_tasks_data)
+    rqueue, logic = simulation.make_scheduler(tasks, directives, params=params)
+    if not supports(tasks, rqueue, logic, simulation.renice_events(tasks, directives), simulation.overhead_model(directives),
+                    simulation.dvfs_model(directives)):
+        raise ValueError("l'ordonnanceur optimisé ne gère que CFS sans groupes, quotas, @renice, @overhead ni @dvfs")
+    checker = EventRecorder(expected=reference.events)
+    FastCFSEngine(checker, tasks, logic).run()
+
+    if len(checker.events) < len(reference.events):
+        raise Divergence(len(checker.events), reference.events[len(checker.events)], None)
+    for i, (ref, t) in enumerate(zip(ref_tasks, tasks)):
+        expected = (ref.id, ref.start_time, ref.end_time, ref.exec_time, ref.vruntime)
+        got = (t.id, t.start_time, t.end_time, t.exec_time, t.vruntime)
+        if expected != got:
+            raise Divergence(len(checker.events), ("task", i) + expected, ("task", i) + got)
+    for i, (expected, got) in enumerate(zip(reference.gantt_data, checker.gantt_data)):
+        if expected != got:
+            raise Divergence(len(checker.events), ("gantt", i) + tuple(expected), ("gantt", i) + tuple(got))
+    return len(reference.events)
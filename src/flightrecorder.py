@@ -0,0 +1,113 @@
+"""Flight recorder: the last events of a long simulation, dumped on demand or when a trigger fires."""
+
+from . import logger
+
+#events after which a task waits for the CPU (runqueue, or held by its quota)
+RUNNABLE_EVENTS = frozenset(("ARRIVAL", "RETURN_FROM_IO", "NEW_CPU_BURST", "TIME_SLICE_OVER", "UNTHROTTLE"))
+
+class RingBuffer:
+    """The last `capacity` items appended, in a list allocated once: O(1) appends, no reallocation."""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"the capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.total = 0  #items appended since the start, overwritten ones included
+
+    def append(self, item) -> None:
+        self.items[self.total % self.capacity] = item
+        self.total += 1
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def __iter__(self):
+        """Oldest item first."""
+        for i in range(self.total - len(self), self.total):
+            yield self.items[i % self.capacity]
+
+    def dropped(self) -> int:
+        """Number of items overwritten."""
+        return self.total - len(self)
+
+class FlightRecorder(logger.CFSLogger):
+    """Logger keeping the last `capacity` events in a ring buffer instead of writing them.
+
+    dump() writes the buffer out (to `dump_file` if given). With run(), it is
+    also dumped when the number of runnable tasks exceeds `max_nr_running` or
+    a task has waited for the CPU more than `max_wait` ms; a trigger fires once
+    when its threshold is crossed and again only after going back under it.
+    """
+
+    def __init__(self, capacity: int, output_file=None, dump_file: (None | str) = None,
+                 max_nr_running: (None | int) = None, max_wait: (None | float) = None):
+        super().__init__(output_file)
+        self.history = RingBuffer(capacity)
+        self.dump_file = dump_file
+        self.max_nr_running = max_nr_running
+        self.max_wait = max_wait
+        self.runnable_since = {}    #task id -> time it became runnable, oldest first
+        self.fired = set()  #triggers over their threshold
+        self.nr_dumps = 0
+        self.time = 0.0
+
+    def log_event(self, time: float, event_type: str, task=None, message: str = ""):
+        self.time = time
+        self.history.append(self.format_event(time, event_type, task, message))
+        if task is not None and event_type in RUNNABLE_EVENTS:
+            self.runnable_since.pop(task.id, None)
+            self.runnable_since[task.id] = time     #events come in time order: insertion order is by time
+
+    def longest_wait(self, now: float) -> float:
+        """Time waited by the task runnable for the longest time, 0 if none."""
+        for since in self.runnable_since.values():
+            return now - since
+        return 0.0
+
+    def check(self, engine) -> list[str]:
+        """Check the triggers after an event of the engine, dump the buffer if one fires, return the fired ones."""
+        wait = self.longest_wait(engine.time)
+        if engine.current_task is not None:
+            since = self.runnable_since.pop(engine.current_task.id, None)
+            if since is not None:   #the wait of the task just picked counts too
+                wait = max(wait, engine.time - since)
+
+        crossed = {}
+        if self.max_nr_running is not None:
+            nr_running = len(engine.rqueue)
+            if nr_running > self.max_nr_running:
+                crossed["nr_running"] = f"nr_running {nr_running} > {self.max_nr_running}"
+        if self.max_wait is not None:
+            if wait > self.max_wait:
+                crossed["wait"] = f"wait {wait:.2f} ms > {self.max_wait:g} ms"
+
+        fired = [name for name in crossed if name not in self.fired]
+        self.fired = set(crossed)
+        if fired:
+            self.dump(", ".join(crossed[name] for name in fired), engine.time)
+        return fired
+
+    def dump(self, reason: str = "", time: (None | float) = None) -> None:
+        """Write the buffered events, oldest first, with a header giving the reason."""
+        time = self.time if time is None else time
+        lines = [f"===== FLIGHT RECORDER [{time:2f} ms] {reason} ({len(self.history)} events, {self.history.dropped()} dropped) ====="]
+        lines += list(self.history)
+        lines.append("=" * 30)
+        self.nr_dumps += 1
+        if self.dump_file is None:
+            for line in lines:
+                self._write(line)
+        else:
+            with open(self.dump_file, "a") as f:
+                f.write("\n".join(lines) + "\n")
+
+def run(engine, recorder: FlightRecorder) -> None:
+    """Run a CFSEngine from the start, checking the triggers of the recorder after each event."""
+    engine.start()
+    while engine.is_active():
+        next_event = engine.next_event()
+        if next_event is None:
+            break
+        engine.handle_event(next_event)
+        recorder.check(engine)
@@ -0,0 +1,130 @@
+"""Fluid approximation of CFS as weighted generalized processor sharing (GPS)."""
+
+import heapq
+import math
+
+from . import cfscalc
+from . import logger
+from . import metrics
+from . import simulation
+from . import utils
+
+METRICS = ("avg_response", "avg_turnaround", "avg_waiting", "cpu_utilization")
+
+class FluidEngine:
+    """CFS with infinitely small slices: every runnable task progresses at weight / total weight.
+
+    Only arrivals, CPU burst completions and I/O returns are events. The
+    engine keeps the GPS virtual time V (service per unit of weight, dV/dt =
+    1 / total weight); a burst of r ms started at V ends at V + r / weight,
+    so completions come from a heap without updating every task. Tasks start
+    as soon as they arrive and each CPU burst is one Gantt entry, from its
+    start to its completion.
+    """
+
+    def __init__(self, logger: logger.CFSLogger, tasks: list = [], logic: (None | cfscalc.CFSCalculator) = None):
+        self.logger = logger
+        self.logic = logic if logic is not None else cfscalc.CFSCalculator()
+        self.pending_tasks = sorted(tasks, key=lambda t: t.arrival_time)
+        self.time = 0.0
+
+    def run(self):
+        log_event = self.logger.log_event
+        record_gantt_entry = self.logger.record_gantt_entry
+        nice_0_weight = self.logic.NICE_0_WEIGHT
+        inf = math.inf
+
+        pending = self.pending_tasks
+        nb_pending = len(pending)
+        next_arrival = 0
+        running = []    #(virtual finish time, seq, task, real start time)
+        weight = 0      #total weight of the running tasks
+        io = []     #(return_time, seq, task)
+        seq = 0
+        vtime = 0.0
+        now = 0.0
+
+        def start_burst(t, now):
+            nonlocal seq, weight
+            kind, duration = t.bursts[t.current_burst]
+            t.time_left_cur_burst = duration
+            if kind == "CPU":
+                w = t.get_task_weight()
+                heapq.heappush(running, (vtime + duration / w, seq, t, now))
+                weight += w
+            else:
+                heapq.heappush(io, (now + duration, seq, t))
+            seq += 1
+            return kind
+
+        log_event(now, "START", message="fluid (GPS) start")
+        while True:
+            arrival_time = pending[next_arrival].arrival_time if next_arrival < nb_pending else inf
+            io_time = io[0][0] if io else inf
+            finish_time = now + (running[0][0] - vtime) * weight if running else inf
+
+            #same order as the (time, event_type) tuples of CFSEngine: ARRIVAL < CPU_STOP < IO_RETURN
+            if arrival_time <= finish_time and arrival_time <= io_time:
+                if arrival_time == inf:
+                    break   #end of the simulation
+                if weight:
+                    vtime += (arrival_time - now) / weight
+                now = arrival_time
+                while next_arrival < nb_pending and pending[next_arrival].arrival_time <= now:
+                    t = pending[next_arrival]
+                    next_arrival += 1
+                    t.start_time = now
+                    start_burst(t, now)
+                    log_event(now, "ARRIVAL", t)
+
+            elif finish_time <= io_time:
+                now = finish_time
+                vtime = running[0][0]
+                while running and running[0][0] <= vtime:
+                    _, _, t, started = heapq.heappop(running)
+                    w = t.get_task_weight()
+                    weight -= w
+                    duration = t.time_left_cur_burst
+                    t.exec_time += duration
+                    t.vruntime += duration * (nice_0_weight / w)
+                    t.time_left_cur_burst = 0
+                    record_gantt_entry(t.id, started, now)
+
+                    t.current_burst += 1
+                    if t.current_burst >= len(t.bursts):
+                        t.end_time = now
+                        log_event(now, "TASK_END", t)
+                    elif start_burst(t, now) == "CPU":
+                        log_event(now, "NEW_CPU_BURST", t)
+                    else:
+                        log_event(now, "NEW_IO_BURST", t)
+                if not running:
+                    weight = 0  #no float residue
+
+            else:
+                if weight:
+                    vtime += (io_time - now) / weight
+                now = io_time
+                while io and io[0][0] <= now:
+                    t = heapq.heappop(io)[2]
+                    t.current_burst += 1
+                    if t.current_burst >= len(t.bursts):
+                        t.end_time = now
+                        log_event(now, "TASK_END", t)
+                    elif start_burst(t, now) == "CPU":
+                        log_event(now, "RETURN_FROM_IO", t)
+                    else:
+                        log_event(now, "NEW_IO_BURST", t)
+
+        self.time = now
+
+def compare(raw_tasks_data: list, directives: list = [], params: (None | dict) = None) -> dict:
+    """Run the exact and the fluid engine, return {metric: (exact, fluid, relative error)}."""
+    exact_tasks, _ = simulation.simulate(raw_tasks_data, directives, params=params)
+    tasks = utils.build_tasks(raw_tasks_data)
+    _, logic = simulation.make_scheduler(tasks, directives, params=params)
+    FluidEngine(logger.CFSLogger(verbose=False), tasks, logic).run()
+
+    exact, fluid = metrics.summarize(exact_tasks), metrics.summarize(tasks)
+    return {name: (exact[name], fluid[name], abs(fluid[name] - exact[name]) / exact[name] if exact[name] else 0.0)
+            for name in METRICS}
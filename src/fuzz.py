@@ -0,0 +1,55 @@
+"""Randomized differential testing of FastCFSEngine against CFSEngine (scfs fuzz)."""
+
+import argparse
+import random
+
+from . import fastengine
+from . import utils
+
+def random_workload(rng: random.Random, max_tasks: int = 12, max_bursts: int = 7, max_duration: int = 20) -> list:
+    """Return formatted tasks with arrival ties, extreme nice values and short or decimal bursts."""
+    rows = []
+    for i in range(rng.randint(1, max_tasks)):
+        arrival = rng.choice([0, 0, rng.randint(0, 3 * max_duration), round(rng.uniform(0, max_duration), 2)])
+        nice = rng.choice([0, -20, 19, rng.randint(-20, 19)])
+        bursts = []
+        for b in range(rng.randint(1, max_bursts) // 2 * 2 + 1):    #always ends with a CPU burst
+            duration = rng.choice([1, rng.randint(1, max_duration), round(rng.uniform(0.01, max_duration), 2)])
+            bursts.append(("CPU" if b % 2 == 0 else "IO", duration))
+        rows.append([f"T{i}", arrival, nice, bursts, {}])
+    return rows
+
+def random_params(rng: random.Random) -> dict:
+    """Return default calculator parameters or random L / min_granularity overrides."""
+    if rng.random() < 0.5:
+        return {}
+    return {"L": rng.choice([1.0, 6.0, round(rng.uniform(0.5, 20), 2)]), "min_granularity": rng.choice([0.1, 0.75, 3.0])}
+
+def fuzz(runs: int = 200, seed: int = 0, max_tasks: int = 12) -> list:
+    """Verify `runs` random workloads, return the (seed, rows, params, Divergence) failures."""
+    failures = []
+    for case_seed in range(seed, seed + runs):
+        rng = random.Random(case_seed)
+        rows = random_workload(rng, max_tasks)
+        params = random_params(rng)
+        try:
+            fastengine.verify(rows, params=params)
+        except fastengine.Divergence as err:
+            failures.append((case_seed, rows, params, err))
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs fuzz", description="Comparer l'ordonnanceur optimisé au moteur de référence sur des charges aléatoires")
+    parser.add_argument("--runs", type=int, default=200, help="Nombre de charges aléatoires (défaut: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de la première charge (défaut: 0)")
+    parser.add_argument("--max-tasks", type=int, default=12, help="Nombre maximal de tâches par charge (défaut: 12)")
+    args = parser.parse_args(argv)
+
+    failures = fuzz(args.runs, args.seed, args.max_tasks)
+    for case_seed, rows, params, err in failures:
+        print(f"Graine {case_seed} (paramètres {params}) : {err}")
+        for row in rows:
+            print("    " + utils.format_line(row))
+    print(f"{args.runs - len(failures)} / {args.runs} charges identiques")
+    if failures:
+        raise SystemExit(1)
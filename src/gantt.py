@@ -0,0 +1,236 @@
+"""Level-of-detail Gantt charts: occupancy pyramid of the CPU slices, exported as HTML or SVG."""
+
+import collections
+import html
+import json
+
+DEFAULT_BASE_BINS = 1024    #bins of the coarsest level, about one per pixel
+DEFAULT_MAX_BINS = 1 << 18  #bins of the finest level (zoom x256)
+DEFAULT_MAX_RUNS = 1 << 19  #runs of all the levels finer than the coarsest one
+STEPS = 16  #occupancy levels of a bin, 1 for any activity
+
+def merge_slices(gantt_data: list, tolerance: float = 1e-9) -> dict:
+    """Return {task id: [(start, end), ...]}, sorted, with back-to-back slices merged."""
+    by_task = collections.defaultdict(list)
+    for task_id, start, end in gantt_data:
+        by_task[task_id].append((start, end))
+    merged = {}
+    for task_id, slices in by_task.items():
+        slices.sort()
+        intervals = []
+        cur_start, cur_end = slices[0]
+        for start, end in slices:
+            if start - cur_end <= tolerance:
+                if end > cur_end:
+                    cur_end = end
+            else:
+                intervals.append((cur_start, cur_end))
+                cur_start, cur_end = start, end
+        intervals.append((cur_start, cur_end))
+        merged[task_id] = intervals
+    return merged
+
+def occupancy_runs(intervals: list, t0: float, bin_width: float, steps: int = STEPS) -> list[int]:
+    """Return the occupancy of the bins as flat [first bin, nb bins, level, ...] runs.
+
+    Each bin of `bin_width` starting at t0 gets the running fraction of its time,
+    as a level in 1..steps (0 bins are left out); equal contiguous bins are one run.
+    """
+    runs = [-1, 0, 0]   #sentinel run, removed at the end
+    to_level = steps / bin_width
+
+    def emit(first, count, busy):
+        level = min(steps, int(busy * to_level + 0.5)) or 1
+        if runs[-3] + runs[-2] == first and runs[-1] == level:
+            runs[-2] += count
+        else:
+            runs.extend((first, count, level))
+
+    pending, busy = -1, 0.0     #bin being filled and its running time
+    for start, end in intervals:
+        first = int((start - t0) / bin_width)
+        last = int((end - t0) / bin_width)
+        if first != pending:
+            if busy > 0:
+                emit(pending, 1, busy)
+            busy = 0.0
+        if first == last:
+            pending = first
+            busy += end - start
+            continue
+        emit(first, 1, busy + t0 + (first + 1) * bin_width - start)
+        if last > first + 1:
+            emit(first + 1, last - first - 1, bin_width)
+        pending, busy = last, end - (t0 + last * bin_width)
+    if busy > 0:
+        emit(pending, 1, busy)
+    return runs[3:]
+
+class GanttPyramid:
+    """Occupancy of every task at levels of `base_bins` * 2^k bins.
+
+    The size of a level is bounded by tasks x bins, whatever the number of
+    slices. Levels stop at `max_bins`, at the shortest merged slice or gap,
+    or once the finer levels hold `max_runs` runs. The merged slices are kept
+    for deeper zooms if there are no more than `max_bins` of them.
+    """
+
+    def __init__(self, gantt_data: list, base_bins: int = DEFAULT_BASE_BINS, max_bins: int = DEFAULT_MAX_BINS,
+                 max_runs: int = DEFAULT_MAX_RUNS):
+        self.intervals = merge_slices(gantt_data)
+        self.task_ids = sorted(self.intervals, key=str)
+        self.t0 = 0.0
+        self.t1 = max((i[-1][1] for i in self.intervals.values()), default=1.0) or 1.0
+        shortest = min((end - start for i in self.intervals.values() for start, end in i if end > start), default=self.t1)
+        gaps = [b[0] - a[1] for i in self.intervals.values() for a, b in zip(i, i[1:])]
+        finest = min([shortest] + gaps)
+
+        self.levels = []    #(nb bins, runs of each task)
+        bins = base_bins
+        nr_runs = 0
+        while True:
+            bin_width = (self.t1 - self.t0) / bins
+            runs = [occupancy_runs(self.intervals[t], self.t0, bin_width) for t in self.task_ids]
+            self.levels.append((bins, runs))
+            if len(self.levels) > 1:
+                nr_runs += sum(map(len, runs)) // 3
+            if bins >= max_bins or bin_width <= finest or nr_runs >= max_runs:
+                break
+            bins *= 2
+        self.exact = sum(map(len, self.intervals.values())) <= max_bins
+
+    def to_dict(self) -> dict:
+        return {
+            "tasks": [str(t) for t in self.task_ids],
+            "t0": self.t0,
+            "t1": self.t1,
+            "steps": STEPS,
+            "levels": [{"bins": bins, "runs": runs} for bins, runs in self.levels],
+            "slices": [[x for i in self.intervals[t] for x in i] for t in self.task_ids] if self.exact else None,
+        }
+
+def task_color(index: int) -> str:
+    return f"hsl({index * 137.508 % 360:.0f}, 65%, 45%)"
+
+def write_svg(pyramid: GanttPyramid, filename: str, row_height: int = 14, label_width: int = 80) -> None:
+    """Write the coarsest level as a static SVG, one pixel per bin."""
+    bins, rows = pyramid.levels[0]
+    width = label_width + bins
+    height = row_height * len(rows) + 20
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">']
+    for i, (task_id, runs) in enumerate(zip(pyramid.task_ids, rows)):
+        y = i * row_height
+        parts.append(f'<text x="2" y="{y + row_height - 3}">Task {html.escape(str(task_id))}</text>')
+        parts.append(f'<g fill="{task_color(i)}">')
+        for j in range(0, len(runs), 3):
+            first, count, level = runs[j:j + 3]
+            opacity = "" if level == STEPS else f' fill-opacity="{level / STEPS:.2f}"'
+            parts.append(f'<rect x="{label_width + first}" y="{y + 1}" width="{count}" height="{row_height - 2}"{opacity}/>')
+        parts.append("</g>")
+    y = row_height * len(rows) + 14
+    parts.append(f'<text x="{label_width}" y="{y}">0</text>')
+    parts.append(f'<text x="{width}" y="{y}" text-anchor="end">{pyramid.t1:.2f} ms</text>')
+    parts.append("</svg>")
+    with open(filename, "w") as f:
+        f.write("\n".join(parts) + "\n")
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>__TITLE__</title>
+<style>body{margin:0;font:12px monospace}#info{padding:4px 8px}canvas{display:block;cursor:grab}</style>
+</head><body>
+<div id="info">molette : zoom, Maj+molette : défiler les tâches, glisser : déplacer, double-clic : vue entière</div>
+<canvas id="gantt"></canvas>
+<script>
+const data = __DATA__;
+const ROW = 14, LABEL = 80, AXIS = 20;
+const canvas = document.getElementById("gantt"), ctx = canvas.getContext("2d");
+let v0 = data.t0, v1 = data.t1, firstRow = 0;
+function color(i, a) { return `hsla(${(i * 137.508 % 360).toFixed(0)}, 65%, 45%, ${a})`; }
+function level() {
+  //coarsest level with bins no wider than a pixel of the view
+  const px = (v1 - v0) / (canvas.width - LABEL);
+  for (const l of data.levels) if ((data.t1 - data.t0) / l.bins <= px) return l;
+  return data.levels[data.levels.length - 1];
+}
+function firstRun(runs, bin) {
+  let lo = 0, hi = runs.length / 3;
+  while (lo < hi) { const m = (lo + hi) >> 1; if (runs[3 * m] + runs[3 * m + 1] <= bin) lo = m + 1; else hi = m; }
+  return lo;
+}
+function visibleRows() { return Math.max(1, Math.floor((canvas.height - AXIS) / ROW)); }
+function draw() {
+  //only the visible rows and runs are drawn
+  canvas.width = window.innerWidth;
+  canvas.height = Math.min(data.tasks.length * ROW, Math.max(window.innerHeight - 30, 10 * ROW)) + AXIS;
+  firstRow = Math.max(0, Math.min(firstRow, data.tasks.length - visibleRows()));
+  const w = canvas.width - LABEL, lvl = level(), bw = (data.t1 - data.t0) / lvl.bins, scale = w / (v1 - v0);
+  const first = Math.floor(firstRow), last = Math.min(data.tasks.length, first + visibleRows());
+  const firstBin = (v0 - data.t0) / bw, lastBin = (v1 - data.t0) / bw;
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  ctx.fillStyle = "#000";
+  for (let i = first; i < last; i++) ctx.fillText("Task " + data.tasks[i], 2, (i - first) * ROW + ROW - 3);
+  ctx.save();
+  ctx.beginPath(); ctx.rect(LABEL, 0, w, canvas.height); ctx.clip();
+  if (data.slices && bw > (v1 - v0) / w) {
+    //zoomed past the finest level: merged slices
+    for (let i = first; i < last; i++) {
+      const s = data.slices[i], y = (i - first) * ROW + 1;
+      let lo = 0, hi = s.length / 2;
+      while (lo < hi) { const m = (lo + hi) >> 1; if (s[2 * m + 1] < v0) lo = m + 1; else hi = m; }
+      ctx.fillStyle = color(i, 1);
+      for (let k = lo; k < s.length / 2 && s[2 * k] <= v1; k++)
+        ctx.fillRect(LABEL + (s[2 * k] - v0) * scale, y, Math.max((s[2 * k + 1] - s[2 * k]) * scale, 1), ROW - 2);
+    }
+  } else for (let i = first; i < last; i++) {
+    const runs = lvl.runs[i], y = (i - first) * ROW + 1;
+    for (let r = firstRun(runs, firstBin); r < runs.length / 3 && runs[3 * r] <= lastBin; r++) {
+      const start = data.t0 + runs[3 * r] * bw;
+      ctx.fillStyle = color(i, runs[3 * r + 2] / data.steps);
+      ctx.fillRect(LABEL + (start - v0) * scale, y, Math.max(runs[3 * r + 1] * bw * scale, 1), ROW - 2);
+    }
+  }
+  ctx.restore();
+  ctx.fillStyle = "#000";
+  const y = canvas.height - 6;
+  ctx.fillText(v0.toFixed(2) + " ms", LABEL, y);
+  ctx.textAlign = "right"; ctx.fillText(v1.toFixed(2) + " ms", canvas.width - 2, y); ctx.textAlign = "left";
+}
+canvas.addEventListener("wheel", e => {
+  e.preventDefault();
+  if (e.shiftKey) { firstRow += Math.sign(e.deltaY || e.deltaX) * 3; draw(); return; }
+  const t = v0 + (e.offsetX - LABEL) / (canvas.width - LABEL) * (v1 - v0), k = e.deltaY < 0 ? 0.8 : 1.25;
+  v0 = Math.max(data.t0, t - (t - v0) * k); v1 = Math.min(data.t1, t + (v1 - t) * k);
+  draw();
+}, {passive: false});
+let drag = null;
+canvas.addEventListener("mousedown", e => drag = {x: e.offsetX, y: e.offsetY, v0, v1, firstRow});
+window.addEventListener("mouseup", () => drag = null);
+canvas.addEventListener("mousemove", e => {
+  if (!drag) return;
+  const dt = (drag.x - e.offsetX) / (canvas.width - LABEL) * (drag.v1 - drag.v0);
+  const shift = Math.min(Math.max(dt, data.t0 - drag.v0), data.t1 - drag.v1);
+  v0 = drag.v0 + shift; v1 = drag.v1 + shift;
+  firstRow = drag.firstRow + (drag.y - e.offsetY) / ROW;
+  draw();
+});
+canvas.addEventListener("dblclick", () => { v0 = data.t0; v1 = data.t1; draw(); });
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body></html>
+"""
+
+def write_html(pyramid: GanttPyramid, filename: str, title: str = "simpleCFS") -> None:
+    """Write a self-contained HTML page drawing the level of the pyramid matching the zoom."""
+    data = json.dumps(pyramid.to_dict(), separators=(",", ":")).replace("</", "<\\/")
+    with open(filename, "w") as f:
+        f.write(HTML_TEMPLATE.replace("__TITLE__", html.escape(title)).replace("__DATA__", data))
+
+def export(gantt_data: list, filename: str, title: str = "simpleCFS", **kwargs) -> GanttPyramid:
+    """Build the pyramid of the slices and write it as SVG (.svg) or else as HTML."""
+    pyramid = GanttPyramid(gantt_data, **kwargs)
+    if filename.endswith(".svg"):
+        write_svg(pyramid, filename)
+    else:
+        write_html(pyramid, filename, title)
+    return pyramid
@@ -0,0 +1,182 @@
+"""Hierarchical group scheduling for simpleCFS."""
+
+from . import bandwidth
+from . import runqueue
+from . import task
+
+DEFAULT_CPU_WEIGHT = 100    #cgroup v2 cpu.weight default, maps to NICE_0_WEIGHT
+
+class TaskGroup:
+    NICE_0_WEIGHT = 1024
+
+    def __init__(self, path: str, parent: "None | TaskGroup" = None, cpu_weight: int = DEFAULT_CPU_WEIGHT):
+        self.path = path
+        self.parent = parent
+        self.rq = runqueue.Runqueue()   #child runqueue: tasks and sub-groups
+        self.vruntime = 0.0     #vruntime of the group entity in its parent runqueue
+        self.on_rq = False
+        self.curr = False   #on the path of the running task
+        self.load = 0   #sum of the weights queued in self.rq, updated on enqueue/dequeue
+        self.nr_running = 0 #tasks queued in the whole subtree (throttled sub-groups excluded)
+        self.bandwidth = None   #CFSBandwidth, None for no quota
+        self.throttled = False
+        self.set_cpu_weight(cpu_weight)
+
+    @property
+    def id(self):
+        return self.path
+
+    def set_cpu_weight(self, cpu_weight: int) -> None:
+        """Set the cpu.weight of the group (1..10000, 100 being a nice 0 task)."""
+        if not 1 <= cpu_weight <= 10000:
+            raise ValueError(f"cpu.weight must be in [1, 10000], got {cpu_weight} for {self.path}")
+        self.cpu_weight = cpu_weight
+        self.weight = cpu_weight * self.NICE_0_WEIGHT // DEFAULT_CPU_WEIGHT
+
+    def get_task_weight(self):
+        """Weight of the group entity in its parent runqueue."""
+        return self.weight
+
+    def ancestors(self):
+        """Yield the group and its ancestors up to the root."""
+        group = self
+        while group is not None:
+            yield group
+            group = group.parent
+
+
+def normalize_path(path: str) -> str:
+    """Return a group path as /a/b (no trailing or doubled slashes)."""
+    return "/" + "/".join(part for part in path.split("/") if part)
+
+
+class GroupRunqueue:
+    """Runqueue of group entities, each group scheduling its own child runqueue."""
+
+    def __init__(self):
+        self.root = TaskGroup("/")
+        self.groups = {"/": self.root}
+        self.curr_path = []     #groups picked for the running task, deepest last
+
+    def __len__(self):
+        return self.root.nr_running
+
+    def get_group(self, path: str) -> TaskGroup:
+        """Return the group of a path, creating it and its missing parents."""
+        path = normalize_path(path)
+        if path not in self.groups:
+            parent = self.get_group(path.rsplit("/", 1)[0] or "/")
+            self.groups[path] = TaskGroup(path, parent)
+        return self.groups[path]
+
+    def set_group_weight(self, path: str, cpu_weight: int) -> None:
+        """Set the cpu.weight of a group (not queued yet)."""
+        self.get_group(path).set_cpu_weight(cpu_weight)
+
+    def set_group_bandwidth(self, path: str, quota: float, period: float = bandwidth.DEFAULT_PERIOD) -> None:
+        """Limit a group to `quota` ms of CPU time every `period` ms."""
+        if normalize_path(path) == "/":
+            raise ValueError("the root group cannot have a quota")
+        self.get_group(path).bandwidth = bandwidth.CFSBandwidth(quota, period)
+
+    def _enqueue_entity(self, group: TaskGroup, entity, requeue: bool = False) -> None:
+        if requeue:
+            group.rq.tasks.append(entity)   #preempted entity: keep its vruntime
+        else:
+            group.rq.add_task(entity)
+        group.load += entity.get_task_weight()
+
+    def add_task(self, task: task.Task, flags: int = 0):
+        """Add a task to its group runqueue, enqueuing its idle ancestors (default placement)."""
+
+        if task.sched_group is None:
+            task.sched_group = self.get_group(task.group)
+        group = task.sched_group
+
+        self._enqueue_entity(group, task)
+        self._add_nr_running(group, 1)
+        self._enqueue_ancestors(group)
+
+    def add_tasks(self, tasks: list, flags: int = 0):
+        """Add tasks becoming runnable at the same time."""
+        for t in tasks:
+            self.add_task(t, flags)
+
+    def reweight_task(self, task: task.Task, nice: int):
+        """Renice a task not running, updating the load of its group if it is queued there."""
+
+        old_weight = task.get_task_weight()
+        task.nice = nice
+        group = task.sched_group
+        if group is not None and task in group.rq.tasks:
+            group.load += task.get_task_weight() - old_weight
+
+    def _add_nr_running(self, group: TaskGroup, count: int) -> None:
+        """Propagate a change of runnable tasks up to the first throttled group."""
+        for g in group.ancestors():
+            g.nr_running += count
+            if g.throttled:
+                break
+
+    def _enqueue_ancestors(self, group: TaskGroup) -> None:
+        """A group entity is queued in its parent as soon as it has a runnable task."""
+        while group.parent is not None and not group.on_rq and not group.curr and not group.throttled:
+            self._enqueue_entity(group.parent, group)
+            group.on_rq = True
+            group = group.parent
+
+    def throttle_group(self, group: TaskGroup) -> None:
+        """Take a group and its runnable tasks out of the hierarchy until it is unthrottled."""
+        if group.throttled:
+            return
+        self._add_nr_running(group.parent, -group.nr_running)
+        group.throttled = True
+
+        #dequeue the group, and the ancestors left without runnable task
+        while group.parent is not None and group.on_rq:
+            group.parent.rq.tasks.remove(group)
+            group.parent.load -= group.get_task_weight()
+            group.on_rq = False
+            group = group.parent
+            if group.nr_running > 0:
+                break
+
+    def unthrottle_group(self, group: TaskGroup) -> None:
+        """Put a throttled group and its runnable tasks back in the hierarchy."""
+        if not group.throttled:
+            return
+        group.throttled = False
+        self._add_nr_running(group.parent, group.nr_running)
+        if group.nr_running > 0:
+            self._enqueue_ancestors(group)
+
+    def _put_prev(self):
+        """Requeue the groups of the previous task that still have runnable tasks."""
+        for group in reversed(self.curr_path):
+            group.curr = False
+            if group.nr_running > 0 and not group.on_rq and not group.throttled:
+                self._enqueue_entity(group.parent, group, requeue=True)
+                group.on_rq = True
+        self.curr_path = []
+
+    def pick_next_task(self):
+        """Pick the min vruntime entity level by level, from the root group down to a task."""
+
+        self._put_prev()
+        if self.root.nr_running == 0:
+            return None
+
+        group = self.root
+        while True:
+            entity = group.rq.pick_next_task()
+            group.load -= entity.get_task_weight()
+            if not isinstance(entity, TaskGroup):
+                break
+            entity.on_rq = False
+            entity.curr = True
+            self.curr_path.append(entity)
+            group = entity
+
+        for g in entity.sched_group.ancestors():
+            g.nr_running -= 1
+        return entity
@@ -0,0 +1,124 @@
+"""Incremental re-simulation of an edited workload from engine checkpoints."""
+
+import bisect
+import math
+import pickle
+
+from . import cache
+from . import cfsengine
+
+DEFAULT_CHECKPOINTS = 64    #checkpoints over the arrival span when no interval is given
+
+class Recording:
+    """A finished simulation with the checkpoints taken during its run."""
+
+    def __init__(self, raw_tasks_data: list, directives: list, calculator: list, tasks: list,
+                 checkpoints: list, history: list, gantt_data: list, resumed_from: float = 0.0):
+        self.raw_tasks_data = raw_tasks_data
+        self.directives = directives
+        self.calculator = calculator
+        self.tasks = tasks  #finished tasks, in workload order
+        self.checkpoints = checkpoints  #by increasing horizon
+        self.history = history
+        self.gantt_data = gantt_data
+        self.resumed_from = resumed_from    #horizon of the checkpoint the run started from
+
+def calculator_key(logic, rqueue=None) -> list:
+    key = [type(logic).__name__, logic.L, logic.MIN_GRANULARITY, logic.NICE_0_WEIGHT, cache.ENGINE_VERSION]
+    placement = getattr(rqueue, "placement", "default")
+    return key if placement == "default" else key + [placement]
+
+def arrival_order(raw_tasks_data: list) -> list[int]:
+    """Return the workload indices in the engine order (by arrival time, then file order)."""
+    return sorted(range(len(raw_tasks_data)), key=lambda i: raw_tasks_data[i][1])
+
+def earliest_change(old_rows: list, new_rows: list) -> (None | float):
+    """Return the earliest arrival time at which two workloads differ, None if they are the same."""
+    old_sorted = [old_rows[i] for i in arrival_order(old_rows)]
+    new_sorted = [new_rows[i] for i in arrival_order(new_rows)]
+    for old, new in zip(old_sorted, new_sorted):
+        if old != new:
+            return float(min(old[1], new[1]))
+
+    if len(old_sorted) != len(new_sorted):
+        longer = old_sorted if len(old_sorted) > len(new_sorted) else new_sorted
+        return float(longer[min(len(old_sorted), len(new_sorted))][1])
+    return None
+
+def default_interval(raw_tasks_data: list) -> float:
+    last_arrival = max((data[1] for data in raw_tasks_data), default=0)
+    return max(last_arrival, 1.0) / DEFAULT_CHECKPOINTS
+
+def usable(recording: (None | Recording), directives: list, logic, rqueue=None) -> bool:
+    """True if the recording comes from the same directives, calculator, placement and engine version."""
+    return recording is not None and recording.directives == directives and recording.calculator == calculator_key(logic, rqueue)
+
+def run(engine: cfsengine.CFSEngine, tasks: list, raw_tasks_data: list, directives: list,
+        recording: (None | Recording) = None, interval: (None | float) = None) -> Recording:
+    """Run a fresh engine on tasks and return its recording.
+
+    With a usable previous recording, the engine resumes from the latest checkpoint
+    before the earliest change of the workload: tasks arrived before it are taken
+    from the recording, `tasks` being updated in place.
+    """
+    interval = interval if interval is not None else default_interval(raw_tasks_data)
+    order = arrival_order(raw_tasks_data)
+    sim_logger = engine.logger
+
+    if usable(recording, directives, engine.logic, engine.rqueue):
+        change = earliest_change(recording.raw_tasks_data, raw_tasks_data)
+        horizon = math.inf if change is None else change
+        checkpoints = [cp for cp in recording.checkpoints if cp.horizon <= horizon]
+    else:
+        checkpoints = []
+
+    if not checkpoints:
+        engine.start()
+        checkpoints = [engine.checkpoint(0.0)]
+        live = set()
+        nr_arrived = 0
+    else:
+        cp = checkpoints[-1]
+        old_order = arrival_order(recording.raw_tasks_data)
+        nr_arrived = bisect.bisect_left([raw_tasks_data[i][1] for i in order], cp.horizon)
+
+        #same tasks before the checkpoint: finished ones are kept, running ones restored
+        for pos in range(nr_arrived):
+            tasks[order[pos]] = recording.tasks[old_order[pos]]
+        restored = engine.restore(cp, [tasks[order[pos]] for pos in range(nr_arrived, len(order))])
+        for pos, t in restored:
+            tasks[order[pos]] = t
+        live = {pos for pos, _ in restored}
+
+        sim_logger.gantt_data[:] = recording.gantt_data[:cp.nr_gantt]
+        if sim_logger.verbose:
+            for line in recording.history[:cp.nr_events]:
+                sim_logger.history.append(line)
+                sim_logger._write(line)
+
+    resumed_from = checkpoints[-1].horizon
+    while (event := engine.next_event()) is not None:
+        limit = (math.floor(event[0] / interval) + 1) * interval
+        engine.run_until(limit)
+
+        while nr_arrived < len(order) and tasks[order[nr_arrived]].arrival_time < limit:
+            live.add(nr_arrived)
+            nr_arrived += 1
+        live = {pos for pos in live if not tasks[order[pos]].is_finished()}
+        checkpoints.append(engine.checkpoint(limit, [(pos, tasks[order[pos]]) for pos in sorted(live)]))
+
+    return Recording(raw_tasks_data, directives, calculator_key(engine.logic, engine.rqueue), list(tasks),
+                     checkpoints, sim_logger.history, sim_logger.gantt_data, resumed_from)
+
+def load(path: str) -> (None | Recording):
+    """Read a recording, None if the file is missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            recording = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    return recording if isinstance(recording, Recording) else None
+
+def save(recording: Recording, path: str) -> None:
+    with open(path, "wb") as f:
+        pickle.dump(recording, f, protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,163 @@
+"""Live ingestion of a task stream (scfs live)."""
+
+import argparse
+import asyncio
+import collections
+import sys
+
+from . import cfsengine
+from . import group
+from . import logger
+from . import simulation
+from . import utils
+
+DEFAULT_MAXSIZE = 1024  #events waiting for the consumer before ingestion blocks
+
+class StreamLogger(logger.CFSLogger):
+    """Logger keeping its output lines until the live simulator publishes them."""
+
+    def __init__(self):
+        super().__init__()
+        self.pending = collections.deque()
+
+    def _write(self, message: str):
+        self.pending.append(message)
+
+    def drain(self):
+        """Yield and forget the lines written since the last drain."""
+        while self.pending:
+            yield self.pending.popleft()
+
+class LiveSimulator:
+    """Engine front-end fed with task lines one at a time.
+
+    Simulated time only advances up to the watermark (the newest arrival seen),
+    so that a task can still arrive at the watermark; late tasks are moved to it.
+    Output lines go to `events`, a bounded queue: ingestion waits when it is full.
+    """
+
+    def __init__(self, rqueue=None, logic=None, maxsize: int = DEFAULT_MAXSIZE):
+        self.logger = StreamLogger()
+        self.engine = cfsengine.CFSEngine(logger=self.logger, rqueue=rqueue, logic=logic)
+        self.events = asyncio.Queue(maxsize)
+        self.tasks = []
+        self.watermark = 0.0
+        self.late = 0   #tasks received after the watermark passed their arrival
+        self.engine.start()
+
+    def feed_line(self, line: str) -> None:
+        """Parse a line of the stream and apply it to the simulation."""
+        parsed = utils.parse_line(line)
+        if parsed is None:
+            return
+        kind, data = parsed
+        if kind == "directive":
+            self.apply_directive(data)
+        else:
+            self.feed_task(utils.build_tasks([data])[0])
+
+    def apply_directive(self, directive: tuple) -> None:
+        if directive[0] != "group":
+            return
+        if not isinstance(self.engine.rqueue, group.GroupRunqueue):
+            raise ValueError("directive @group sans ordonnancement par groupes (--groups)")
+        simulation.apply_directives(self.engine.rqueue, [directive])
+
+    def feed_task(self, new_task) -> None:
+        """Add an arriving task and run the simulation up to the new watermark."""
+        if new_task.group != "/" and not isinstance(self.engine.rqueue, group.GroupRunqueue):
+            raise ValueError(f"tâche {new_task.id} du groupe {new_task.group} sans ordonnancement par groupes (--groups)")
+        if new_task.arrival_time < self.watermark:
+            new_task.arrival_time = self.watermark
+            self.late += 1
+        self.watermark = new_task.arrival_time
+
+        self.tasks.append(new_task)
+        self.engine.add_task(new_task)
+        self.engine.run_until(self.watermark)
+
+    async def publish(self) -> None:
+        """Move the new output lines to the event queue, waiting for room."""
+        for line in self.logger.drain():
+            await self.events.put(line)
+
+    async def ingest(self, line: str) -> None:
+        self.feed_line(line)
+        await self.publish()
+
+    async def close(self, summary: bool = True) -> None:
+        """End of stream: finish the simulation, publish the summary and the end marker (None)."""
+        self.engine.run_until(float("inf"))
+        if summary:
+            self.logger.print_summary(self.tasks)
+            self.logger.print_gantt()
+        await self.publish()
+        await self.events.put(None)
+
+async def read_lines(stream):
+    """Yield the lines of a blocking stream (file, pipe, stdin) without blocking the loop."""
+    while True:
+        line = await asyncio.to_thread(stream.readline)
+        if not line:
+            return
+        yield line
+
+async def socket_lines(path: str):
+    """Yield the lines sent by the first client of a unix socket."""
+    connection = asyncio.Queue(1)
+
+    async def on_connect(reader, writer):
+        await connection.put((reader, writer))
+
+    server = await asyncio.start_unix_server(on_connect, path)
+    reader, writer = await connection.get()
+    server.close()  #a single producer per run
+    try:
+        while line := await reader.readline():
+            yield line.decode()
+    finally:
+        writer.close()
+
+async def consume(events: asyncio.Queue, out) -> None:
+    """Write the event lines until the end marker."""
+    while (line := await events.get()) is not None:
+        print(line, file=out, flush=True)
+
+async def run_live(lines, sim: LiveSimulator, out=sys.stdout) -> None:
+    """Feed the simulator with an async iterable of lines while a consumer writes its events."""
+    consumer = asyncio.create_task(consume(sim.events, out))
+    async for line in lines:
+        try:
+            await sim.ingest(line)
+        except ValueError as err:
+            print(f"Ligne ignorée ({err}) : {line.strip()}", file=sys.stderr)
+    await sim.close()
+    await consumer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs live", description="Ordonnancement en direct d'un flux de tâches")
+    parser.add_argument("filepath", nargs="?", default="-", help="Fichier ou tube de tâches, - pour l'entrée standard (défaut: -)")
+    parser.add_argument("--socket", default=None, help="Lire les tâches depuis ce socket unix (premier client)")
+    parser.add_argument("--eevdf", action="store_true", help="Ordonnancement EEVDF")
+    parser.add_argument("--groups", action="store_true", help="Ordonnancement par groupes (directives @group dans le flux)")
+    parser.add_argument("--maxsize", type=int, default=DEFAULT_MAXSIZE, help=f"Événements en attente avant de bloquer la lecture (défaut: {DEFAULT_MAXSIZE})")
+    args = parser.parse_args(argv)
+
+    try:
+        rqueue, logic = simulation.make_scheduler([], [], eevdf=args.eevdf, groups=args.groups)
+    except ValueError as err:
+        parser.error(str(err))
+
+    async def session():
+        sim = LiveSimulator(rqueue, logic, maxsize=args.maxsize)
+        if args.socket is not None:
+            await run_live(socket_lines(args.socket), sim)
+        elif args.filepath == "-":
+            await run_live(read_lines(sys.stdin), sim)
+        else:
+            with open(args.filepath, "r") as f:
+                await run_live(read_lines(f), sim)
+        if sim.late:
+            print(f"{sim.late} arrivée(s) tardive(s) recalée(s) sur le filigrane", file=sys.stderr)
+
+    asyncio.run(session())
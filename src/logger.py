@@ -1,17 +1,24 @@
 """Logger implementation for simpleCFS."""
 
 import typing
+from . import metrics
+from . import overhead
 from . import task
 
 class CFSLogger:
-    def __init__(self, output_file=None):
+    batch_threshold = None  #more simultaneous events than this are logged as one record per event type
+
+    def __init__(self, output_file=None, verbose=True, keep=True):
         self.history = []
         self.gantt_data = []
         self.output_file = output_file
+        self.verbose = verbose  #False: events are neither kept nor written (batch runs)
+        self.keep = keep    #False: events are written but neither they nor the Gantt entries are kept (streams)
 
     def record_gantt_entry(self, task_id, start_time, end_time):
         """Records a CPU burst for the Gantt chart."""
-        self.gantt_data.append((task_id, start_time, end_time))
+        if self.keep:
+            self.gantt_data.append((task_id, start_time, end_time))
 
     def print_gantt(self):
         """Prints a visual ASCII Gantt chart."""
@@ -49,7 +56,8 @@ class CFSLogger:
 
             #line print
             line_str = "".join(line_buffer)
-            self._write(f"Task {tid:<2} |{line_str}|")
+            label = f"{'Switch':<8}" if tid == overhead.LANE else f"Task {tid:<2} "
+            self._write(f"{label}|{line_str}|")
 
         #common tmp scale
         self._write(" " * 8 + "+" + "-"*width + "+")
@@ -59,6 +67,33 @@ class CFSLogger:
 
     def log_event(self, time: float, event_type: str, task: typing.Optional[task.Task] = None, message: str = ""):
         """Save and show a system event."""
+        if not self.verbose:
+            return
+        log_line = self.format_event(time, event_type, task, message)
+        if self.keep:
+            self.history.append(log_line)
+
+        self._write(log_line)
+
+    def log_batch(self, time: float, events: list):
+        """Save and show the (event_type, task) events of one timestamp, in order.
+
+        Past `batch_threshold` events, each event type gets a single record
+        with the number of tasks and the first and last of them.
+        """
+        if self.batch_threshold is None or len(events) <= self.batch_threshold:
+            for event_type, t in events:
+                self.log_event(time, event_type, t)
+            return
+        by_type = {}
+        for event_type, t in events:
+            by_type.setdefault(event_type, []).append(t)
+        for event_type, tasks in by_type.items():
+            ids = f"{tasks[0].id}" if len(tasks) == 1 else f"{tasks[0].id} .. {tasks[-1].id}"
+            self.log_event(time, event_type, message=f"{len(tasks)} tasks ({ids})")
+
+    def format_event(self, time: float, event_type: str, task: typing.Optional[task.Task] = None, message: str = "") -> str:
+        """Return the log line of an event."""
         timestamp = f"[{time:2f} ms]"
 
         if task:
@@ -66,10 +101,10 @@ class CFSLogger:
         else:
             task_info = "| " + " " * 35 # Empty spacing to align columns
 
-        log_line = f"{timestamp} {event_type:<10} {task_info} | {message}"
-        self.history.append(log_line)
+        return f"{timestamp} {event_type:<10} {task_info} | {message}"
 
-        self._write(log_line)
+    def close(self):
+        """Flush the output (streamed loggers), nothing to do for the console or an appended file."""
 
     def _write(self, message: str):
         """Manages the output (CLI or file)."""
@@ -79,8 +114,12 @@ class CFSLogger:
         else:
             print(message)
 
-    def print_summary(self, tasks):
-        """Shows the simulation summary with metrics."""
+    def print_summary(self, tasks, max_rows=None, order="turnaround", sample=False):
+        """Shows the simulation summary with metrics.
+
+        With max_rows, metrics are computed with NumPy and only the max_rows tasks
+        with the largest `order` metric (or a random sample of them) are listed.
+        """
         self._write("\n" + "="*100)
         self._write(f"{'SIMULATION FINISHED - STATS':^100}")
         self._write("="*100)
@@ -89,48 +128,204 @@ class CFSLogger:
         self._write(header)
         self._write("-" * 85)
 
-        total_turnaround = 0
-        total_waiting = 0
-        total_cpu_time = 0
-        
         #avoid dividing by 0
         if not tasks:
             self._write("No task to show.")
             return
 
-        for t in tasks:
-            turnaround = t.end_time - t.arrival_time
-            
-            cpu_needed = sum(b[1] for b in t.bursts if b[0] == "CPU")
-            io_needed = sum(b[1] for b in t.bursts if b[0] == "IO")
-            
-            #waiting
-            waiting = turnaround - (cpu_needed + io_needed)
-            
-            if waiting < 0: waiting = 0.0
-
-            total_turnaround += turnaround
-            total_waiting += waiting
-            total_cpu_time += cpu_needed
-
-            start_t = t.start_time if t.start_time is not None else t.arrival_time
-            response_time = start_t - t.arrival_time
+        if max_rows is not None:
+            self._print_summary_vectorized(tasks, max_rows, order, sample)
+            return
 
-            line = f"| {t.id:<4} | {t.arrival_time:<7.2f} | {t.end_time:<9.2f} | {response_time:<13.2f} | {turnaround:<10.2f} | {waiting:<9.2f} | {cpu_needed:<7.2f} | {io_needed:<7.2f} |"
+        for t in tasks:
+            m = metrics.task_metrics(t)
+            line = f"| {t.id:<4} | {t.arrival_time:<7.2f} | {t.end_time:<9.2f} | {m['response']:<13.2f} | {m['turnaround']:<10.2f} | {m['waiting']:<9.2f} | {m['cpu']:<7.2f} | {m['io']:<7.2f} |"
             self._write(line)
 
         self._write("-" * 100)
 
-        #average
-        n = len(tasks)
-        avg_turnaround = total_turnaround / n
-        avg_waiting = total_waiting / n
-        
-        #simulation end
-        simulation_end_time = max(t.end_time for t in tasks) if tasks else 0
-        cpu_utilization = (total_cpu_time / simulation_end_time * 100) if simulation_end_time > 0 else 0
+        summary = metrics.summarize(tasks)
+        avg_turnaround = summary["avg_turnaround"]
+        avg_waiting = summary["avg_waiting"]
+        cpu_utilization = summary["cpu_utilization"]
 
         self._write(f"Average Turnaround : {avg_turnaround:.2f} ms")
         self._write(f"Average Waiting Time   : {avg_waiting:.2f} ms")
         self._write(f"Average CPU Use  : {cpu_utilization:.2f} %")
-        self._write("="*100)
\ No newline at end of file
+        self._write("="*100)
+
+    def _print_summary_vectorized(self, tasks, max_rows, order, sample):
+        from . import analysis  #NumPy is only needed for large summaries
+
+        per_task, summary = analysis.summarize(tasks)
+        rows = analysis.select_rows(per_task, max_rows, order, sample)
+
+        for i in rows:
+            t = tasks[i]
+            line = f"| {t.id:<4} | {per_task['arrival'][i]:<7.2f} | {per_task['end'][i]:<9.2f} | {per_task['response'][i]:<13.2f} | {per_task['turnaround'][i]:<10.2f} | {per_task['waiting'][i]:<9.2f} | {per_task['cpu'][i]:<7.2f} | {per_task['io'][i]:<7.2f} |"
+            self._write(line)
+        if len(rows) < len(tasks):
+            shown = "random sample" if sample else f"largest {order}"
+            self._write(f"... {len(tasks) - len(rows)} more tasks ({len(rows)} shown: {shown})")
+
+        self._write("-" * 100)
+        self._write(f"Average Turnaround : {summary['avg_turnaround']:.2f} ms")
+        self._write(f"Average Waiting Time   : {summary['avg_waiting']:.2f} ms")
+        self._write(f"Average CPU Use  : {summary['cpu_utilization']:.2f} %")
+        for name in ("response", "turnaround"):
+            percentiles = "  ".join(f"p{p}: {summary[f'p{p}_{name}']:.2f}" for p in analysis.PERCENTILES)
+            self._write(f"{name.capitalize()} percentiles : {percentiles} ms")
+        self._write("="*100)
+
+    def print_running_summary(self, running):
+        """Shows the summary of a metrics.RunningSummary: its kept tasks, averages and percentiles."""
+        self._write("\n" + "="*100)
+        self._write(f"{'SIMULATION FINISHED - STATS':^100}")
+        self._write("="*100)
+        self._write(f"| {'ID':<4} | {'Arrival':<7} | {'End':<9} | {'Response Time':<9} | {'Turnaround':<9} | {'Waiting':<9} | {'CPU Tot':<7} | {'IO Tot':<7} |")
+        self._write("-" * 85)
+        if not running.nr_tasks:
+            self._write("No task to show.")
+            return
+
+        rows = running.rows()
+        for task_id, arrival, end, m in rows:
+            self._write(f"| {task_id:<4} | {arrival:<7.2f} | {end:<9.2f} | {m['response']:<13.2f} | {m['turnaround']:<10.2f} | {m['waiting']:<9.2f} | {m['cpu']:<7.2f} | {m['io']:<7.2f} |")
+        if len(rows) < running.nr_tasks:
+            self._write(f"... {running.nr_tasks - len(rows)} more tasks ({len(rows)} shown: largest turnaround)")
+
+        summary = running.summary()
+        self._write("-" * 100)
+        self._write(f"Average Turnaround : {summary['avg_turnaround']:.2f} ms")
+        self._write(f"Average Waiting Time   : {summary['avg_waiting']:.2f} ms")
+        self._write(f"Average CPU Use  : {summary['cpu_utilization']:.2f} %")
+        sampled = f" (sample of {len(running.sample)})" if len(running.sample) < running.nr_tasks else ""
+        for name in ("response", "turnaround"):
+            percentiles = "  ".join(f"p{p}: {summary[f'p{p}_{name}']:.2f}" for p in metrics.PERCENTILES)
+            self._write(f"{name.capitalize()} percentiles{sampled} : {percentiles} ms")
+        self._write("="*100)
+
+    def print_group_summary(self, tasks):
+        """Shows CPU share and latency metrics per group, each group including its sub-groups."""
+        self._write("\n" + "="*100)
+        self._write(f"{'GROUP STATS':^100}")
+        self._write("="*100)
+
+        header = f"| {'Group':<20} | {'Tasks':<5} | {'CPU Tot':<9} | {'CPU Share':<9} | {'Avg Response':<12} | {'Avg Turnaround':<14} | {'Avg Waiting':<11} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        if not tasks:
+            self._write("No task to show.")
+            return
+
+        #path -> [tasks, cpu, response, turnaround, waiting]
+        groups = {}
+        for t in tasks:
+            m = metrics.task_metrics(t)
+
+            parts = [part for part in t.group.split("/") if part]
+            for depth in range(len(parts) + 1):
+                path = "/" + "/".join(parts[:depth])
+                acc = groups.setdefault(path, [0, 0.0, 0.0, 0.0, 0.0])
+                acc[0] += 1
+                acc[1] += t.exec_time
+                acc[2] += m["response"]
+                acc[3] += m["turnaround"]
+                acc[4] += m["waiting"]
+
+        total_cpu = groups["/"][1]
+        for path in sorted(groups):
+            n, cpu, response, turnaround, waiting = groups[path]
+            share = (cpu / total_cpu * 100) if total_cpu > 0 else 0
+            line = f"| {path:<20} | {n:<5} | {cpu:<9.2f} | {share:<8.2f}% | {response / n:<12.2f} | {turnaround / n:<14.2f} | {waiting / n:<11.2f} |"
+            self._write(line)
+
+        self._write("="*100)
+
+    def print_bandwidth_summary(self, entities):
+        """Shows quota, throttling count and throttled time of (name, CFSBandwidth) pairs."""
+        self._write("\n" + "="*100)
+        self._write(f"{'BANDWIDTH CONTROL':^100}")
+        self._write("="*100)
+
+        header = f"| {'Entity':<20} | {'Quota':<9} | {'Period':<9} | {'Throttled':<9} | {'Throttled Time':<14} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        if not entities:
+            self._write("No quota to show.")
+            return
+
+        for name, bw in entities:
+            line = f"| {name:<20} | {bw.quota:<9.2f} | {bw.period:<9.2f} | {bw.nr_throttled:<9} | {bw.throttled_time:<14.2f} |"
+            self._write(line)
+
+        self._write("="*100)
+
+    def print_placement_summary(self, results):
+        """Shows the latency of interactive and batch tasks and the throughput under each placement policy, (policy, tasks) pairs."""
+        self._write("\n" + "="*100)
+        self._write(f"{'PLACEMENT POLICIES':^100}")
+        self._write("="*100)
+
+        header = f"| {'Placement':<12} | {'Interactive Resp.':<17} | {'Interactive Turn.':<17} | {'Batch Resp.':<11} | {'Batch Turn.':<11} | {'Throughput':<16} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        for policy, tasks in results:
+            m = metrics.class_summary(tasks)
+            line = f"| {policy:<12} | {m['interactive_response']:<17.2f} | {m['interactive_turnaround']:<17.2f} | {m['batch_response']:<11.2f} | {m['batch_turnaround']:<11.2f} | {m['throughput']:<8.2f} tasks/s |"
+            self._write(line)
+
+        self._write("="*100)
+
+    def print_overhead_summary(self, results):
+        """Shows the switches, their cost and the useful CPU share for (minimum granularity, tasks, SwitchOverhead) runs."""
+        self._write("\n" + "="*100)
+        self._write(f"{'CONTEXT SWITCH OVERHEAD':^100}")
+        self._write("="*100)
+
+        header = f"| {'Min Gran.':<9} | {'Switches':<8} | {'Switch Time':<11} | {'Refill Time':<11} | {'Overhead':<9} | {'Useful CPU':<10} | {'Throughput':<16} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        for min_granularity, tasks, model in results:
+            m = metrics.overhead_summary(tasks, model)
+            line = f"| {min_granularity:<9.2f} | {m['nr_switches']:<8} | {m['switch_time']:<11.2f} | {m['refill_time']:<11.2f} | {m['overhead']:<8.2f}% | {m['useful_cpu']:<9.2f}% | {m['throughput']:<8.2f} tasks/s |"
+            self._write(line)
+
+        self._write("="*100)
+
+    def print_energy_summary(self, results):
+        """Shows energy, power and frequency next to turnaround and waiting, for (governor, tasks, DVFS) runs."""
+        self._write("\n" + "="*100)
+        self._write(f"{'ENERGY':^100}")
+        self._write("="*100)
+
+        header = f"| {'Governor':<11} | {'Energy (mJ)':<11} | {'Avg Power':<9} | {'Avg Freq':<8} | {'Turnaround':<10} | {'Waiting':<9} | {'Perf/W':<15} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        for governor, tasks, model in results:
+            m = metrics.energy_summary(tasks, model)
+            line = f"| {governor:<11} | {m['energy']:<11.2f} | {m['avg_power']:<7.3f} W | {m['avg_freq']:<4.0f} MHz | {m['avg_turnaround']:<10.2f} | {m['avg_waiting']:<9.2f} | {m['tasks_per_joule']:<7.2f} tasks/J |"
+            self._write(line)
+
+        self._write("="*100)
+
+    def print_fluid_comparison(self, comparison):
+        """Shows the metrics of the exact and the fluid engine and their relative error, {metric: (exact, fluid, error)}."""
+        self._write("\n" + "="*100)
+        self._write(f"{'FLUID APPROXIMATION':^100}")
+        self._write("="*100)
+
+        header = f"| {'Metric':<16} | {'Exact':<10} | {'Fluid':<10} | {'Error':<9} |"
+        self._write(header)
+        self._write("-" * 100)
+
+        for name, (exact, fluid, error) in comparison.items():
+            line = f"| {name:<16} | {exact:<10.2f} | {fluid:<10.2f} | {error * 100:<7.2f} % |"
+            self._write(line)
+
+        self._write("="*100)
@@ -0,0 +1,222 @@
+"""Streamed log output: block-buffered compressed text, compact binary event streams, and their lazy readers."""
+
+import argparse
+import bz2
+import collections
+import functools
+import gzip
+import lzma
+
+from . import logger
+
+DEFAULT_BLOCK = 1 << 20     #bytes written at once
+EVENT_MAGIC = b"SCFSEV\x01"
+TICKS_PER_MS = 1_000_000    #time resolution of binary streams, the one of the text log
+
+#text codecs by file suffix, zstd where the standard library has it (Python 3.14+)
+CODECS = {".gz": functools.partial(gzip.open, compresslevel=6), ".bz2": bz2.open, ".xz": lzma.open}
+try:
+    from compression import zstd
+    CODECS[".zst"] = zstd.open
+except ImportError:
+    pass
+
+Event = collections.namedtuple("Event", "time event_type task_id message")
+
+def open_text(path: str, mode: str = "rt"):
+    """Open a text file, compressed according to its suffix (.gz, .bz2, .xz, .zst)."""
+    if path.endswith(".zst") and ".zst" not in CODECS:
+        raise ValueError("zstd n'est pas disponible dans cette version de Python (3.14+)")
+    for suffix, codec in CODECS.items():
+        if path.endswith(suffix):
+            return codec(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+class BlockLogger(logger.CFSLogger):
+    """Logger streaming every line to a (compressed) text file, written in blocks of about `block` bytes.
+
+    Lines are not kept in `history`. close() writes the last block.
+    """
+
+    def __init__(self, path: str, block: int = DEFAULT_BLOCK):
+        super().__init__(output_file=path)
+        self.file = open_text(path, "wt")
+        self.block = block
+        self.pending = []
+        self.pending_size = 0
+
+    def log_event(self, time: float, event_type: str, task=None, message: str = ""):
+        self._write(self.format_event(time, event_type, task, message))
+
+    def _write(self, message: str):
+        self.pending.append(message)
+        self.pending_size += len(message) + 1
+        if self.pending_size >= self.block:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write("\n".join(self.pending) + "\n")
+            self.pending = []
+            self.pending_size = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+class EventStreamLogger(logger.CFSLogger):
+    """Logger writing events as binary records, other output (summary, Gantt chart) going to the console.
+
+    After EVENT_MAGIC and the tick rate, each record starts with a varint tag:
+    0 defines the next task index (name follows), 1 the next event type index,
+    2 + (event index << 1 | has message) is an event: varint time delta in
+    ticks, varint task index + 1 (0 without task), then the message if any.
+    Strings are a varint length and UTF-8 bytes. Events are not kept in `history`.
+    """
+
+    def __init__(self, path: str, block: int = DEFAULT_BLOCK):
+        super().__init__()
+        self.file = open(path, "wb")
+        self.block = block
+        self.out = bytearray(EVENT_MAGIC)
+        write_varint(self.out, TICKS_PER_MS)
+        self.task_index = {}
+        self.event_index = {}
+        self.last_tick = 0
+        self.nr_events = 0
+
+    def _define(self, tag: int, name: str) -> None:
+        data = name.encode()
+        write_varint(self.out, tag)
+        write_varint(self.out, len(data))
+        self.out += data
+
+    def log_event(self, time: float, event_type: str, task=None, message: str = ""):
+        out = self.out
+        event = self.event_index.get(event_type)
+        if event is None:
+            event = self.event_index[event_type] = len(self.event_index)
+            self._define(1, event_type)
+        task_ref = 0
+        if task is not None:
+            task_ref = self.task_index.get(task.id)
+            if task_ref is None:
+                task_ref = self.task_index[task.id] = len(self.task_index) + 1
+                self._define(0, str(task.id))
+
+        tick = round(time * TICKS_PER_MS)   #events come in time order: deltas are not negative
+        write_varint(out, 2 + (event << 1 | bool(message)))
+        write_varint(out, tick - self.last_tick)
+        write_varint(out, task_ref)
+        if message:
+            data = message.encode()
+            write_varint(out, len(data))
+            out += data
+        self.last_tick = tick
+        self.nr_events += 1
+        if len(out) >= self.block:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.out)
+        self.out = bytearray()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    """Return the varint at pos and the position after it, IndexError if it is cut."""
+    byte = buf[pos]
+    result = byte & 0x7F
+    shift = 7
+    while byte >= 0x80:
+        pos += 1
+        byte = buf[pos]
+        result |= (byte & 0x7F) << shift
+        shift += 7
+    return result, pos + 1
+
+def read_string(buf: bytes, pos: int) -> tuple[str, int]:
+    n, pos = read_varint(buf, pos)
+    if pos + n > len(buf):
+        raise IndexError(pos + n)
+    return buf[pos:pos + n].decode(), pos + n
+
+def is_event_stream(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(EVENT_MAGIC)) == EVENT_MAGIC
+
+def read_events(path: str, block: int = DEFAULT_BLOCK):
+    """Yield the Event records of a binary event stream, reading it block by block.
+
+    A record cut by the end of a block is parsed again once the next block is read.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(EVENT_MAGIC)) != EVENT_MAGIC:
+            raise ValueError(f"{path} n'est pas un flux d'événements simpleCFS")
+        buf = f.read(block)
+        ticks_per_ms, pos = read_varint(buf, 0)
+        tasks = [None]
+        events = []
+        tick = 0
+        while True:
+            start = pos
+            try:
+                tag, pos = read_varint(buf, pos)
+                if tag == 0:
+                    name, pos = read_string(buf, pos)
+                    tasks.append(name)
+                    continue
+                if tag == 1:
+                    name, pos = read_string(buf, pos)
+                    events.append(name)
+                    continue
+                delta, pos = read_varint(buf, pos)
+                task_ref, pos = read_varint(buf, pos)
+                message = ""
+                if tag & 1:     #tag - 2 has the message bit as lowest bit too
+                    message, pos = read_string(buf, pos)
+            except IndexError:
+                data = f.read(block)
+                if not data:
+                    if start < len(buf):
+                        raise ValueError("flux d'événements tronqué")
+                    return
+                buf = buf[start:] + data
+                pos = 0
+                continue
+            tick += delta
+            yield Event(tick / ticks_per_ms, events[(tag - 2) >> 1], tasks[task_ref], message)
+
+def format_event(event: Event) -> str:
+    """Return the log line of a decoded event (without the nice and vruntime of the text log)."""
+    task_info = f"|Task {event.task_id:<3}" if event.task_id is not None else "| " + " " * 8
+    return f"[{event.time:2f} ms] {event.event_type:<10} {task_info} | {event.message}"
+
+def read_lines(path: str):
+    """Yield the lines of a log: decoded binary events, or text lines of a (compressed) log file."""
+    if is_event_stream(path):
+        for event in read_events(path):
+            yield format_event(event)
+        return
+    with open_text(path) as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs events", description="Lire un journal simpleCFS compressé ou un flux d'événements binaire")
+    parser.add_argument("filepath", help="Journal (.gz, .bz2, .xz, .zst ou texte) ou flux d'événements (--event-stream)")
+    parser.add_argument("--head", type=int, default=None, help="N'afficher que les N premières lignes")
+    args = parser.parse_args(argv)
+
+    for i, line in enumerate(read_lines(args.filepath)):
+        if args.head is not None and i >= args.head:
+            break
+        print(line)
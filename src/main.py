@@ -1,46 +1,372 @@
 """Main script for simpleCFS."""
 
 import argparse
+import signal
+import sys
+from . import cache
 from . import cfsengine
+from . import dvfs
+from . import fastengine
+from . import flightrecorder
+from . import fluid
+from . import fuzz
+from . import gantt
+from . import group
+from . import incremental
+from . import live
 from . import logger
+from . import logstream
+from . import metrics
+from . import replicate
+from . import runqueue
+from . import schedtrace
+from . import service
+from . import simulation
+from . import smp
+from . import suite
 from . import utils
-from . import task
 
-def main():
-    parser = argparse.ArgumentParser(description="Simulateur simpleCFS")
+def float_list(text: str) -> list[float]:
+    """Parse a comma-separated list of numbers (argparse type)."""
+    try:
+        return [float(x) for x in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"liste de nombres attendue, reçu {text!r}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "replicate":
+        return replicate.main(argv[1:])
+    if argv and argv[0] == "live":
+        return live.main(argv[1:])
+    if argv and argv[0] == "fuzz":
+        return fuzz.main(argv[1:])
+    if argv and argv[0] == "events":
+        return logstream.main(argv[1:])
+    if argv and argv[0] == "import":
+        return schedtrace.main(argv[1:])
+    if argv and argv[0] == "serve":
+        return service.serve_main(argv[1:])
+    if argv and argv[0] == "submit":
+        return service.submit_main(argv[1:])
+    if argv and argv[0] == "suite":
+        return suite.main(argv[1:])
+    if argv and argv[0] == "smp":
+        return smp.main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="scfs", description="Simulateur simpleCFS")
     parser.add_argument(
-            "filepath", 
-            nargs="?", 
-            default="tests/testfiles/td1.txt", 
+            "filepath",
+            nargs="?",
+            default="tests/testfiles/td1.txt",
             help="Chemin vers le fichier de tâches (défaut: td1.txt)"
-        )    
-    args = parser.parse_args()
+        )
+    parser.add_argument(
+            "--eevdf",
+            action="store_true",
+            help="Ordonnancement EEVDF (plus petite échéance virtuelle éligible, option slice= par tâche)"
+        )
+    parser.add_argument(
+            "--max-rows",
+            type=int,
+            default=None,
+            help="Résumé vectorisé (NumPy) limité aux N tâches de plus grand temps de séjour"
+        )
+    parser.add_argument(
+            "--sample",
+            action="store_true",
+            help="Avec --max-rows, afficher un échantillon aléatoire de tâches"
+        )
+    parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ne pas lire ni écrire le cache de résultats et de fichiers de tâches analysés"
+        )
+    parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Répertoire du cache (défaut: $SCFS_CACHE_DIR ou ~/.cache/scfs)"
+        )
+    parser.add_argument(
+            "--checkpoints",
+            default=None,
+            help="Fichier de points de contrôle : reprendre la simulation précédente au premier changement du fichier de tâches"
+        )
+    parser.add_argument(
+            "--checkpoint-interval",
+            type=float,
+            default=None,
+            help=f"Intervalle entre points de contrôle en ms (défaut: durée des arrivées / {incremental.DEFAULT_CHECKPOINTS})"
+        )
+    parser.add_argument(
+            "--fast",
+            action="store_true",
+            help="Moteur optimisé (CFS sans groupes ni quotas), même ordonnancement que le moteur de référence"
+        )
+    parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Comparer le moteur optimisé au moteur de référence et signaler le premier événement différent"
+        )
+    parser.add_argument(
+            "--fluid",
+            action="store_true",
+            help="Approximation fluide (partage processeur pondéré, GPS) : seules les arrivées, fins de rafales et retours d'E/S sont des événements"
+        )
+    parser.add_argument(
+            "--compare-fluid",
+            action="store_true",
+            help="Comparer les métriques de l'approximation fluide à celles du moteur exact"
+        )
+    parser.add_argument(
+            "--samples",
+            default=None,
+            help="Échantillonner l'état de l'ordonnanceur dans ce fichier (.csv, ou .npz pour NumPy)"
+        )
+    parser.add_argument(
+            "--sample-interval",
+            type=float,
+            default=1.0,
+            help="Intervalle d'échantillonnage en ms de temps simulé (défaut: 1)"
+        )
+    parser.add_argument(
+            "--placement",
+            choices=runqueue.PLACEMENTS,
+            default="default",
+            help="Placement des tâches nouvelles et réveillées (sleeper : crédit de sommeil, start-debit : retard initial, kernel : les deux, lag : écart conservé)"
+        )
+    parser.add_argument(
+            "--compare-placements",
+            action="store_true",
+            help="Comparer latences et débit des tâches interactives et batch sous chaque politique de placement"
+        )
+    parser.add_argument(
+            "--flight-recorder",
+            type=int,
+            default=None,
+            metavar="N",
+            help="Ne garder que les N derniers événements (tampon circulaire), écrits en fin de simulation, sur SIGUSR1 ou au déclenchement d'un seuil"
+        )
+    parser.add_argument(
+            "--dump-file",
+            default=None,
+            help="Avec --flight-recorder, ajouter les vidages à ce fichier plutôt qu'à la sortie standard"
+        )
+    parser.add_argument(
+            "--trigger-nr-running",
+            type=int,
+            default=None,
+            help="Avec --flight-recorder, vider le tampon quand le nombre de tâches prêtes dépasse ce seuil"
+        )
+    parser.add_argument(
+            "--trigger-wait",
+            type=float,
+            default=None,
+            help="Avec --flight-recorder, vider le tampon quand une tâche attend le CPU plus de ce nombre de ms"
+        )
+    parser.add_argument(
+            "--log-file",
+            default=None,
+            help="Écrire le journal dans ce fichier par blocs, compressé selon l'extension (.gz, .bz2, .xz, .zst)"
+        )
+    parser.add_argument(
+            "--event-stream",
+            default=None,
+            help="Écrire les événements dans ce fichier en binaire compact (lecture : scfs events FICHIER)"
+        )
+    parser.add_argument(
+            "--gantt-export",
+            default=None,
+            help="Exporter le diagramme de Gantt à plusieurs niveaux de détail (.html zoomable, ou .svg statique)"
+        )
+    parser.add_argument(
+            "--governor",
+            choices=dvfs.GOVERNORS,
+            default=None,
+            help="Gouverneur de fréquence (DVFS) : performance, powersave ou schedutil (suivi de l'utilisation) ; remplace celui de @dvfs"
+        )
+    parser.add_argument(
+            "--compare-governors",
+            action="store_true",
+            help="Comparer énergie, puissance, séjour et attente sous chaque gouverneur de fréquence"
+        )
+    parser.add_argument(
+            "--compare-granularities",
+            type=float_list,
+            default=None,
+            help="Comparer le surcoût des changements de contexte et le CPU utile pour ces granularités minimales en ms (ex. 0.5,1,2,4)"
+        )
+    parser.add_argument(
+            "--group-events",
+            type=int,
+            default=None,
+            help="Au-delà de N arrivées ou retours d'E/S simultanés, un seul enregistrement par type d'événement dans le journal"
+        )
+    args = parser.parse_args(argv)
 
     print(f"Démarrage de simpleCFS avec le fichier : {args.filepath} ...\n")
 
-    raw_tasks_data = utils.file_to_tasks(args.filepath)
+    if args.no_cache:
+        raw_tasks_data, directives = utils.read_workload(args.filepath)
+    else:
+        raw_tasks_data, directives = cache.read_workload(args.filepath, args.cache_dir)
+    if args.governor is not None:
+        directives = directives + [("dvfs", [], {"governor": args.governor})]   #after the @dvfs lines of the file
+    with cache.paused_gc():
+        tasks = utils.build_tasks(raw_tasks_data)
 
-    tasks = []
-    for data in raw_tasks_data:
-        # data is like : ['A', 0, 0, [('CPU', 1), ('IO', 8)]]
-        new_task = task.Task(
-            task_id=data[0],
-            arrival_time=float(data[1]),
-            task_nice=int(data[2]),
-            bursts=data[3]
-        )
-        tasks.append(new_task)
+    try:
+        rqueue, logic = simulation.make_scheduler(tasks, directives, eevdf=args.eevdf, placement=args.placement)
+        renices = simulation.renice_events(tasks, directives)
+        switch_overhead = simulation.overhead_model(directives)
+        cpufreq = simulation.dvfs_model(directives)
+    except ValueError as err:
+        parser.error(str(err))
+    if args.compare_placements and type(rqueue) is not runqueue.Runqueue:
+        parser.error("les politiques de placement ne sont disponibles qu'en CFS sans groupes")
+    use_groups = isinstance(rqueue, group.GroupRunqueue)
+
+    if (args.fast or args.verify or args.fluid or args.compare_fluid) and not fastengine.supports(tasks, rqueue, logic, renices, switch_overhead, cpufreq):
+        parser.error("--fast, --verify et --fluid ne gèrent que CFS sans groupes, quotas, EEVDF, politique de placement, @renice, @overhead ni @dvfs")
+    if args.compare_granularities is not None and any(g <= 0 for g in args.compare_granularities):
+        parser.error("--compare-granularities demande des durées positives")
+    if args.fast and args.checkpoints is not None:
+        parser.error("--checkpoints n'est pas disponible avec --fast")
+    if renices and args.checkpoints is not None:
+        parser.error("--checkpoints n'est pas disponible avec des directives @renice")
+    if args.samples is not None and (args.fast or args.checkpoints is not None):
+        parser.error("--samples n'est pas disponible avec --fast ni --checkpoints")
+    if args.sample_interval <= 0:
+        parser.error("--sample-interval doit être positif")
+    triggers = args.trigger_nr_running is not None or args.trigger_wait is not None
+    if args.flight_recorder is None and (triggers or args.dump_file is not None):
+        parser.error("--dump-file, --trigger-nr-running et --trigger-wait demandent --flight-recorder")
+    if args.flight_recorder is not None and args.flight_recorder <= 0:
+        parser.error("--flight-recorder doit être positif")
+    if args.flight_recorder is not None and args.checkpoints is not None:
+        parser.error("--checkpoints n'est pas disponible avec --flight-recorder")
+    streamed = args.log_file is not None or args.event_stream is not None
+    if sum((args.flight_recorder is not None, args.log_file is not None, args.event_stream is not None)) > 1:
+        parser.error("--flight-recorder, --log-file et --event-stream sont incompatibles")
+    if streamed and args.checkpoints is not None:
+        parser.error("--checkpoints n'est pas disponible avec --log-file ni --event-stream")
+    if triggers and (args.fast or args.samples is not None):
+        parser.error("les seuils de --flight-recorder ne sont pas disponibles avec --fast ni --samples")
+    if args.fluid and (args.fast or args.checkpoints is not None or args.samples is not None or triggers):
+        parser.error("--fluid n'est pas disponible avec --fast, --checkpoints, --samples ni les seuils de --flight-recorder")
+    if args.group_events is not None and args.group_events < 0:
+        parser.error("--group-events ne peut pas être négatif")
+    if args.group_events is not None and (args.fast or args.fluid or args.flight_recorder is not None):
+        parser.error("--group-events n'est pas disponible avec --fast, --fluid ni --flight-recorder")
+    if args.verify:
+        try:
+            nb_events = fastengine.verify(raw_tasks_data, directives)
+        except fastengine.Divergence as err:
+            print(f"Divergence du moteur optimisé, {err}", file=sys.stderr)
+            raise SystemExit(1)
+        print(f"Vérification : {nb_events} événements identiques", file=sys.stderr)
 
     #simulation start
-    sim_logger = logger.CFSLogger()
-    engine = cfsengine.CFSEngine(logger=sim_logger, tasks=tasks)
-    
-    engine.run()
+    if args.flight_recorder is not None:
+        sim_logger = flightrecorder.FlightRecorder(args.flight_recorder, dump_file=args.dump_file,
+                                                   max_nr_running=args.trigger_nr_running, max_wait=args.trigger_wait)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: sim_logger.dump("SIGUSR1"))
+    elif args.log_file is not None:
+        try:
+            sim_logger = logstream.BlockLogger(args.log_file)
+        except ValueError as err:
+            parser.error(str(err))
+    elif args.event_stream is not None:
+        sim_logger = logstream.EventStreamLogger(args.event_stream)
+    else:
+        sim_logger = logger.CFSLogger()
+    sim_logger.batch_threshold = args.group_events
+    if args.fast:
+        engine = fastengine.FastCFSEngine(sim_logger, tasks, logic)
+    elif args.fluid:
+        engine = fluid.FluidEngine(sim_logger, tasks, logic)
+    else:
+        engine = cfsengine.CFSEngine(logger=sim_logger, tasks=tasks, rqueue=rqueue, logic=logic, renices=renices,
+                                     switch_overhead=switch_overhead, cpufreq=cpufreq)
+
+    #cached events are the full history of the exact engine: not for the flight recorder, streamed logs, grouped events nor the fluid engine
+    result_cache = (None if args.no_cache or args.flight_recorder is not None or streamed or args.fluid or args.group_events is not None
+                    else cache.ResultCache(args.cache_dir))
+    key = cache.cache_key(raw_tasks_data, directives, logic, rqueue)
+    entry = result_cache.get(key) if result_cache is not None and args.samples is None else None
+    if entry is not None:
+        #deterministic simulation: replay the cached events and results
+        cache.restore(entry, tasks, rqueue, sim_logger, switch_overhead, cpufreq)
+        for line in sim_logger.history:
+            sim_logger._write(line)
+    elif args.checkpoints is not None:
+        recording = incremental.run(engine, tasks, raw_tasks_data, directives,
+                                    incremental.load(args.checkpoints), args.checkpoint_interval)
+        incremental.save(recording, args.checkpoints)
+        rqueue = engine.rqueue  #restored from a checkpoint
+        switch_overhead = engine.overhead
+        cpufreq = engine.cpufreq
+        if recording.resumed_from > 0:
+            print(f"Reprise au point de contrôle de {recording.resumed_from:.2f} ms", file=sys.stderr)
+        if result_cache is not None:
+            result_cache.put(key, cache.snapshot(tasks, rqueue, sim_logger, switch_overhead, cpufreq))
+    elif args.samples is not None:
+        from . import timeseries    #NumPy is only needed for sampling
+        sampler = timeseries.Sampler(args.sample_interval)
+        timeseries.run(engine, sampler)
+        sampler.save(args.samples)
+        print(f"Échantillons : {sampler.size} (toutes les {args.sample_interval:g} ms) dans {args.samples}", file=sys.stderr)
+        if result_cache is not None:
+            result_cache.put(key, cache.snapshot(tasks, rqueue, sim_logger, switch_overhead, cpufreq))
+    elif triggers:
+        flightrecorder.run(engine, sim_logger)
+    else:
+        engine.run()
+        if result_cache is not None:
+            result_cache.put(key, cache.snapshot(tasks, rqueue, sim_logger, switch_overhead, cpufreq))
+    if args.flight_recorder is not None:
+        sim_logger.dump("end of simulation")
 
     #summary
-    sim_logger.print_summary(tasks)
+    sim_logger.print_summary(tasks, max_rows=args.max_rows, sample=args.sample)
+    if use_groups:
+        sim_logger.print_group_summary(tasks)
+
+    quotas = [(f"Task {t.id}", t.bandwidth) for t in tasks if t.bandwidth is not None]
+    if use_groups:
+        quotas += [(path, g.bandwidth) for path, g in sorted(rqueue.groups.items()) if g.bandwidth is not None]
+    if quotas:
+        sim_logger.print_bandwidth_summary(quotas)
+    if args.compare_placements:
+        sim_logger.print_placement_summary([(policy, simulation.simulate(raw_tasks_data, directives, placement=policy)[0])
+                                            for policy in runqueue.PLACEMENTS])
+    if switch_overhead is not None or args.compare_granularities is not None:
+        runs = [(logic.MIN_GRANULARITY, tasks, switch_overhead)] if switch_overhead is not None else []
+        for min_granularity in args.compare_granularities or []:
+            run_tasks, run_engine = simulation.simulate(raw_tasks_data, directives, eevdf=args.eevdf, placement=args.placement,
+                                                        params={"min_granularity": min_granularity})
+            runs.append((min_granularity, run_tasks, run_engine.overhead))
+        sim_logger.print_overhead_summary(runs)
+        if args.compare_granularities is not None:
+            best = max(runs[-len(args.compare_granularities):], key=lambda run: metrics.overhead_summary(run[1], run[2])["useful_cpu"])
+            print(f"Meilleure granularité minimale : {best[0]:g} ms", file=sys.stderr)
+    if cpufreq is not None or args.compare_governors:
+        runs = [(cpufreq.governor, tasks, cpufreq)] if cpufreq is not None else []
+        if args.compare_governors:
+            for governor in dvfs.GOVERNORS:
+                run_tasks, run_engine = simulation.simulate(raw_tasks_data, directives + [("dvfs", [], {"governor": governor})],
+                                                            eevdf=args.eevdf, placement=args.placement)
+                runs.append((governor, run_tasks, run_engine.cpufreq))
+        sim_logger.print_energy_summary(runs)
+    if args.compare_fluid:
+        sim_logger.print_fluid_comparison(fluid.compare(raw_tasks_data, directives))
+    if args.gantt_export is not None:
+        pyramid = gantt.export(sim_logger.gantt_data, args.gantt_export, title=args.filepath)
+        print(f"Diagramme de Gantt : {len(sim_logger.gantt_data)} tranches, {len(pyramid.levels)} niveaux dans {args.gantt_export}", file=sys.stderr)
     sim_logger.print_gantt()
+    sim_logger.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,163 @@
+"""Per-task and aggregate metrics of a finished simulation."""
+
+import heapq
+import random
+
+PERCENTILES = (50, 95, 99)
+RESERVOIR = 10000   #response and turnaround times kept for the percentiles of a running summary
+
+def task_metrics(t) -> dict:
+    """Return the response, turnaround, waiting, CPU and I/O times of a finished task."""
+    turnaround = t.end_time - t.arrival_time
+
+    cpu_needed = sum(b[1] for b in t.bursts if b[0] == "CPU")
+    io_needed = sum(b[1] for b in t.bursts if b[0] == "IO")
+
+    #waiting
+    waiting = turnaround - (cpu_needed + io_needed)
+    if waiting < 0: waiting = 0.0
+
+    start_t = t.start_time if t.start_time is not None else t.arrival_time
+    response_time = start_t - t.arrival_time
+
+    return {
+        "response": response_time,
+        "turnaround": turnaround,
+        "waiting": waiting,
+        "cpu": cpu_needed,
+        "io": io_needed,
+    }
+
+def summarize(tasks) -> dict:
+    """Return the averages and the CPU utilization of a finished simulation."""
+    if not tasks:
+        return {"avg_response": 0.0, "avg_turnaround": 0.0, "avg_waiting": 0.0, "cpu_utilization": 0.0}
+
+    total_response = 0
+    total_turnaround = 0
+    total_waiting = 0
+    total_cpu_time = 0
+    for t in tasks:
+        m = task_metrics(t)
+        total_response += m["response"]
+        total_turnaround += m["turnaround"]
+        total_waiting += m["waiting"]
+        total_cpu_time += m["cpu"]
+
+    n = len(tasks)
+    simulation_end_time = max(t.end_time for t in tasks)
+    cpu_utilization = (total_cpu_time / simulation_end_time * 100) if simulation_end_time > 0 else 0
+
+    return {
+        "avg_response": total_response / n,
+        "avg_turnaround": total_turnaround / n,
+        "avg_waiting": total_waiting / n,
+        "cpu_utilization": cpu_utilization,
+    }
+
+def percentile(values: list, p: float) -> float:
+    """Return the p-th percentile of sorted values, interpolated linearly like NumPy."""
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+class RunningSummary:
+    """Metrics of finished tasks folded in one at a time, so the tasks can be dropped.
+
+    Memory does not grow with the number of tasks: it keeps the sums of the
+    averages, the `max_rows` tasks with the largest turnaround and a uniform
+    sample of `reservoir` response and turnaround times for the percentiles
+    (exact up to `reservoir` tasks).
+    """
+
+    def __init__(self, max_rows: int = 20, reservoir: int = RESERVOIR, seed: int = 0):
+        self.max_rows = max_rows
+        self.reservoir = reservoir
+        self.random = random.Random(seed)
+        self.nr_tasks = 0
+        self.totals = {"response": 0.0, "turnaround": 0.0, "waiting": 0.0, "cpu": 0.0}
+        self.end_time = 0.0
+        self.top = []   #min-heap of (turnaround, seq, row)
+        self.sample = []    #(response, turnaround)
+
+    def add(self, t) -> None:
+        m = task_metrics(t)
+        for name in self.totals:
+            self.totals[name] += m[name]
+        self.end_time = max(self.end_time, t.end_time)
+
+        entry = (m["turnaround"], self.nr_tasks, (t.id, t.arrival_time, t.end_time, m))
+        if len(self.top) < self.max_rows:
+            heapq.heappush(self.top, entry)
+        elif self.top and entry[0] > self.top[0][0]:
+            heapq.heapreplace(self.top, entry)
+
+        self.nr_tasks += 1
+        if len(self.sample) < self.reservoir:
+            self.sample.append((m["response"], m["turnaround"]))
+        else:
+            j = self.random.randrange(self.nr_tasks)
+            if j < self.reservoir:
+                self.sample[j] = (m["response"], m["turnaround"])
+
+    def rows(self) -> list:
+        """Return the (id, arrival, end, metrics) of the kept tasks, largest turnaround first."""
+        return [row for _, _, row in sorted(self.top, key=lambda e: (-e[0], e[1]))]
+
+    def summary(self) -> dict:
+        """Return the averages, CPU utilization and response and turnaround percentiles."""
+        if not self.nr_tasks:
+            return {"avg_response": 0.0, "avg_turnaround": 0.0, "avg_waiting": 0.0, "cpu_utilization": 0.0}
+        summary = {
+            "avg_response": self.totals["response"] / self.nr_tasks,
+            "avg_turnaround": self.totals["turnaround"] / self.nr_tasks,
+            "avg_waiting": self.totals["waiting"] / self.nr_tasks,
+            "cpu_utilization": (self.totals["cpu"] / self.end_time * 100) if self.end_time > 0 else 0,
+        }
+        for index, name in enumerate(("response", "turnaround")):
+            values = sorted(sample[index] for sample in self.sample)
+            for p in PERCENTILES:
+                summary[f"p{p}_{name}"] = percentile(values, p)
+        return summary
+
+def is_interactive(t) -> bool:
+    """True for a task with I/O bursts, False for a CPU-only (batch) task."""
+    return any(b[0] == "IO" for b in t.bursts)
+
+def class_summary(tasks) -> dict:
+    """Return the average response and turnaround of interactive and batch tasks, and the throughput (tasks/s)."""
+    summary = {}
+    for name, members in (("interactive", [t for t in tasks if is_interactive(t)]), ("batch", [t for t in tasks if not is_interactive(t)])):
+        per_task = [task_metrics(t) for t in members]
+        n = max(len(per_task), 1)
+        summary[f"{name}_response"] = sum(m["response"] for m in per_task) / n
+        summary[f"{name}_turnaround"] = sum(m["turnaround"] for m in per_task) / n
+
+    simulation_end_time = max((t.end_time for t in tasks), default=0)
+    summary["throughput"] = (len(tasks) / simulation_end_time * 1000) if simulation_end_time > 0 else 0
+    return summary
+
+def overhead_summary(tasks, model=None) -> dict:
+    """Return the switches of an overhead model, the time they cost and the useful share of the CPU timeline."""
+    simulation_end_time = max((t.end_time for t in tasks), default=0)
+    useful = sum(t.exec_time for t in tasks)
+    lost = model.total() if model is not None else 0.0
+    return {
+        "nr_switches": model.nr_switches if model is not None else 0,
+        "switch_time": model.switch_time if model is not None else 0.0,
+        "refill_time": model.refill_time if model is not None else 0.0,
+        "overhead": (lost / (useful + lost) * 100) if useful + lost > 0 else 0,
+        "useful_cpu": (useful / simulation_end_time * 100) if simulation_end_time > 0 else 0,
+        "throughput": (len(tasks) / simulation_end_time * 1000) if simulation_end_time > 0 else 0,
+    }
+
+def energy_summary(tasks, model) -> dict:
+    """Return the energy (mJ), average power (W) and frequency (MHz) of a DVFS model, with the averages and tasks per joule."""
+    summary = summarize(tasks)
+    summary["energy"] = model.energy
+    summary["avg_power"] = model.average_power()
+    summary["avg_freq"] = model.average_freq()
+    summary["nr_changes"] = model.nr_changes
+    summary["tasks_per_joule"] = (len(tasks) / model.energy * 1000) if model.energy > 0 else 0
+    return summary
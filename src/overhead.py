@@ -0,0 +1,47 @@
+"""Context-switch and cache-refill overhead model for simpleCFS."""
+
+import math
+
+LANE = "(switch)"   #Gantt lane of the time lost in switches
+DEFAULT_DECAY = 10.0    #ms for a cache left by a task to get 63% cold
+
+class SwitchOverhead:
+    """CPU time lost each time a CPU switches to another task, before the task runs.
+
+    A switch costs `switch_cost` ms plus a cache refill of up to `refill` ms:
+    a task that last ran t ms ago on the same CPU finds 1 - exp(-t / decay)
+    of its cache cold, one that never ran or ran on another CPU all of it.
+    Picking the task that ran last on the CPU again is not a switch.
+    """
+
+    def __init__(self, switch_cost: float = 0.0, refill: float = 0.0, decay: float = DEFAULT_DECAY):
+        if switch_cost < 0 or refill < 0 or decay <= 0:
+            raise ValueError(f"switch cost and refill must not be negative, decay must be positive, got {switch_cost}/{refill}/{decay}")
+        self.switch_cost = switch_cost
+        self.refill = refill
+        self.decay = decay
+        self.last_run = {}  #task id -> (end of its last slice, cpu)
+        self.last_task = {} #cpu -> id of the last task it ran
+        self.nr_switches = 0
+        self.switch_time = 0.0
+        self.refill_time = 0.0
+
+    def cost(self, task_id, now: float, cpu: int = 0) -> float:
+        """Return the overhead of running the task on a CPU from `now`, and account for it."""
+        if self.last_task.get(cpu) == task_id:
+            return 0.0
+        self.last_task[cpu] = task_id
+        last = self.last_run.get(task_id)
+        cold = 1.0 if last is None or last[1] != cpu else -math.expm1(-(now - last[0]) / self.decay)
+        refill = self.refill * cold
+        self.nr_switches += 1
+        self.switch_time += self.switch_cost
+        self.refill_time += refill
+        return self.switch_cost + refill
+
+    def ran(self, task_id, end: float, cpu: int = 0) -> None:
+        """Record the end of a slice of the task, its cache starting to get cold."""
+        self.last_run[task_id] = (end, cpu)
+
+    def total(self) -> float:
+        return self.switch_time + self.refill_time
@@ -0,0 +1,160 @@
+"""Monte Carlo replication of a simpleCFS workload (scfs replicate)."""
+
+import argparse
+import concurrent.futures
+import math
+import os
+import random
+import statistics
+
+from . import metrics
+from . import simulation
+from . import utils
+
+METRICS = ("avg_turnaround", "avg_waiting", "cpu_utilization")
+DISTRIBUTIONS = ("exp", "uniform", "normal", "none")
+
+#two-sided 95% Student quantiles by degrees of freedom
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+def t_quantile(df: int) -> float:
+    """Return the two-sided 95% Student quantile."""
+    if df <= len(T_95):
+        return T_95[df - 1]
+    if df <= 60:
+        return 2.000
+    if df <= 120:
+        return 1.980
+    return 1.960
+
+def sample_duration(rng: random.Random, mean: float, dist: str, spread: float) -> float:
+    """Draw a burst duration of the given mean (ms, 2 decimals, at least 0.01)."""
+    if mean <= 0 or dist == "none":
+        return mean
+    if dist == "exp":
+        duration = rng.expovariate(1 / mean)
+    elif dist == "uniform":
+        duration = rng.uniform(mean * (1 - spread), mean * (1 + spread))
+    elif dist == "normal":
+        duration = rng.gauss(mean, mean * spread)
+    else:
+        raise ValueError(f"unknown distribution {dist}")
+    return max(round(duration, 2), 0.01)
+
+def resample(raw_tasks_data: list, seed: int, dist: str = "exp", spread: float = 0.2, jitter: float = 0.0) -> list:
+    """Return a copy of formatted tasks with resampled bursts and jittered arrivals."""
+    rng = random.Random(seed)
+    rows = []
+    for data in raw_tasks_data:
+        arrival = data[1] + (round(rng.uniform(0, jitter), 2) if jitter > 0 else 0)
+        bursts = [(kind, sample_duration(rng, duration, dist, spread)) for kind, duration in data[3]]
+        rows.append([data[0], arrival, data[2], bursts] + data[4:])
+    return rows
+
+def run_replica(job: tuple) -> dict:
+    """Run one replica and return its summary metrics (process pool entry point)."""
+    raw_tasks_data, directives, eevdf, seed, dist, spread, jitter = job
+    tasks, _ = simulation.simulate(resample(raw_tasks_data, seed, dist, spread, jitter), directives, eevdf)
+    return metrics.summarize(tasks)
+
+def run_replicas(jobs: list) -> list[dict]:
+    """Run replicas one after the other and return their summary metrics."""
+    return [run_replica(job) for job in jobs]
+
+def run_batch(jobs: list) -> list[dict]:
+    """Run replicas in lockstep on a BatchCFSEngine and return their summary metrics."""
+    from . import batch  #NumPy is only needed for lockstep batches
+    return batch.simulate_batch([resample(raw_tasks_data, seed, dist, spread, jitter)
+                                 for raw_tasks_data, _, _, seed, dist, spread, jitter in jobs])
+
+def confidence_interval(values: list) -> tuple[float, float]:
+    """Return the mean and the half width of its 95% confidence interval."""
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, math.inf
+    return mean, t_quantile(len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+
+def ci_reached(results: list, ci_target: float) -> bool:
+    """True when every metric has a CI width below ci_target times its mean."""
+    for name in METRICS:
+        mean, half_width = confidence_interval([r[name] for r in results])
+        if 2 * half_width > ci_target * abs(mean):
+            return False
+    return True
+
+def replicate(raw_tasks_data: list, directives: list = [], runs: int = 30, seed: int = 0, dist: str = "exp",
+              spread: float = 0.2, jitter: float = 0.0, eevdf: bool = False, workers: (None | int) = None,
+              ci_target: (None | float) = None, min_runs: int = 5, batch_size: (None | int) = None) -> list[dict]:
+    """Run up to `runs` replicas seeded seed, seed+1, ... and return their metrics in seed order.
+
+    Replicas run by batches of `workers` processes (in process for workers=1);
+    with a ci_target, it stops after the first batch reaching the target width.
+    With a batch_size, each process runs `batch_size` replicas in lockstep
+    (default CFS only, requires NumPy).
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(raw_tasks_data, directives, eevdf, seed + i, dist, spread, jitter) for i in range(runs)]
+    run = run_replicas
+    if batch_size is not None:
+        from . import batch
+        if eevdf or not batch.batchable(raw_tasks_data, directives):
+            raise ValueError("les lots synchrones ne gèrent que CFS sans groupes, quotas ni EEVDF")
+        run = run_batch
+    size = batch_size or 1
+    units = [jobs[i:i + size] for i in range(0, runs, size)]
+    results = []
+
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        done = 0
+        while done < len(units):
+            chunk = units[done:done + workers]
+            done += len(chunk)
+            for unit_results in (pool.map(run, chunk) if pool is not None else map(run, chunk)):
+                results.extend(unit_results)
+
+            if ci_target is not None and len(results) >= min_runs and ci_reached(results, ci_target):
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs replicate", description="Réplications Monte Carlo d'un fichier de tâches")
+    parser.add_argument("filepath", help="Chemin vers le fichier de tâches")
+    parser.add_argument("--runs", type=int, default=30, help="Nombre maximal de réplications (défaut: 30)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de la première réplication (défaut: 0)")
+    parser.add_argument("--dist", choices=DISTRIBUTIONS, default="exp", help="Loi des durées de rafales, de même moyenne (défaut: exp)")
+    parser.add_argument("--spread", type=float, default=0.2, help="Dispersion relative pour uniform/normal (défaut: 0.2)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Retard d'arrivée uniforme maximal en ms (défaut: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument("--ci-target", type=float, default=None, help="Arrêt quand chaque IC à 95%% est plus étroit que cette fraction de la moyenne")
+    parser.add_argument("--eevdf", action="store_true", help="Ordonnancement EEVDF")
+    parser.add_argument("--batch", type=int, default=None, metavar="N", help="Simuler les réplications par lots synchrones de N (NumPy, CFS sans groupes ni quotas)")
+    args = parser.parse_args(argv)
+    if args.batch is not None and args.batch < 1:
+        parser.error("--batch doit être positif")
+
+    raw_tasks_data, directives = utils.read_workload(args.filepath)
+    try:
+        results = replicate(raw_tasks_data, directives, runs=args.runs, seed=args.seed, dist=args.dist,
+                            spread=args.spread, jitter=args.jitter, eevdf=args.eevdf, workers=args.workers,
+                            ci_target=args.ci_target, batch_size=args.batch)
+    except ValueError as err:
+        parser.error(str(err))
+
+    print("="*100)
+    print(f"{'MONTE CARLO REPLICATION':^100}")
+    print("="*100)
+    print(f"Runs : {len(results)} / {args.runs}  (dist: {args.dist}, seeds {args.seed}..{args.seed + len(results) - 1})")
+    print(f"| {'Metric':<16} | {'Mean':<10} | {'95% CI':<23} | {'Width':<10} |")
+    print("-" * 72)
+    for name in METRICS:
+        mean, half_width = confidence_interval([r[name] for r in results])
+        ci = f"[{mean - half_width:.2f}, {mean + half_width:.2f}]"
+        print(f"| {name:<16} | {mean:<10.2f} | {ci:<23} | {2 * half_width:<10.2f} |")
+    print("="*100)
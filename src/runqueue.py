@@ -1,10 +1,33 @@
 """Runqueue implementation for simpleCFS"""
 
 from . import task
+from . import augtree
+
+#add_task() flags
+ENQUEUE_WAKEUP = 1  #task returning from I/O
+ENQUEUE_INITIAL = 2 #new task
+
+#placement policies and their kernel sched_features
+PLACEMENTS = {
+    "default": (),  #max(min vruntime of the queue, own vruntime) at every enqueue
+    "sleeper": ("GENTLE_FAIR_SLEEPERS",),
+    "start-debit": ("START_DEBIT",),
+    "kernel": ("GENTLE_FAIR_SLEEPERS", "START_DEBIT"),
+    "lag": ("PLACE_LAG",),
+}
 
 class Runqueue:
-    def __init__(self):
+    NICE_0_WEIGHT = 1024
+
+    def __init__(self, placement: str = "default", latency: float = 6.0, min_granularity: float = 0.75):
+        if placement not in PLACEMENTS:
+            raise ValueError(f"unknown placement policy {placement}")
         self.tasks = []
+        self.placement = placement
+        self.features = frozenset(PLACEMENTS[placement])
+        self.latency = latency
+        self.min_granularity = min_granularity
+        self.min_vruntime = 0.0 #monotonic, vruntime of the last picked task (placement policies)
 
     def __len__(self):
         return len(self.tasks)
@@ -17,14 +40,83 @@ class Runqueue:
         """Return sum of the weights of all the tasks in the runqueue."""
         return sum(map(task.Task.get_task_weight, self.tasks))
 
-    def add_task(self, task: task.Task):
+    def add_task(self, task: task.Task, flags: int = 0):
         """Add a new task to runqueue."""
 
-        min_vruntime = self.get_min_vruntime()
-        if min_vruntime:
-            task.vruntime = max(min_vruntime[1].vruntime, task.vruntime)
+        if self.placement != "default":
+            self.place_task(task, flags)
+        else:
+            min_vruntime = self.get_min_vruntime()
+            if min_vruntime:
+                task.vruntime = max(min_vruntime[1].vruntime, task.vruntime)
         self.tasks.append(task)
 
+    def add_tasks(self, tasks: list, flags: int = 0):
+        """Add tasks becoming runnable at the same time, like add_task() on each in order.
+
+        The queue is scanned once for its minimum vruntime and its weight, and
+        the tasks are appended in one pass: O(n + k) for k tasks instead of O(n k).
+        """
+        if self.placement != "default":
+            total_weight = self.get_total_weight_from_queue() if "START_DEBIT" in self.features else 0
+            for t in tasks:
+                self.place_task(t, flags, total_weight)
+                total_weight += t.get_task_weight()
+        else:
+            #tasks added before others of the batch are not under the minimum: it only changes from an empty queue
+            min_vruntime = self.get_min_vruntime()
+            floor = min_vruntime[1].vruntime if min_vruntime else (tasks[0].vruntime if tasks else 0.0)
+            for t in tasks:
+                t.vruntime = max(floor, t.vruntime)
+        self.tasks.extend(tasks)
+
+    def place_task(self, task: task.Task, flags: int, total_weight: (None | int) = None):
+        """Place a new or waking task relative to min_vruntime, like the kernel place_entity().
+
+        START_DEBIT puts a new task one virtual slice late, GENTLE_FAIR_SLEEPERS
+        gives a waking task up to half the latency of credit, PLACE_LAG puts it
+        back at the distance from min_vruntime it had when it went to sleep.
+        A runnable task put back in the queue keeps its vruntime.
+        `total_weight` is the weight of the queue if already known.
+        """
+        vruntime = self.min_vruntime
+        if flags & ENQUEUE_INITIAL:
+            if "START_DEBIT" in self.features:
+                vruntime += self.get_vslice(task, total_weight)
+        elif flags & ENQUEUE_WAKEUP:
+            if "PLACE_LAG" in self.features:
+                task.vruntime = vruntime - task.vlag
+                return
+            if "GENTLE_FAIR_SLEEPERS" in self.features:
+                vruntime -= self.latency / 2
+        else:
+            return
+        task.vruntime = max(task.vruntime, vruntime)
+
+    def get_vslice(self, task: task.Task, total_weight: (None | int) = None) -> float:
+        """Return the time slice of a task joining the queue, in virtual time."""
+        weight = task.get_task_weight()
+        if total_weight is None:
+            total_weight = self.get_total_weight_from_queue()
+        time_slice = max(self.latency * weight / (total_weight + weight), self.min_granularity)
+        return time_slice * self.NICE_0_WEIGHT / weight
+
+    def reweight_task(self, task: task.Task, nice: int):
+        """Renice a task not running, queued or not.
+
+        The order of the queue is by vruntime, which a renice does not change,
+        and the queue weight is summed at each pick: the task stays in place.
+        A sleeping task keeps its lag in real time (PLACE_LAG).
+        """
+        old_weight = task.get_task_weight()
+        task.nice = nice
+        if "PLACE_LAG" in self.features:
+            task.vlag = task.vlag * old_weight / task.get_task_weight()
+
+    def put_to_sleep(self, task: task.Task):
+        """Remember the lag of a task leaving the CPU for I/O (PLACE_LAG)."""
+        if "PLACE_LAG" in self.features:
+            task.vlag = self.min_vruntime - task.vruntime
 
     def pick_next_task(self):
         """Pick the next task to execute in the runqueue."""
@@ -33,5 +125,117 @@ class Runqueue:
         if not min_item:
             return None
         index_to_pop = min_item[0]
-        return self.tasks.pop(index_to_pop)
-    
+        next_task = self.tasks.pop(index_to_pop)
+        self.min_vruntime = max(self.min_vruntime, next_task.vruntime)
+        return next_task
+
+
+class EEVDFRunqueue:
+    """Runqueue picking the eligible task with the earliest virtual deadline."""
+
+    NICE_0_WEIGHT = 1024
+
+    def __init__(self, base_slice: float = 0.75):
+        self.base_slice = base_slice
+        self.tree = augtree.DeadlineTree()
+        self.sum_weight = 0
+        self.sum_weighted_vruntime = 0.0
+        self._seq = 0   #insertion counter, breaks vruntime ties in FIFO order
+
+    def __len__(self):
+        return len(self.tree)
+
+    def __contains__(self, task: task.Task):
+        return task in self.tree
+
+    @property
+    def tasks(self):
+        """Queued tasks in vruntime order."""
+        return list(self.tree)
+
+    def avg_vruntime(self):
+        """Return the weighted average vruntime (V) of the queued tasks."""
+        if self.sum_weight == 0:
+            return None
+        return self.sum_weighted_vruntime / self.sum_weight
+
+    def get_total_weight_from_queue(self):
+        """Return sum of the weights of all the tasks in the runqueue."""
+        return self.sum_weight
+
+    def get_vslice(self, task: task.Task):
+        """Return the requested slice of a task in virtual time."""
+        requested = task.slice if task.slice is not None else self.base_slice
+        return requested * self.NICE_0_WEIGHT / task.get_task_weight()
+
+    def add_task(self, task: task.Task, flags: int = 0):
+        """Add a task, placing it according to its lag, and set its virtual deadline."""
+
+        weight = task.get_task_weight()
+        avg = self.avg_vruntime()
+        vslice = self.get_vslice(task)
+
+        if avg is not None:
+            #lag is bounded, and inflated so the insertion keeps it relative to the new average
+            limit = 2 * vslice
+            lag = max(-limit, min(limit, task.vlag))
+            lag = lag * (self.sum_weight + weight) / self.sum_weight
+            task.vruntime = avg - lag
+
+        task.deadline = task.vruntime + vslice
+        self._insert(task)
+
+    def add_tasks(self, tasks: list, flags: int = 0):
+        """Add tasks becoming runnable at the same time (each placement depends on the ones before)."""
+        for t in tasks:
+            self.add_task(t, flags)
+
+    def _insert(self, task: task.Task):
+        weight = task.get_task_weight()
+        self._seq += 1
+        self.tree.insert(task, (task.vruntime, self._seq), task.deadline)
+        self.sum_weight += weight
+        self.sum_weighted_vruntime += weight * task.vruntime
+
+    def reweight_task(self, task: task.Task, nice: int):
+        """Renice a task not running, like the kernel reweight_entity().
+
+        The lag and the relative deadline of a queued task are scaled by
+        old weight / new weight, which keeps the average vruntime, and the
+        task is moved in the tree (O(log n)). A sleeping task has its lag scaled.
+        """
+        old_weight = task.get_task_weight()
+        if task not in self.tree:
+            task.nice = nice
+            task.vlag = task.vlag * old_weight / task.get_task_weight()
+            return
+
+        avg = self.avg_vruntime()
+        self._remove(task)
+        task.nice = nice
+        ratio = old_weight / task.get_task_weight()
+        task.vruntime = avg - (avg - task.vruntime) * ratio
+        task.deadline = avg + (task.deadline - avg) * ratio
+        self._insert(task)
+
+    def _remove(self, task: task.Task):
+        weight = task.get_task_weight()
+        self.tree.remove(task)
+        self.sum_weight -= weight
+        self.sum_weighted_vruntime -= weight * task.vruntime
+        if self.sum_weight == 0:
+            self.sum_weighted_vruntime = 0.0    #drop accumulated rounding errors
+
+    def pick_next_task(self):
+        """Pick the eligible task (vruntime <= V) with the earliest deadline."""
+
+        if not self.tree:
+            return None
+        avg = self.avg_vruntime()
+        next_task = self.tree.earliest_eligible(lambda t: t.vruntime <= avg)
+        if next_task is None:   #float rounding can leave nobody eligible
+            next_task = self.tree.first()
+
+        self._remove(next_task)
+        next_task.vlag = avg - next_task.vruntime
+        return next_task
@@ -0,0 +1,250 @@
+"""Streaming import of kernel scheduling traces (ftrace / perf sched script text)."""
+
+import argparse
+import heapq
+import math
+import re
+import sys
+
+from . import cfsengine
+from . import logger
+from . import metrics
+from . import simulation
+from . import utils
+
+DEFAULT_MAX_BURSTS = 256    #bursts per task before it is cut into a new segment
+DEFAULT_MAX_SPAN = 10000.0  #ms a segment can stay open, bounds the tasks held back
+DEFAULT_MAX_ROWS = 20   #tasks listed in the summary
+
+#"... 1234.567890: [sched:]sched_switch: payload", same in ftrace and perf sched script
+EVENT_RE = re.compile(r"\s(\d+\.\d+):\s+(?:sched:)?(sched_switch|sched_wakeup_new|sched_wakeup|sched_process_exit):\s+(.*)$")
+SWITCH_RE = re.compile(r"prev_comm=(.*?) prev_pid=(\d+) prev_prio=(\d+) prev_state=(\S+) ==> next_comm=(.*?) next_pid=(\d+) next_prio=(\d+)")
+SWITCH_COMPACT_RE = re.compile(r"(.*?):(\d+) \[(\d+)\] (\S+) ==> (.*?):(\d+) \[(\d+)\]")
+WAKEUP_RE = re.compile(r"comm=(.*?) pid=(\d+) prio=(\d+)")
+WAKEUP_COMPACT_RE = re.compile(r"(.*?):(\d+) \[(\d+)\]")
+EXIT_RE = re.compile(r"comm=(.*?) pid=(\d+)")
+
+def prio_to_nice(prio: int) -> int:
+    """Return the nice value of a kernel priority (real-time ones as nice -20)."""
+    return min(max(prio - 120, -20), 19)
+
+def round_ms(value: float) -> float:
+    return round(value, 3)
+
+class Segment:
+    """Bursts of a task rebuilt since its arrival (or since it was cut)."""
+
+    def __init__(self, pid: int, comm: str, index: int, arrival: float, state: str):
+        self.pid = pid
+        self.comm = comm
+        self.index = index
+        self.arrival = arrival
+        self.state = state  #"running", "runnable" or "blocked"
+        self.since = arrival    #time of the last state change
+        self.cpu = 0.0  #CPU time of the burst in progress
+        self.nice = 0
+        self.bursts = []
+
+    def task_id(self) -> str:
+        suffix = f".{self.index}" if self.index else ""
+        return f"{self.comm}-{self.pid}{suffix}"
+
+class TraceImporter:
+    """Turn trace lines into formatted tasks, released in arrival order.
+
+    A task is released when it exits, or as a segment once it has max_bursts
+    bursts or has been open for max_span ms, its next segment arriving when
+    it runs again. Memory holds open segments and the finished ones that
+    arrived after the oldest open segment.
+    """
+
+    def __init__(self, max_bursts: int = DEFAULT_MAX_BURSTS, max_span: float = DEFAULT_MAX_SPAN):
+        self.max_bursts = max_bursts
+        self.max_span = max_span
+        self.t0 = None  #first timestamp of the trace (s)
+        self.now = 0.0
+        self.open = {}  #pid -> Segment
+        self.next_index = {}    #pid -> index of its next segment, for cut tasks
+        self.open_arrivals = [] #heap of (arrival, pid, index), stale entries skipped
+        self.finished = []  #heap of (arrival, seq, row)
+        self.seq = 0
+        self.nr_events = 0
+
+    def feed(self, line: str) -> list:
+        """Read a trace line, return the tasks released by it."""
+        match = EVENT_RE.search(line)
+        if match is None:
+            return []
+        timestamp, event, payload = match.groups()
+        if self.t0 is None:
+            self.t0 = float(timestamp)
+        self.now = round_ms((float(timestamp) - self.t0) * 1000)
+        self.nr_events += 1
+
+        if event == "sched_switch":
+            fields = SWITCH_RE.search(payload) or SWITCH_COMPACT_RE.search(payload)
+            if fields is not None:
+                prev_comm, prev_pid, prev_prio, prev_state, next_comm, next_pid, next_prio = fields.groups()
+                self.switch_out(int(prev_pid), prev_comm, int(prev_prio), prev_state)
+                self.switch_in(int(next_pid), next_comm, int(next_prio))
+        elif event == "sched_process_exit":
+            fields = EXIT_RE.search(payload)
+            if fields is not None and int(fields.group(2)) in self.open:
+                self.close(self.open[int(fields.group(2))])
+                self.next_index.pop(int(fields.group(2)), None)
+        else:
+            fields = WAKEUP_RE.search(payload) or WAKEUP_COMPACT_RE.search(payload)
+            if fields is not None:
+                self.wakeup(int(fields.group(2)), fields.group(1), int(fields.group(3)))
+
+        self.cut_old_segments()
+        return self.release(self.watermark())
+
+    def finish(self) -> list:
+        """End of the trace: close every open segment, return the remaining tasks."""
+        for segment in list(self.open.values()):
+            if segment.state == "running":
+                segment.cpu += self.now - segment.since
+            self.close(segment)
+        return self.release(math.inf)
+
+    def segment(self, pid: int, comm: str, prio: int, state: str) -> Segment:
+        """Return the open segment of a task, opening one if needed."""
+        segment = self.open.get(pid)
+        if segment is None:
+            segment = Segment(pid, comm, self.next_index.pop(pid, 0), self.now, state)
+            self.open[pid] = segment
+            heapq.heappush(self.open_arrivals, (segment.arrival, pid, segment.index))
+        segment.nice = prio_to_nice(prio)
+        return segment
+
+    def wakeup(self, pid: int, comm: str, prio: int) -> None:
+        if pid == 0:
+            return
+        segment = self.segment(pid, comm, prio, "runnable")
+        if segment.state == "blocked":
+            segment.bursts.append(("IO", round_ms(self.now - segment.since)))
+            segment.state = "runnable"
+            segment.since = self.now
+
+    def switch_in(self, pid: int, comm: str, prio: int) -> None:
+        if pid == 0:    #idle
+            return
+        self.wakeup(pid, comm, prio)    #a missed wakeup is taken as happening now
+        segment = self.open[pid]
+        segment.state = "running"
+        segment.since = self.now
+
+    def switch_out(self, pid: int, comm: str, prio: int, prev_state: str) -> None:
+        segment = self.open.get(pid)
+        if pid == 0 or segment is None or segment.state != "running":
+            return  #running since before the trace: it starts at its next wakeup
+        segment.nice = prio_to_nice(prio)
+        segment.cpu += self.now - segment.since
+        segment.since = self.now
+
+        if prev_state.startswith("R"):  #preempted, the CPU burst goes on
+            segment.state = "runnable"
+        elif prev_state[0] in "XZ":     #dead
+            self.close(segment)
+            self.next_index.pop(pid, None)
+        else:   #blocked until its next wakeup
+            segment.bursts.append(("CPU", max(round_ms(segment.cpu), 0.001)))
+            segment.cpu = 0.0
+            segment.state = "blocked"
+            if len(segment.bursts) >= self.max_bursts:
+                self.cut(segment)
+
+    def close(self, segment: Segment) -> None:
+        """Release the bursts of a segment as a task ending with a CPU burst."""
+        del self.open[segment.pid]
+        if segment.cpu > 0:
+            segment.bursts.append(("CPU", max(round_ms(segment.cpu), 0.001)))
+        elif segment.bursts and segment.bursts[-1][0] == "IO":
+            segment.bursts.pop()
+        if not segment.bursts:
+            return
+        row = [segment.task_id(), segment.arrival, segment.nice, segment.bursts, {}]
+        heapq.heappush(self.finished, (segment.arrival, self.seq, row))
+        self.seq += 1
+
+    def cut(self, segment: Segment) -> None:
+        """Release a segment of a task still alive, the next one arriving when it is runnable."""
+        state = segment.state
+        self.close(segment)
+        if state == "blocked":
+            self.next_index[segment.pid] = segment.index + 1
+            return
+        following = Segment(segment.pid, segment.comm, segment.index + 1, self.now, state)
+        following.nice = segment.nice
+        self.open[segment.pid] = following
+        heapq.heappush(self.open_arrivals, (following.arrival, following.pid, following.index))
+
+    def cut_old_segments(self) -> None:
+        while self.open_arrivals and self.now - self.watermark() > self.max_span:
+            segment = self.open[self.open_arrivals[0][1]]
+            if segment.state == "running":
+                segment.cpu += self.now - segment.since
+                segment.since = self.now
+            self.cut(segment)
+
+    def watermark(self) -> float:
+        """Return the arrival of the oldest open segment: tasks arriving before it are complete."""
+        while self.open_arrivals:
+            arrival, pid, index = self.open_arrivals[0]
+            segment = self.open.get(pid)
+            if segment is not None and segment.index == index and segment.arrival == arrival:
+                return arrival
+            heapq.heappop(self.open_arrivals)
+        return math.inf
+
+    def release(self, watermark: float) -> list:
+        rows = []
+        while self.finished and self.finished[0][0] <= watermark:
+            rows.append(heapq.heappop(self.finished)[2])
+        return rows
+
+def read_trace(lines, max_bursts: int = DEFAULT_MAX_BURSTS, max_span: float = DEFAULT_MAX_SPAN):
+    """Yield the formatted tasks of trace lines, in arrival order."""
+    importer = TraceImporter(max_bursts, max_span)
+    for line in lines:
+        yield from importer.feed(line)
+    yield from importer.finish()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs import", description="Rejouer une trace d'ordonnancement du noyau (ftrace, perf sched script)")
+    parser.add_argument("tracepath", help="Trace texte (sched_switch / sched_wakeup), - pour l'entrée standard")
+    parser.add_argument("--output", default=None, help="Écrire aussi les tâches reconstruites dans ce fichier de tâches")
+    parser.add_argument("--max-bursts", type=int, default=DEFAULT_MAX_BURSTS, help=f"Rafales par segment de tâche (défaut: {DEFAULT_MAX_BURSTS})")
+    parser.add_argument("--max-span", type=float, default=DEFAULT_MAX_SPAN, help=f"Durée maximale d'un segment ouvert en ms (défaut: {DEFAULT_MAX_SPAN:g})")
+    parser.add_argument("--eevdf", action="store_true", help="Ordonnancement EEVDF")
+    parser.add_argument("--events", action="store_true", help="Afficher les événements de la simulation")
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS, help=f"Tâches de plus grand temps de séjour listées dans le résumé (défaut: {DEFAULT_MAX_ROWS})")
+    args = parser.parse_args(argv)
+
+    rqueue, logic = simulation.make_scheduler([], [], eevdf=args.eevdf)
+    #finished tasks, events and Gantt entries are not kept: memory does not grow with the trace
+    sim_logger = logger.CFSLogger(verbose=args.events, keep=False)
+    running = metrics.RunningSummary(args.max_rows)
+    engine = cfsengine.CFSEngine(logger=sim_logger, rqueue=rqueue, logic=logic)
+
+    trace = sys.stdin if args.tracepath == "-" else open(args.tracepath, "r", errors="replace")
+    output = open(args.output, "w") if args.output is not None else None
+    try:
+        rows = read_trace(trace, args.max_bursts, args.max_span)
+        if output is not None:
+            rows = write_rows(rows, output)
+        simulation.run_stream(engine, rows, running)
+    finally:
+        if trace is not sys.stdin:
+            trace.close()
+        if output is not None:
+            output.close()
+
+    sim_logger.print_running_summary(running)
+
+def write_rows(rows, output):
+    """Write formatted tasks to a task file while passing them on."""
+    for row in rows:
+        output.write(utils.format_line(row) + "\n")
+        yield row
@@ -0,0 +1,187 @@
+"""Local simulation service with a warm process pool (scfs serve / scfs submit)."""
+
+import argparse
+import concurrent.futures
+import http.client
+import http.server
+import json
+import os
+import socket
+import socketserver
+import sys
+
+from . import metrics
+from . import simulation
+from . import utils
+
+DEFAULT_PORT = 8642
+PARAMS = ("L", "min_granularity")   #CFSCalculator parameters a job can override
+
+def run_job(job: dict) -> dict:
+    """Run one simulation job and return its structured metrics (process pool entry point).
+
+    A job is {"workload": task file text, "params": {"L": .., "min_granularity": ..},
+    "eevdf": bool, "tasks": bool}; "path" can replace "workload".
+    """
+    try:
+        if "workload" in job:
+            raw_tasks_data, directives = utils.parse_lines(job["workload"].splitlines())
+        else:
+            raw_tasks_data, directives = utils.read_workload(job["path"])
+        params = job.get("params", {})
+        unknown = set(params) - set(PARAMS)
+        if unknown:
+            raise ValueError(f"unknown parameters {sorted(unknown)}")
+
+        tasks, _ = simulation.simulate(raw_tasks_data, directives, eevdf=job.get("eevdf", False), params=params)
+    except (KeyError, OSError, TypeError, ValueError) as err:
+        return {"error": f"{type(err).__name__}: {err}"}
+
+    result = {"summary": metrics.summarize(tasks)}
+    if job.get("tasks", False):
+        result["tasks"] = [{"id": t.id, "end": t.end_time} | metrics.task_metrics(t) for t in tasks]
+    return result
+
+def warm_up(_=None) -> int:
+    """Import the simulator in a pool worker."""
+    return os.getpid()
+
+class SimulationPool:
+    """Process pool kept warm between jobs."""
+
+    def __init__(self, workers: (None | int) = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        list(self.executor.map(warm_up, range(self.workers)))
+
+    def run(self, jobs: list) -> list[dict]:
+        """Run a batch of jobs, results in job order."""
+        chunksize = max(1, len(jobs) // (4 * self.workers))
+        return list(self.executor.map(run_job, jobs, chunksize=chunksize))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+class JobHandler(http.server.BaseHTTPRequestHandler):
+    """POST /jobs with a job or {"jobs": [job, ...]}, answers {"results": [...]}."""
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self.reply(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as err:
+            return self.reply(400, {"error": f"invalid JSON: {err}"})
+        jobs = body["jobs"] if isinstance(body, dict) and "jobs" in body else [body]
+        if not all(isinstance(job, dict) for job in jobs):
+            return self.reply(400, {"error": "a job must be an object"})
+        self.reply(200, {"results": self.server.pool.run(jobs)})
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self.reply(404, {"error": "not found"})
+        self.reply(200, {"workers": self.server.pool.workers})
+
+    def reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass    #one line per job would flood the output
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+def make_server(pool: SimulationPool, socket_path: (None | str) = None, port: int = DEFAULT_PORT):
+    """Return an HTTP server on a unix socket or on localhost:port."""
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, JobHandler)
+    else:
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", port), JobHandler)
+    server.pool = pool
+    return server
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+def submit(jobs: list, socket_path: (None | str) = None, port: int = DEFAULT_PORT) -> list[dict]:
+    """Send a batch of jobs to a running service and return their results."""
+    if socket_path is not None:
+        connection = UnixHTTPConnection(socket_path)
+    else:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        connection.request("POST", "/jobs", json.dumps({"jobs": jobs}), {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(payload.get("error", f"HTTP {response.status}"))
+    return payload["results"]
+
+def serve_main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs serve", description="Service local de simulation (HTTP, pool de processus)")
+    parser.add_argument("--socket", default=None, help="Écouter sur ce socket unix plutôt qu'en TCP")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port TCP sur 127.0.0.1 (défaut: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut: nombre de CPU)")
+    args = parser.parse_args(argv)
+
+    pool = SimulationPool(args.workers)
+    server = make_server(pool, args.socket, args.port)
+    where = args.socket if args.socket is not None else f"http://127.0.0.1:{args.port}"
+    print(f"Service simpleCFS prêt sur {where} ({pool.workers} processus)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown()
+        if args.socket is not None and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+def submit_main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs submit", description="Envoyer des fichiers de tâches au service de simulation")
+    parser.add_argument("filepaths", nargs="+", help="Fichiers de tâches (un travail par fichier)")
+    parser.add_argument("--socket", default=None, help="Socket unix du service")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port TCP du service (défaut: {DEFAULT_PORT})")
+    parser.add_argument("--eevdf", action="store_true", help="Ordonnancement EEVDF")
+    parser.add_argument("--latency", type=float, default=None, help="Latence d'ordonnancement L en ms")
+    parser.add_argument("--min-granularity", type=float, default=None, help="Granularité minimale en ms")
+    parser.add_argument("--tasks", action="store_true", help="Inclure les métriques par tâche")
+    args = parser.parse_args(argv)
+
+    params = {}
+    if args.latency is not None:
+        params["L"] = args.latency
+    if args.min_granularity is not None:
+        params["min_granularity"] = args.min_granularity
+
+    jobs = []
+    for filepath in args.filepaths:
+        with open(filepath, "r") as f:
+            jobs.append({"workload": f.read(), "params": params, "eevdf": args.eevdf, "tasks": args.tasks})
+
+    try:
+        results = submit(jobs, args.socket, args.port)
+    except (OSError, RuntimeError) as err:
+        parser.exit(1, f"scfs submit: {err}\n")
+    for filepath, result in zip(args.filepaths, results):
+        json.dump({"file": filepath} | result, sys.stdout)
+        print()
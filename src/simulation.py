@@ -0,0 +1,163 @@
+"""Simulation setup shared by the simpleCFS entry points."""
+
+from . import bandwidth
+from . import cfscalc
+from . import cfsengine
+from . import dvfs
+from . import group
+from . import logger
+from . import metrics
+from . import overhead
+from . import runqueue
+from . import utils
+
+def make_scheduler(tasks: list, directives: list, eevdf: bool = False, groups: bool = False, params: (None | dict) = None,
+                   placement: str = "default") -> tuple:
+    """Return the (runqueue, calculator) pair for a workload and its directives.
+
+    params are CFSCalculator keyword arguments (L, min_granularity), placement
+    a runqueue.PLACEMENTS policy (CFS without groups only).
+    """
+    params = params or {}
+
+    group_directives = [d for d in directives if d[0] == "group"]
+    use_groups = groups or bool(group_directives) or any(t.group != "/" for t in tasks)
+
+    if placement != "default" and (use_groups or eevdf):
+        raise ValueError("les politiques de placement ne sont disponibles qu'en CFS sans groupes")
+    if use_groups:
+        if eevdf:
+            raise ValueError("l'ordonnancement par groupes n'est pas disponible en mode EEVDF")
+        logic = cfscalc.GroupCalculator(**params)
+        rqueue = group.GroupRunqueue()
+        apply_directives(rqueue, group_directives)
+    elif eevdf:
+        logic = cfscalc.EEVDFCalculator(**params)
+        rqueue = runqueue.EEVDFRunqueue(base_slice=logic.MIN_GRANULARITY)
+    else:
+        logic = cfscalc.CFSCalculator(**params)
+        rqueue = runqueue.Runqueue(placement, logic.L, logic.MIN_GRANULARITY)
+
+    return rqueue, logic
+
+def apply_directives(rqueue: group.GroupRunqueue, directives: list) -> None:
+    """Apply the @group directives (weight, quota) to a group runqueue."""
+    for name, fields, options in directives:
+        if name != "group":
+            continue
+        # @group /path weight=200 quota=20 period=100
+        rqueue.set_group_weight(fields[0], int(options.get("weight", group.DEFAULT_CPU_WEIGHT)))
+        if "quota" in options:
+            rqueue.set_group_bandwidth(
+                fields[0],
+                float(options["quota"]),
+                float(options.get("period", bandwidth.DEFAULT_PERIOD))
+            )
+
+def renice_events(tasks: list, directives: list) -> list:
+    """Return the @renice directives as (time, task, nice), by time then file order."""
+    by_id = {t.id: t for t in tasks}
+    events = []
+    for name, fields, options in directives:
+        if name != "renice":
+            continue
+        # @renice A time=12 nice=-5
+        if not fields or fields[0] not in by_id:
+            raise ValueError(f"@renice : tâche inconnue {fields[0] if fields else ''}")
+        if "time" not in options or "nice" not in options:
+            raise ValueError(f"@renice {fields[0]} : time= et nice= sont requis")
+        nice = int(options["nice"])
+        if not -20 <= nice <= 19:
+            raise ValueError(f"@renice {fields[0]} : nice doit être dans [-20, 19], reçu {nice}")
+        events.append((float(options["time"]), by_id[fields[0]], nice))
+    return sorted(events, key=lambda event: event[0])
+
+def overhead_model(directives: list) -> (None | overhead.SwitchOverhead):
+    """Return the SwitchOverhead of the last @overhead directive, None without one."""
+    model = None
+    for name, fields, options in directives:
+        if name != "overhead":
+            continue
+        # @overhead switch=0.02 refill=0.5 decay=10
+        unknown = set(options) - {"switch", "refill", "decay"}
+        if unknown:
+            raise ValueError(f"@overhead : options inconnues {', '.join(sorted(unknown))}")
+        try:
+            model = overhead.SwitchOverhead(float(options.get("switch", 0)), float(options.get("refill", 0)),
+                                            float(options.get("decay", overhead.DEFAULT_DECAY)))
+        except ValueError:
+            raise ValueError("@overhead : switch= et refill= doivent être positifs ou nuls, decay= strictement positif")
+    return model
+
+def dvfs_model(directives: list) -> (None | dvfs.DVFS):
+    """Return the DVFS model of the @dvfs and @opp directives, None without any."""
+    governor, idle_power, opps, found = "schedutil", dvfs.DEFAULT_IDLE_POWER, [], False
+    for name, fields, options in directives:
+        # @dvfs governor=schedutil idle=0.05
+        # @opp freq=1600 power=0.75
+        try:
+            if name == "dvfs":
+                governor = options.get("governor", governor)
+                idle_power = float(options.get("idle", idle_power))
+            elif name == "opp":
+                opps.append((float(options["freq"]), float(options["power"])))
+            else:
+                continue
+        except (KeyError, ValueError):
+            raise ValueError(f"@{name} : options invalides {sorted(options.items())} (@opp freq= power=, @dvfs governor= idle=)")
+        found = True
+    if not found:
+        return None
+    if governor not in dvfs.GOVERNORS:
+        raise ValueError(f"@dvfs : gouverneur inconnu {governor} (choix : {', '.join(dvfs.GOVERNORS)})")
+    try:
+        return dvfs.DVFS(governor, opps, idle_power)
+    except ValueError:
+        raise ValueError("@opp : les fréquences doivent être positives et les puissances positives ou nulles")
+
+def simulate(raw_tasks_data: list, directives: list = [], eevdf: bool = False, sim_logger=None, params: (None | dict) = None,
+             placement: str = "default") -> tuple:
+    """Build the tasks of a workload, run them and return (tasks, finished engine)."""
+
+    tasks = utils.build_tasks(raw_tasks_data)
+    rqueue, logic = make_scheduler(tasks, directives, eevdf, params=params, placement=placement)
+    if sim_logger is None:
+        sim_logger = logger.CFSLogger(verbose=False)
+
+    engine = cfsengine.CFSEngine(logger=sim_logger, tasks=tasks, rqueue=rqueue, logic=logic,
+                                 renices=renice_events(tasks, directives), switch_overhead=overhead_model(directives), cpufreq=dvfs_model(directives))
+    engine.run()
+    return tasks, engine
+
+def run_stream(engine: cfsengine.CFSEngine, raw_tasks_stream, running: (None | metrics.RunningSummary) = None) -> list:
+    """Run an engine on formatted tasks coming in arrival order, return the tasks.
+
+    Simulated time only advances up to the last arrival read, so the stream
+    is never held in memory as a whole. With a running summary, finished
+    tasks are folded into it and dropped, and no task is returned.
+    """
+    tasks = []
+    kept = 64   #tasks left after the last sweep: sweeping at twice as many is amortized O(1) per task
+    engine.start()
+    for data in raw_tasks_stream:
+        new_task = utils.build_tasks([data])[0]
+        tasks.append(new_task)
+        engine.add_task(new_task)
+        engine.run_until(new_task.arrival_time)
+        if running is not None and len(tasks) >= 2 * kept:
+            tasks = fold_finished(tasks, running)
+            kept = max(64, len(tasks))
+    engine.run_until(float("inf"))
+    if running is not None:
+        return fold_finished(tasks, running)
+    return tasks
+
+def fold_finished(tasks: list, running: metrics.RunningSummary) -> list:
+    """Add the finished tasks to a running summary, return the others."""
+    left = []
+    for t in tasks:
+        if not t.is_finished():
+            left.append(t)
+        else:
+            running.add(t)
+    return left
@@ -0,0 +1,319 @@
+"""Multi-CPU model with per-CPU runqueues, run sequentially or as a conservative parallel discrete-event simulation (scfs smp)."""
+
+import argparse
+import bisect
+import collections
+import math
+import multiprocessing
+
+from . import cfscalc
+from . import cfsengine
+from . import logger
+from . import runqueue
+from . import utils
+
+#an I/O wakeup sent to another CPU: the task starts its I/O at `order[0]` and is runnable there at `return_time`
+Message = collections.namedtuple("Message", "return_time order cpu task")
+
+def io_key(entry: tuple) -> tuple:
+    """I/O queue order of a (return_time, task, (start time, cpu, seq)) entry, the same whichever CPU started the I/O."""
+    return entry[0], entry[2]
+
+def affinity(raw_tasks_data: list, nr_cpus: int) -> dict:
+    """Return the CPUs of the successive CPU bursts of each task: its cpus= option ("0,2"), else task index % nr_cpus."""
+    result = {}
+    for i, data in enumerate(raw_tasks_data):
+        option = (data[4] if len(data) > 4 else {}).get("cpus")
+        try:
+            cpus = [int(c) for c in option.split(",")] if option else [i % nr_cpus]
+        except ValueError:
+            raise ValueError(f"tâche {data[0]} : cpus={option} n'est pas une liste de CPU")
+        if any(not 0 <= c < nr_cpus for c in cpus):
+            raise ValueError(f"tâche {data[0]} : cpus={option} hors de [0, {nr_cpus - 1}]")
+        result[data[0]] = cpus
+    return result
+
+def burst_cpu(task, cpus: list, index: int) -> (None | int):
+    """Return the CPU of the burst at `index` if it is a CPU burst."""
+    if index >= len(task.bursts) or task.bursts[index][0] != "CPU":
+        return None
+    nr_cpu_bursts = sum(1 for kind, _ in task.bursts[:index] if kind == "CPU")
+    return cpus[nr_cpu_bursts % len(cpus)]
+
+def lookahead(tasks: list, cpus_of: dict) -> float:
+    """Return the shortest I/O burst after which a task changes CPU (inf if none does).
+
+    Such an I/O is the only way a CPU affects another one, so events of a CPU
+    before t + lookahead cannot depend on what other CPUs do after t.
+    """
+    shortest = math.inf
+    for t in tasks:
+        cpus = cpus_of[t.id]
+        cpu = cpus[0]
+        for i, (kind, duration) in enumerate(t.bursts):
+            next_cpu = burst_cpu(t, cpus, i + 1)
+            if kind == "IO" and next_cpu is not None and next_cpu != cpu:
+                shortest = min(shortest, duration)
+            if next_cpu is not None:
+                cpu = next_cpu
+    return shortest
+
+class CPULogger(logger.CFSLogger):
+    """Logger of one CPU keeping its events and Gantt entries without writing them."""
+
+    def _write(self, message: str):
+        pass
+
+class CPUEngine(cfsengine.CFSEngine):
+    """CFSEngine of one CPU of the model.
+
+    A task whose next CPU burst belongs to another CPU leaves when its I/O
+    starts, as a Message to that CPU. Its vruntime is made relative to the
+    min_vruntime of the runqueue it leaves, and relative to the one it joins
+    when it wakes up. The I/O queue is kept in io_key order, so ties do not
+    depend on when messages are delivered.
+    """
+
+    def __init__(self, cpu: int, tasks: list, cpus_of: dict, params: (None | dict) = None, keep_events: bool = True):
+        logic = cfscalc.CFSCalculator(**(params or {}))
+        super().__init__(CPULogger(verbose=keep_events), tasks, runqueue.Runqueue("default", logic.L, logic.MIN_GRANULARITY), logic)
+        self.cpu = cpu
+        self.cpus_of = cpus_of
+        self.owned = {t.id: t for t in tasks}  #tasks on this CPU, in its queues or not arrived yet
+        self.migrated = set()   #ids of tasks in I/O coming from another CPU
+        self.outbox = []
+        self.seq = 0
+
+    def start_io(self, task, return_time: float):
+        order = (self.time, self.cpu, self.seq)
+        self.seq += 1
+        next_cpu = burst_cpu(task, self.cpus_of[task.id], task.current_burst + 1)
+        if next_cpu is None or next_cpu == self.cpu:
+            bisect.insort(self.waiting_for_io, (return_time, task, order), key=io_key)
+            return
+        task.vruntime -= self.rqueue.min_vruntime
+        del self.owned[task.id]
+        self.outbox.append(Message(return_time, order, next_cpu, task))
+
+    def receive(self, message: Message):
+        """Take a task whose I/O started on another CPU."""
+        task = message.task
+        self.owned[task.id] = task
+        self.migrated.add(task.id)
+        bisect.insort(self.waiting_for_io, (message.return_time, task, message.order), key=io_key)
+
+    def enqueue_task(self, task, throttled: bool = False, flags: int = 0):
+        if task.id in self.migrated:
+            self.migrated.discard(task.id)
+            task.vruntime += self.rqueue.min_vruntime
+        super().enqueue_task(task, throttled, flags)
+
+    def enqueue_tasks(self, tasks: list, flags: int = 0):
+        for task in tasks:
+            if task.id in self.migrated:
+                self.migrated.discard(task.id)
+                task.vruntime += self.rqueue.min_vruntime
+        super().enqueue_tasks(tasks, flags)
+
+    def take_outbox(self) -> list:
+        outbox, self.outbox = self.outbox, []
+        return outbox
+
+    def result(self) -> tuple:
+        """Return (cpu, tasks, events, Gantt entries, time) at the end of the simulation."""
+        return self.cpu, list(self.owned.values()), self.logger.history, self.logger.gantt_data, self.time
+
+class Result:
+    """Tasks of a finished multi-CPU simulation (input order) and the events, Gantt entries and last event time of each CPU."""
+
+    def __init__(self, tasks: list, cpu_results: list, nr_windows: int = 0, window: float = math.inf):
+        self.cpus = sorted(cpu_results, key=lambda r: r[0])
+        by_id = {t.id: t for _, owned, _, _, _ in self.cpus for t in owned}
+        self.tasks = [by_id[t.id] for t in tasks]
+        self.events = [events for _, _, events, _, _ in self.cpus]
+        self.gantt = [gantt for _, _, _, gantt, _ in self.cpus]
+        self.nr_windows = nr_windows
+        self.window = window
+
+def build(raw_tasks_data: list, nr_cpus: int) -> tuple:
+    """Return the tasks, their CPUs and the tasks starting on each CPU."""
+    if nr_cpus < 1:
+        raise ValueError("il faut au moins un CPU")
+    tasks = utils.build_tasks(raw_tasks_data)
+    if any(t.bandwidth is not None or t.group != "/" for t in tasks):
+        raise ValueError("le modèle multi-CPU ne gère ni groupes ni quotas")
+    cpus_of = affinity(raw_tasks_data, nr_cpus)
+    by_cpu = [[t for t in tasks if cpus_of[t.id][0] == cpu] for cpu in range(nr_cpus)]
+    return tasks, cpus_of, by_cpu
+
+def run_sequential(raw_tasks_data: list, nr_cpus: int, params: (None | dict) = None, keep_events: bool = True) -> Result:
+    """Run every CPU in one event loop, taking the earliest event of all CPUs (lowest CPU first on ties), messages delivered at once."""
+    tasks, cpus_of, by_cpu = build(raw_tasks_data, nr_cpus)
+    engines = [CPUEngine(cpu, by_cpu[cpu], cpus_of, params, keep_events) for cpu in range(nr_cpus)]
+    for engine in engines:
+        engine.start()
+    next_events = {engine.cpu: engine.next_event() for engine in engines}    #only changed by the events of the CPU and its messages
+    while True:
+        candidates = [(event[0], cpu) for cpu, event in next_events.items() if event is not None]
+        if not candidates:
+            break
+        _, cpu = min(candidates)
+        engines[cpu].handle_event(next_events[cpu])
+        for message in engines[cpu].take_outbox():
+            engines[message.cpu].receive(message)
+            next_events[message.cpu] = engines[message.cpu].next_event()
+        next_events[cpu] = engines[cpu].next_event()
+    return Result(tasks, [engine.result() for engine in engines])
+
+def run_partition(conn, cpus: list, by_cpu: dict, cpus_of: dict, params: (None | dict), keep_events: bool) -> None:
+    """Worker process: run the engines of a group of CPUs window by window, on the orders of the coordinator.
+
+    Each order is (window end, messages to these CPUs), answered by (messages
+    to other CPUs, next event time); None ends the run and is answered by the
+    results of the CPUs.
+    """
+    engines = {cpu: CPUEngine(cpu, by_cpu[cpu], cpus_of, params, keep_events) for cpu in cpus}
+    for engine in engines.values():
+        engine.start()
+    while True:
+        order = conn.recv()
+        if order is None:
+            conn.send([engine.result() for engine in engines.values()])
+            conn.close()
+            return
+        window_end, inbox = order
+        for message in inbox:
+            engines[message.cpu].receive(message)
+        outbox = []
+        next_time = math.inf
+        for engine in engines.values():
+            next_event = engine.run_until(window_end)
+            outbox += engine.take_outbox()
+            if next_event is not None:
+                next_time = min(next_time, next_event[0])
+        conn.send((outbox, next_time))
+
+def run_parallel(raw_tasks_data: list, nr_cpus: int, workers: int, params: (None | dict) = None, keep_events: bool = True) -> Result:
+    """Run groups of CPUs in `workers` processes, synchronized by windows of the lookahead.
+
+    In a window [t, t + lookahead) every CPU processes its events on its own:
+    the messages it sends arrive after the window, and are handed to their CPU
+    before the next one. Windows start at the next event or message, so idle
+    time is skipped. The result is the one of run_sequential().
+    """
+    tasks, cpus_of, by_cpu = build(raw_tasks_data, nr_cpus)
+    window = lookahead(tasks, cpus_of)
+    if window <= 0:
+        raise ValueError("une E/S de durée nulle fait changer une tâche de CPU : aucune fenêtre d'anticipation possible")
+    workers = max(1, min(workers, nr_cpus))
+    groups = [list(range(nr_cpus))[i::workers] for i in range(workers)]
+    owner = {cpu: i for i, group in enumerate(groups) for cpu in group}
+
+    processes, conns = [], []
+    for group in groups:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_partition, daemon=True,
+                                          args=(child_conn, group, {cpu: by_cpu[cpu] for cpu in group}, cpus_of, params, keep_events))
+        process.start()
+        child_conn.close()
+        processes.append(process)
+        conns.append(parent_conn)
+
+    try:
+        pending = []
+        start = min((t.arrival_time for t in tasks), default=math.inf)
+        nr_windows = 0
+        while start < math.inf:
+            window_end = start + window
+            inboxes = [[] for _ in groups]
+            for message in pending:
+                inboxes[owner[message.cpu]].append(message)
+            for conn, inbox in zip(conns, inboxes):
+                conn.send((window_end, inbox))
+            pending = []
+            start = math.inf
+            for conn in conns:
+                outbox, next_time = conn.recv()
+                pending += outbox
+                start = min(start, next_time)
+            start = min([start] + [message.return_time for message in pending])
+            nr_windows += 1
+
+        cpu_results = []
+        for conn in conns:
+            conn.send(None)
+            cpu_results += conn.recv()
+    finally:
+        for process in processes:
+            process.join()
+    return Result(tasks, cpu_results, nr_windows, window)
+
+def simulate(raw_tasks_data: list, nr_cpus: int, workers: int = 1, params: (None | dict) = None, keep_events: bool = True) -> Result:
+    """Run the multi-CPU model, in parallel for more than one worker."""
+    if workers > 1 and nr_cpus > 1:
+        return run_parallel(raw_tasks_data, nr_cpus, workers, params, keep_events)
+    return run_sequential(raw_tasks_data, nr_cpus, params, keep_events)
+
+def differences(a: Result, b: Result) -> list[str]:
+    """Return what differs between two runs: task results, events or Gantt entries of a CPU."""
+    found = []
+    for x, y in zip(a.tasks, b.tasks):
+        if (x.start_time, x.end_time, x.exec_time, x.vruntime) != (y.start_time, y.end_time, y.exec_time, y.vruntime):
+            found.append(f"task {x.id}")
+    for cpu, (x, y) in enumerate(zip(a.events, b.events)):
+        if x != y:
+            found.append(f"events of CPU {cpu}")
+    for cpu, (x, y) in enumerate(zip(a.gantt, b.gantt)):
+        if x != y:
+            found.append(f"Gantt entries of CPU {cpu}")
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs smp", description="Simuler plusieurs CPU, chacun avec sa file, éventuellement en parallèle")
+    parser.add_argument("filepath", help="Chemin vers le fichier de tâches (option cpus=0,2 : CPU des rafales CPU successives)")
+    parser.add_argument("--cpus", type=int, default=2, help="Nombre de CPU simulés (défaut: 2)")
+    parser.add_argument("--workers", type=int, default=1, help="Processus de simulation, chacun pour un groupe de CPU (défaut: 1, séquentiel)")
+    parser.add_argument("--verify", action="store_true", help="Comparer au déroulement séquentiel")
+    parser.add_argument("--events", action="store_true", help="Afficher les événements de chaque CPU")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers doit être positif")
+
+    raw_tasks_data, directives = utils.read_workload(args.filepath)
+    if directives:
+        parser.error("le modèle multi-CPU ne gère pas les directives (@group, @renice, ...)")
+    try:
+        result = simulate(raw_tasks_data, args.cpus, args.workers, keep_events=args.events or args.verify)
+        reference = run_sequential(raw_tasks_data, args.cpus) if args.verify else None
+    except ValueError as err:
+        parser.error(str(err))
+
+    sim_logger = logger.CFSLogger()
+    if args.events:
+        for cpu, events in enumerate(result.events):
+            for line in events:
+                sim_logger._write(f"cpu {cpu} {line}")
+    sim_logger.print_summary(result.tasks)
+
+    print("="*100)
+    print(f"{'CPUS':^100}")
+    print("="*100)
+    print(f"| {'CPU':<4} | {'Busy':<9} | {'Use':<8} | {'Slices':<7} | {'Tasks':<6} |")
+    print("-" * 100)
+    end = max((t.end_time for t in result.tasks), default=0.0)
+    for cpu, gantt in enumerate(result.gantt):
+        busy = sum(stop - start for _, start, stop in gantt)
+        use = (busy / end * 100) if end > 0 else 0
+        print(f"| {cpu:<4} | {busy:<9.2f} | {use:<6.2f} % | {len(gantt):<7} | {len({g[0] for g in gantt}):<6} |")
+    print("="*100)
+    if args.workers > 1 and args.cpus > 1:
+        print(f"Fenêtres : {result.nr_windows} (anticipation {result.window:g} ms)")
+    if reference is not None:
+        found = differences(reference, result)
+        if found:
+            print(f"Différences avec le déroulement séquentiel : {', '.join(found)}")
+            raise SystemExit(1)
+        print(f"Identique au déroulement séquentiel : {sum(map(len, result.events))} événements")
+
+    sim_logger.gantt_data = [entry for gantt in result.gantt for entry in gantt]
+    sim_logger.print_gantt()
@@ -0,0 +1,138 @@
+"""Many workload files run in parallel, with a consolidated metrics table (scfs suite)."""
+
+import argparse
+import concurrent.futures
+import csv
+import glob
+import json
+import os
+
+from . import logstream
+from . import logger
+from . import metrics
+from . import runqueue
+from . import simulation
+from . import utils
+
+COLUMNS = ("file", "nr_tasks", "avg_response", "avg_turnaround", "avg_waiting", "cpu_utilization", "throughput", "end_time", "error")
+
+def expand(patterns: list) -> list[str]:
+    """Return the files matching the paths or glob patterns (** for subdirectories), in order and without duplicates."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise ValueError(f"aucun fichier ne correspond à {pattern}")
+        paths += [p for p in matches if os.path.isfile(p) or not glob.has_magic(pattern)]
+    return list(dict.fromkeys(paths))
+
+def log_names(paths: list) -> list[str]:
+    """Return a distinct log file name for each workload file."""
+    names, seen = [], {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(f"{stem}.log" if seen[stem] == 1 else f"{stem}-{seen[stem]}.log")
+    return names
+
+def run_file(job: tuple) -> dict:
+    """Simulate one workload file and return its metrics, or its error (process pool entry point).
+
+    With a log path, the events, summary and Gantt chart of the run go to that
+    file only; otherwise nothing is logged.
+    """
+    path, log_path, eevdf, placement = job
+    result = {"file": path, "error": None}
+    try:
+        raw_tasks_data, directives = utils.read_workload(path)
+        sim_logger = logstream.BlockLogger(log_path) if log_path is not None else logger.CFSLogger(verbose=False)
+        tasks, engine = simulation.simulate(raw_tasks_data, directives, eevdf=eevdf, sim_logger=sim_logger, placement=placement)
+    except (OSError, ValueError, IndexError) as err:
+        result["error"] = f"{type(err).__name__}: {err}"
+        return result
+
+    if log_path is not None:
+        sim_logger.print_summary(tasks)
+        sim_logger.print_gantt()
+        sim_logger.close()
+    result.update(metrics.summarize(tasks))
+    result["nr_tasks"] = len(tasks)
+    result["throughput"] = metrics.class_summary(tasks)["throughput"]
+    result["end_time"] = max((t.end_time for t in tasks), default=0.0)
+    if engine.overhead is not None:
+        result.update({f"overhead_{k}": v for k, v in metrics.overhead_summary(tasks, engine.overhead).items()})
+    if engine.cpufreq is not None:
+        energy = metrics.energy_summary(tasks, engine.cpufreq)
+        result.update({k: energy[k] for k in ("energy", "avg_power", "avg_freq", "tasks_per_joule")})
+    return result
+
+def run_suite(paths: list, workers: (None | int) = None, eevdf: bool = False, placement: str = "default",
+              log_dir: (None | str) = None) -> list[dict]:
+    """Run every file in a pool of `workers` processes (in process for 1), return the results in file order."""
+    workers = workers or os.cpu_count() or 1
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+        log_paths = [os.path.join(log_dir, name) for name in log_names(paths)]
+        for log_path in log_paths:
+            if os.path.exists(log_path):
+                os.remove(log_path)     #the logger appends
+    else:
+        log_paths = [None] * len(paths)
+    jobs = [(path, log_path, eevdf, placement) for path, log_path in zip(paths, log_paths)]
+
+    if workers == 1 or len(jobs) == 1:
+        return [run_file(job) for job in jobs]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        #a few chunks per worker: fewer round trips for hundreds of small files
+        return list(pool.map(run_file, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+def write_results(results: list, filename: str) -> None:
+    """Write the results as CSV (.csv) or else as JSON."""
+    if filename.endswith(".csv"):
+        fields = list(COLUMNS) + sorted({k for r in results for k in r} - set(COLUMNS))
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(filename, "w") as f:
+            json.dump(results, f, indent=1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scfs suite", description="Simuler de nombreux fichiers de tâches en parallèle")
+    parser.add_argument("patterns", nargs="+", help="Fichiers de tâches ou motifs glob (entre guillemets, ** pour les sous-répertoires)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument("--eevdf", action="store_true", help="Ordonnancement EEVDF")
+    parser.add_argument("--placement", choices=runqueue.PLACEMENTS, default="default", help="Placement des tâches nouvelles et réveillées")
+    parser.add_argument("--log-dir", default=None, help="Écrire le journal de chaque simulation dans ce répertoire (un fichier par simulation)")
+    parser.add_argument("--results", default=None, help="Écrire les métriques de chaque fichier en JSON (ou CSV pour un .csv)")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers doit être positif")
+
+    try:
+        paths = expand(args.patterns)
+    except ValueError as err:
+        parser.error(str(err))
+    results = run_suite(paths, args.workers, args.eevdf, args.placement, args.log_dir)
+
+    print("="*100)
+    print(f"{'SIMULATION SUITE':^100}")
+    print("="*100)
+    print(f"| {'File':<30} | {'Tasks':<6} | {'Response':<8} | {'Turnaround':<10} | {'Waiting':<8} | {'CPU Use':<8} | {'Throughput':<10} |")
+    print("-" * 100)
+    for r in results:
+        name = r["file"] if len(r["file"]) <= 30 else "..." + r["file"][-27:]
+        if r["error"] is not None:
+            print(f"| {name:<30} | {r['error'][:60]}")
+            continue
+        print(f"| {name:<30} | {r['nr_tasks']:<6} | {r['avg_response']:<8.2f} | {r['avg_turnaround']:<10.2f} | {r['avg_waiting']:<8.2f} | {r['cpu_utilization']:<6.2f} % | {r['throughput']:<10.2f} |")
+    print("="*100)
+
+    failed = sum(r["error"] is not None for r in results)
+    print(f"Fichiers : {len(results)}, échecs : {failed}")
+    if args.results is not None:
+        write_results(results, args.results)
+        print(f"Résultats dans {args.results}")
+    if failed:
+        raise SystemExit(1)
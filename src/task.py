@@ -7,9 +7,9 @@ PRIO_TO_WEIGHT = [88761, 71755, 56483, 46273, 36291, 29154, 23254, 18705, 14949,
                   110, 87, 70, 56, 45, 36, 29, 23, 18, 15]
 
 class Task:
-    def __init__(self, task_id: str, arrival_time: float, task_nice: int, bursts: list[tuple]):
+    def __init__(self, task_id: str, arrival_time: float, task_nice: int, bursts: list[tuple], requested_slice: (None | float) = None, group: str = "/"):
         self.id: str = task_id
-        self.nice: int = task_nice
+        self.nice: int = task_nice  #sets the cached weight too
         self.vruntime: float = 0.0
         self.state: (None | str) = None
         self.arrival_time = arrival_time
@@ -17,6 +17,18 @@ class Task:
         self.current_burst: int = 0
         self.time_left_cur_burst = self.bursts[0][1] if self.bursts else 0.0
         self.exec_time = 0.0    #cumulative time on CPU
+
+        #for EEVDF
+        self.slice = requested_slice    #requested time slice, None for the default one
+        self.vlag = 0.0
+        self.deadline = 0.0
+
+        #for group scheduling
+        self.group = group  #group path, ex: "/web/frontend"
+        self.sched_group = None #TaskGroup, set when first enqueued
+
+        #for bandwidth control
+        self.bandwidth = None   #CFSBandwidth, None for no quota
         
         #for logs
         self.start_time = None
@@ -25,7 +37,17 @@ class Task:
     def is_finished(self):
         return self.current_burst == len(self.bursts)
     
+    @property
+    def nice(self) -> int:
+        return self._nice
+
+    @nice.setter
+    def nice(self, value: int):
+        """Set the nice value and the weight read at every scheduling decision."""
+        self._nice = value
+        self.weight = PRIO_TO_WEIGHT[value+20]
+
     def get_task_weight(self):
-        return PRIO_TO_WEIGHT[self.nice+20]
+        return self.weight
 
     
\ No newline at end of file
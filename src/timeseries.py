@@ -0,0 +1,89 @@
+"""Fixed-interval samples of the scheduler state over simulated time (requires NumPy)."""
+
+import math
+import operator
+
+import numpy as np
+
+from . import group
+from . import task
+
+VRUNTIME = operator.attrgetter("vruntime")
+FIELDS = ("time", "nr_running", "queued_weight", "vruntime_spread", "cpu_busy", "io_depth", "nr_throttled")
+
+def queued_tasks(rqueue) -> list:
+    """Return the runnable tasks waiting in a runqueue (tasks of throttled groups excluded)."""
+    if isinstance(rqueue, group.GroupRunqueue):
+        return [t for g in rqueue.groups.values() if not any(a.throttled for a in g.ancestors())
+                for t in g.rq.tasks if isinstance(t, task.Task)]
+    return rqueue.tasks
+
+class Sampler:
+    """State of an engine every `interval` ms, one column per field in a preallocated array.
+
+    Sample k is the state at k * interval once the events of that time are
+    processed. The state only changes at events, so a run of samples between
+    two events is filled at once; the array doubles when it is full.
+    """
+
+    def __init__(self, interval: float, capacity: int = 1024):
+        if interval <= 0:
+            raise ValueError(f"the sampling interval must be positive, got {interval}")
+        self.interval = interval
+        self.size = 0
+        self.data = np.zeros((len(FIELDS), max(capacity, 1)))
+
+    def next_time(self) -> float:
+        return self.size * self.interval
+
+    def record(self, engine, until: (None | float) = None) -> None:
+        """Record the current state of the engine for every sample time before `until` (one sample if None)."""
+        count = 1
+        if until is not None:
+            count = max(math.ceil(until / self.interval) - self.size, 1)
+            while count > 1 and (self.size + count - 1) * self.interval >= until:
+                count -= 1  #rounding of until / interval
+        while self.size + count > self.data.shape[1]:
+            self.data = np.concatenate([self.data, np.zeros_like(self.data)], axis=1)
+
+        queued = queued_tasks(engine.rqueue)
+        vruntimes = list(map(VRUNTIME, queued))
+        state = [
+            len(engine.rqueue),
+            sum(map(task.Task.get_task_weight, queued)),
+            max(vruntimes) - min(vruntimes) if vruntimes else 0.0,
+            engine.current_task is not None,
+            len(engine.waiting_for_io),
+            len(engine.throttled),
+        ]
+        window = slice(self.size, self.size + count)
+        self.data[0, window] = np.arange(self.size, self.size + count) * self.interval
+        self.data[1:, window] = np.array(state, dtype=np.float64)[:, None]
+        self.size += count
+
+    def columns(self) -> dict:
+        """Return the recorded samples as {field: array}."""
+        return {name: self.data[i, :self.size] for i, name in enumerate(FIELDS)}
+
+    def to_csv(self, filename: str) -> None:
+        np.savetxt(filename, self.data[:, :self.size].T, delimiter=",", header=",".join(FIELDS), comments="", fmt="%.10g")
+
+    def to_npz(self, filename: str) -> None:
+        np.savez(filename, interval=self.interval, **self.columns())
+
+    def save(self, filename: str) -> None:
+        """Write the samples as .npz (NumPy) or else as CSV."""
+        if filename.endswith(".npz"):
+            self.to_npz(filename)
+        else:
+            self.to_csv(filename)
+
+def run(engine, sampler: Sampler) -> None:
+    """Run a CFSEngine from the start, sampling its state between events."""
+    engine.start()
+    while True:
+        next_event = engine.run_until(math.nextafter(sampler.next_time(), math.inf))  #events at the sample time included
+        if next_event is None:
+            sampler.record(engine)
+            return
+        sampler.record(engine, next_event[0])
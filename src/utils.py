@@ -1,7 +1,10 @@
 """Utils for formatting input file containing tasks"""
 
-def format_task(line: list) -> list:
-    """Format the task list to a [pid, arrival_time, [(task_type, time), ...]] format."""
+from . import bandwidth
+from . import task
+
+def format_task(line: list, options: (None | dict) = None) -> list:
+    """Format the task list to a [pid, arrival_time, nice, [(task_type, time), ...], options] format."""
     nline = [line[i] for i in range(3)]
     tasks = []
     for i in range(3, len(line)):  # gather CPU and I/O tasks as tuples
@@ -10,18 +13,86 @@ def format_task(line: list) -> list:
         else:
             tasks.append(("IO", line[i]))
 
-    nline = nline + [tasks]
+    nline = nline + [tasks, options if options is not None else {}]
     return nline
 
-def file_to_tasks(filename: str) -> list:
-    """"""
+def split_options(s_line: list) -> tuple[list, dict]:
+    """Separate the key=value options (ex: slice=0.5) from the positional fields of a line."""
+    options = dict(tok.split("=", 1) for tok in s_line if "=" in tok)
+    fields = [tok for tok in s_line if "=" not in tok]
+    return fields, options
+
+def to_number(tok: str) -> (int | float):
+    """Read a time or a nice value, as an int unless it has a decimal part (ex: imported traces)."""
+    return float(tok) if "." in tok else int(tok)
+
+def parse_line(line: str) -> (None | tuple):
+    """Parse one line of a task file, return ("task", formatted task), ("directive", directive) or None if blank."""
+    s_line, options = split_options(line.strip("\n").split())
+    if not s_line:
+        return None
+    if s_line[0].startswith("@"):
+        return "directive", (s_line[0][1:], s_line[1:], options)
+    if len(s_line) < 4:
+        raise ValueError(f"a task line needs an id, an arrival time, a nice value and a CPU burst: {line.strip()}")
+    str_to_int_line = [s_line[0]] + [to_number(s_line[i]) for i in range(1, len(s_line))]
+    return "task", format_task(str_to_int_line, options)
+
+def read_workload(filename: str) -> tuple[list, list]:
+    """Read a task file, return the formatted tasks and the directives.
+
+    Each task line is `id arrival nice CPU IO CPU ... [key=value ...]`, each directive
+    line is `@name field ... [key=value ...]` (ex: `@group /web weight=200`).
+    """
     f = open(filename, "r")
     lines = f.readlines()
 
+    return parse_lines(lines)
+
+def parse_lines(lines) -> tuple[list, list]:
+    """Parse the lines of a task file, return the formatted tasks and the directives."""
     f_lines = []
+    directives = []
     for line in lines:
-        s_line = line.strip("\n").split()
-        str_to_int_line = [s_line[0]] + [int(s_line[i]) for i in range(1, len(s_line))]
-        f_lines.append(format_task(str_to_int_line))
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        kind, data = parsed
+        if kind == "directive":
+            directives.append(data)
+        else:
+            f_lines.append(data)
+
+    return f_lines, directives
+
+def format_line(data: list) -> str:
+    """Write formatted task data back as a task file line."""
+    options = data[4] if len(data) > 4 else {}
+    fields = [str(data[0]), str(data[1]), str(data[2])] + [str(duration) for _, duration in data[3]]
+    return " ".join(fields + [f"{key}={value}" for key, value in options.items()])
 
-    return f_lines
+def file_to_tasks(filename: str) -> list:
+    """Read the formatted tasks of a task file."""
+    return read_workload(filename)[0]
+
+def build_tasks(raw_tasks_data: list) -> list[task.Task]:
+    """Build the Task objects from formatted task data."""
+    tasks = []
+    for data in raw_tasks_data:
+        # data is like : ['A', 0, 0, [('CPU', 1), ('IO', 8)], {'slice': '0.5'}]
+        options = data[4] if len(data) > 4 else {}
+        new_task = task.Task(
+            task_id=data[0],
+            arrival_time=float(data[1]),
+            task_nice=int(data[2]),
+            bursts=data[3],
+            requested_slice=float(options["slice"]) if "slice" in options else None,
+            group=options.get("group", "/")
+        )
+        if "quota" in options:
+            new_task.bandwidth = bandwidth.CFSBandwidth(
+                float(options["quota"]),
+                float(options.get("period", bandwidth.DEFAULT_PERIOD))
+            )
+        tasks.append(new_task)
+    return tasks
@@ -0,0 +1,107 @@
+"""Unit testing for vectorized analysis functions"""
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import src.analysis as analysis
+import src.logger as logger
+import src.metrics as metrics
+import src.task as task
+
+
+def random_finished_tasks(n, seed=0):
+    rand = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        bursts = [("CPU", rand.randint(1, 5)), ("IO", rand.randint(1, 9)), ("CPU", rand.randint(1, 5))]
+        t = task.Task(f"T{i}", float(rand.randint(0, 50)), 0, bursts)
+        t.start_time = t.arrival_time + rand.uniform(0, 3) if rand.random() < 0.9 else None
+        t.end_time = t.arrival_time + sum(b[1] for b in bursts) + rand.uniform(-1, 30)
+        tasks.append(t)
+    return tasks
+
+
+class TestTaskArrays:
+    """Tests for analysis.task_arrays() function"""
+
+    def test_burst_totals(self):
+        """Test that CPU and I/O bursts are summed per task"""
+        tasks = [
+            task.Task("A", 0.0, 0, [("CPU", 2), ("IO", 3), ("CPU", 1)]),
+            task.Task("B", 1.0, 0, []),
+            task.Task("C", 2.0, 0, [("CPU", 4)]),
+        ]
+        arrays = analysis.task_arrays(tasks)
+
+        assert arrays["cpu"].tolist() == [3.0, 0.0, 4.0]
+        assert arrays["io"].tolist() == [3.0, 0.0, 0.0]
+        assert arrays["start"].tolist() == [0.0, 1.0, 2.0]
+
+
+class TestSummarize:
+    """Tests for analysis.summarize() function"""
+
+    def test_matches_python_metrics(self):
+        """Test per-task and aggregate metrics against the metrics module"""
+        tasks = random_finished_tasks(200)
+        per_task, summary = analysis.summarize(tasks)
+
+        for i, t in enumerate(tasks):
+            m = metrics.task_metrics(t)
+            for name in ("response", "turnaround", "waiting", "cpu", "io"):
+                assert per_task[name][i] == pytest.approx(m[name])
+
+        expected = metrics.summarize(tasks)
+        for name, value in expected.items():
+            assert summary[name] == pytest.approx(value)
+
+    def test_percentiles(self):
+        """Test that tail percentiles are reported"""
+        _, summary = analysis.summarize(random_finished_tasks(100))
+        assert summary["p50_turnaround"] <= summary["p95_turnaround"] <= summary["p99_turnaround"]
+
+    def test_empty(self):
+        """Test the aggregates of an empty simulation"""
+        _, summary = analysis.summarize([])
+        assert summary["avg_turnaround"] == 0.0
+
+
+class TestSelectRows:
+    """Tests for analysis.select_rows() function"""
+
+    def test_top_k(self):
+        """Test that the largest values come first"""
+        per_task = {"end": np.zeros(5), "turnaround": np.array([3.0, 9.0, 1.0, 7.0, 5.0])}
+        assert analysis.select_rows(per_task, 3).tolist() == [1, 3, 4]
+
+    def test_all_rows_when_few_tasks(self):
+        """Test that small tables are shown entirely, in task order"""
+        per_task = {"end": np.zeros(3), "turnaround": np.array([3.0, 9.0, 1.0])}
+        assert analysis.select_rows(per_task, 10).tolist() == [0, 1, 2]
+
+    def test_sample_is_sorted_and_reproducible(self):
+        """Test that sampled rows are distinct, sorted and seeded"""
+        per_task = {"end": np.zeros(1000), "turnaround": np.zeros(1000)}
+        rows = analysis.select_rows(per_task, 20, sample=True, seed=3)
+
+        assert len(set(rows.tolist())) == 20
+        assert rows.tolist() == sorted(rows.tolist())
+        assert rows.tolist() == analysis.select_rows(per_task, 20, sample=True, seed=3).tolist()
+
+
+class TestVectorizedPrintSummary:
+    """Tests for CFSLogger.print_summary() with max_rows"""
+
+    def test_only_max_rows_are_listed(self, capsys):
+        """Test that the table is truncated and the averages kept"""
+        tasks = random_finished_tasks(50)
+        log = logger.CFSLogger()
+        log.print_summary(tasks, max_rows=5)
+
+        output = capsys.readouterr().out
+        rows = [line for line in output.split("\n") if line.startswith("| T")]
+        assert len(rows) == 5
+        assert "45 more tasks" in output
+        assert f"Average Turnaround : {metrics.summarize(tasks)['avg_turnaround']:.2f} ms" in output
+        assert "percentiles" in output
@@ -0,0 +1,81 @@
+"""Unit testing for DeadlineTree class"""
+import random
+import pytest
+
+import src.augtree as augtree
+
+
+class TestDeadlineTreeStructure:
+    """Tests for insertion, removal and ordering"""
+
+    def test_empty_tree(self):
+        """Test that a new tree is empty"""
+        tree = augtree.DeadlineTree()
+        assert len(tree) == 0
+        assert tree.first() is None
+        assert tree.earliest_eligible(lambda item: True) is None
+
+    def test_iteration_follows_key_order(self):
+        """Test that items are iterated by increasing key"""
+        tree = augtree.DeadlineTree()
+        for i, key in enumerate([5.0, 1.0, 3.0, 4.0, 2.0]):
+            tree.insert(f"T{key}", (key, i), deadline=10.0 - key)
+
+        assert list(tree) == ["T1.0", "T2.0", "T3.0", "T4.0", "T5.0"]
+        assert tree.first() == "T1.0"
+
+    def test_remove(self):
+        """Test removing items keeps the others"""
+        tree = augtree.DeadlineTree()
+        for i in range(10):
+            tree.insert(i, (float(i), i), deadline=float(i))
+        tree.remove(3)
+        tree.remove(0)
+
+        assert len(tree) == 8
+        assert 3 not in tree
+        assert list(tree) == [1, 2, 4, 5, 6, 7, 8, 9]
+
+
+class TestDeadlineTreeQuery:
+    """Tests for DeadlineTree.earliest_eligible()"""
+
+    def test_earliest_deadline_among_eligible_prefix(self):
+        """Test that only items with key in the eligible prefix are considered"""
+        tree = augtree.DeadlineTree()
+        tree.insert("A", (0.0, 0), deadline=9.0)
+        tree.insert("B", (1.0, 1), deadline=4.0)
+        tree.insert("C", (2.0, 2), deadline=1.0)   # earliest deadline but not eligible
+        vruntime = {"A": 0.0, "B": 1.0, "C": 2.0}
+
+        assert tree.earliest_eligible(lambda item: vruntime[item] <= 1.5) == "B"
+        assert tree.earliest_eligible(lambda item: vruntime[item] <= 2.0) == "C"
+
+    def test_deadline_tie_returns_lowest_key(self):
+        """Test that equal deadlines are broken by key order"""
+        tree = augtree.DeadlineTree()
+        tree.insert("late", (2.0, 0), deadline=5.0)
+        tree.insert("early", (1.0, 1), deadline=5.0)
+
+        assert tree.earliest_eligible(lambda item: True) == "early"
+
+    def test_matches_linear_scan(self):
+        """Test the query against a brute force scan after random updates"""
+        rand = random.Random(42)
+        tree = augtree.DeadlineTree()
+        items = {}
+        for i in range(300):
+            if items and rand.random() < 0.3:
+                victim = rand.choice(sorted(items))
+                tree.remove(victim)
+                del items[victim]
+            else:
+                key = (rand.uniform(0, 100), i)
+                deadline = key[0] + rand.uniform(0, 20)
+                tree.insert(i, key, deadline)
+                items[i] = (key, deadline)
+
+            limit = rand.uniform(0, 100)
+            eligible = [(d, k, item) for item, (k, d) in items.items() if k[0] <= limit]
+            expected = min(eligible)[2] if eligible else None
+            assert tree.earliest_eligible(lambda item: items[item][0][0] <= limit) == expected
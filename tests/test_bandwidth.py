@@ -0,0 +1,118 @@
+"""Unit testing for CPU bandwidth control"""
+import pytest
+
+import src.bandwidth as bandwidth
+import src.cfscalc as cfscalc
+import src.cfsengine as cfsengine
+import src.group as group
+import src.logger as logger
+import src.task as task
+
+
+def quiet_logger():
+    log = logger.CFSLogger()
+    log._write = lambda message: None
+    return log
+
+
+class TestCFSBandwidth:
+    """Tests for bandwidth.CFSBandwidth class"""
+
+    def test_init(self):
+        """Test that a new quota is full and not throttled"""
+        bw = bandwidth.CFSBandwidth(2.0, 10.0)
+        assert bw.runtime == 2.0
+        assert bw.next_refill() == 10.0
+        assert not bw.throttled
+
+    def test_default_period(self):
+        """Test the kernel default period"""
+        assert bandwidth.CFSBandwidth(5.0).period == 100.0
+
+    def test_invalid_quota(self):
+        """Test that non positive values are rejected"""
+        with pytest.raises(ValueError):
+            bandwidth.CFSBandwidth(0.0, 10.0)
+
+    def test_charge_until_exhausted(self):
+        """Test that charging the whole quota reports exhaustion"""
+        bw = bandwidth.CFSBandwidth(2.0, 10.0)
+        assert bw.charge(1.5, 1.5) is False
+        assert bw.charge(0.5, 2.0) is True
+        assert bw.runtime == 0.0
+
+    def test_refresh_on_new_period(self):
+        """Test that the runtime is refilled once per period, periods aligned on 0"""
+        bw = bandwidth.CFSBandwidth(2.0, 10.0)
+        bw.charge(2.0, 2.0)
+        bw.refresh(9.99)
+        assert bw.runtime == 0.0
+        bw.refresh(25.0)
+        assert bw.runtime == 2.0
+        assert bw.period_start == 20.0
+        assert bw.next_refill() == 30.0
+
+    def test_throttled_time(self):
+        """Test that throttled time accumulates over throttling periods"""
+        bw = bandwidth.CFSBandwidth(2.0, 10.0)
+        bw.throttle(2.0)
+        bw.unthrottle(10.0)
+        bw.throttle(12.0)
+        bw.unthrottle(20.0)
+        assert bw.nr_throttled == 2
+        assert bw.throttled_time == pytest.approx(16.0)
+
+
+class TestEngineBandwidth:
+    """Tests for throttling in CFSEngine"""
+
+    def test_task_quota_limits_cpu_rate(self):
+        """Test that a task with quota 1/5 needs 5 periods for 5 ms of CPU"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 5)])
+        t1.bandwidth = bandwidth.CFSBandwidth(1.0, 5.0)
+        cfsengine.CFSEngine(quiet_logger(), [t1]).run()
+
+        assert t1.end_time == pytest.approx(21.0)
+        assert t1.bandwidth.nr_throttled == 4
+        assert t1.bandwidth.throttled_time == pytest.approx(16.0)
+
+    def test_unlimited_task_uses_spare_cpu(self):
+        """Test that an unlimited task runs while the other one is throttled"""
+        limited = task.Task("A", 0.0, 0, [("CPU", 4)])
+        limited.bandwidth = bandwidth.CFSBandwidth(1.0, 10.0)
+        free = task.Task("B", 0.0, 0, [("CPU", 8)])
+        log = quiet_logger()
+        cfsengine.CFSEngine(log, [limited, free]).run()
+
+        assert free.end_time == pytest.approx(9.0)
+        assert limited.end_time == pytest.approx(31.0)
+        assert any("THROTTLED" in line for line in log.history)
+        assert any("UNTHROTTLE" in line for line in log.history)
+
+    def test_group_quota(self):
+        """Test that a group quota is shared by the tasks of the group"""
+        tasks = [task.Task(f"T{i}", 0.0, 0, [("CPU", 4)], group="/q") for i in range(2)]
+        rq = group.GroupRunqueue()
+        rq.set_group_bandwidth("/q", 2.0, 10.0)
+        cfsengine.CFSEngine(quiet_logger(), tasks, rq, cfscalc.GroupCalculator()).run()
+
+        # 8 ms of CPU at 2 ms every 10 ms
+        assert max(t.end_time for t in tasks) == pytest.approx(32.0)
+        assert sum(t.exec_time for t in tasks) == pytest.approx(8.0)
+        assert rq.groups["/q"].bandwidth.nr_throttled == 3
+
+    def test_group_throttle_keeps_other_groups_running(self):
+        """Test that throttling a group does not block its siblings"""
+        limited = task.Task("L", 0.0, 0, [("CPU", 3)], group="/q")
+        other = task.Task("O", 0.0, 0, [("CPU", 6)], group="/r")
+        rq = group.GroupRunqueue()
+        rq.set_group_bandwidth("/q", 1.0, 10.0)
+        cfsengine.CFSEngine(quiet_logger(), [limited, other], rq, cfscalc.GroupCalculator()).run()
+
+        assert other.end_time == pytest.approx(7.0)
+        assert limited.end_time == pytest.approx(21.0)
+
+    def test_root_group_quota_rejected(self):
+        """Test that the root group cannot be limited"""
+        with pytest.raises(ValueError):
+            group.GroupRunqueue().set_group_bandwidth("/", 1.0, 10.0)
@@ -0,0 +1,79 @@
+"""Unit testing for the lockstep batch engine"""
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import src.batch as batch
+import src.fuzz as fuzz
+import src.metrics as metrics
+import src.replicate as replicate
+import src.simulation as simulation
+import src.utils as utils
+
+
+def random_scenarios(n):
+    scenarios, params = [], []
+    for seed in range(n):
+        rng = random.Random(seed)
+        scenarios.append(fuzz.random_workload(rng))
+        params.append(fuzz.random_params(rng))
+    return scenarios, params
+
+
+class TestBatchCFSEngine:
+    """Tests for batch.BatchCFSEngine class"""
+
+    def test_same_schedule_as_reference(self):
+        """Test every task of random workloads against its own CFSEngine run"""
+        scenarios, params = random_scenarios(200)
+        engine = batch.BatchCFSEngine(scenarios, params)
+        engine.run()
+
+        for i, (rows, p) in enumerate(zip(scenarios, params)):
+            tasks, _ = simulation.simulate(rows, params=p)
+            tasks.sort(key=lambda t: t.arrival_time)
+            assert engine.ids[i] == [t.id for t in tasks]
+            for j, t in enumerate(tasks):
+                assert engine.end_time[i, j] == t.end_time
+                assert engine.start_time[i, j] == t.start_time
+                assert engine.vruntime[i, j] == t.vruntime
+                assert engine.exec_time[i, j] == t.exec_time
+
+    def test_padding(self, fpath):
+        """Test workloads of different sizes, and an empty one"""
+        rows = utils.file_to_tasks(fpath)
+        results = batch.simulate_batch([rows, rows[:1], []])
+
+        assert results[0] == pytest.approx(metrics.summarize(simulation.simulate(rows)[0]))
+        assert results[1] == pytest.approx(metrics.summarize(simulation.simulate(rows[:1])[0]))
+        assert results[2] == metrics.summarize([])
+
+    def test_parameter_sets(self):
+        """Test that the number of parameter sets must match the workloads"""
+        with pytest.raises(ValueError):
+            batch.BatchCFSEngine([[], []], [{}])
+
+    def test_batchable(self):
+        """Test that groups and quotas are left to the reference engine"""
+        assert batch.batchable([["A", 0, 0, [("CPU", 1)], {}]])
+        assert not batch.batchable([["A", 0, 0, [("CPU", 1)], {"quota": "1"}]])
+        assert not batch.batchable([["A", 0, 0, [("CPU", 1)], {"group": "/a"}]])
+
+
+class TestReplicateBatch:
+    """Tests for replicate.replicate() with lockstep batches"""
+
+    def test_same_metrics(self, fpath):
+        """Test that lockstep batches give the metrics of separate runs"""
+        rows = utils.file_to_tasks(fpath)
+        expected = replicate.replicate(rows, runs=10, workers=1)
+        got = replicate.replicate(rows, runs=10, workers=1, batch_size=4)
+        assert len(got) == 10
+        for e, g in zip(expected, got):
+            assert g == pytest.approx(e)
+
+    def test_unsupported(self, fpath):
+        """Test that EEVDF replicas cannot run in lockstep"""
+        with pytest.raises(ValueError):
+            replicate.replicate(utils.file_to_tasks(fpath), runs=2, workers=1, eevdf=True, batch_size=2)
@@ -0,0 +1,171 @@
+"""Unit testing for the result and parsed workload caches"""
+import os
+import pytest
+
+import src.cache as cache
+import src.cfscalc as cfscalc
+import src.logger as logger
+import src.main as main
+import src.simulation as simulation
+import src.task as task
+import src.utils as utils
+
+
+class TestCacheKey:
+    """Tests for cache.cache_key() function"""
+
+    def test_same_content_same_key(self, fpath, tmp_path):
+        """Test that the key depends on the content, not on the file or its spacing"""
+        copy = tmp_path / "copy.txt"
+        copy.write_text("\n".join("  ".join(line.split()) for line in open(fpath)) + "\n\n")
+        rows, directives = utils.read_workload(fpath)
+        copy_rows, copy_directives = utils.read_workload(str(copy))
+        calc = cfscalc.CFSCalculator()
+        assert cache.cache_key(rows, directives, calc) == cache.cache_key(copy_rows, copy_directives, calc)
+
+    def test_parameters_change_key(self, fpath):
+        """Test that the calculator, its parameters and the task order are part of the key"""
+        rows, directives = utils.read_workload(fpath)
+        key = cache.cache_key(rows, directives, cfscalc.CFSCalculator())
+        assert key != cache.cache_key(rows, directives, cfscalc.CFSCalculator(L=8.0))
+        assert key != cache.cache_key(rows, directives, cfscalc.CFSCalculator(min_granularity=1.0))
+        assert key != cache.cache_key(rows, directives, cfscalc.EEVDFCalculator())
+        assert key != cache.cache_key(rows[::-1], directives, cfscalc.CFSCalculator())
+
+    def test_nice_table_changes_key(self, fpath, monkeypatch):
+        """Test that another nice to weight table gives another key"""
+        rows, directives = utils.read_workload(fpath)
+        key = cache.cache_key(rows, directives, cfscalc.CFSCalculator())
+        monkeypatch.setattr(task, "PRIO_TO_WEIGHT", task.PRIO_TO_WEIGHT[:-1] + [16])
+        assert key != cache.cache_key(rows, directives, cfscalc.CFSCalculator())
+
+
+class TestSnapshot:
+    """Tests for cache.snapshot() and cache.restore() functions"""
+
+    def test_round_trip(self, tmp_path):
+        """Test that restored results equal the simulated ones"""
+        rows, directives = utils.parse_lines(["@group /a quota=2 period=10", "A 0 0 10 group=/a", "B 0 0 6 2 3 quota=3 period=10"])
+        log = logger.CFSLogger()
+        log._write = lambda message: None
+        tasks, engine = simulation.simulate(rows, directives, sim_logger=log)
+
+        result_cache = cache.ResultCache(str(tmp_path))
+        result_cache.put("k", cache.snapshot(tasks, engine.rqueue, log))
+
+        new_tasks = utils.build_tasks(rows)
+        rqueue, _ = simulation.make_scheduler(new_tasks, directives)
+        new_log = logger.CFSLogger()
+        cache.restore(result_cache.get("k"), new_tasks, rqueue, new_log)
+
+        assert [(t.start_time, t.end_time, t.exec_time) for t in new_tasks] == [(t.start_time, t.end_time, t.exec_time) for t in tasks]
+        assert rqueue.get_group("/a").bandwidth.nr_throttled == engine.rqueue.get_group("/a").bandwidth.nr_throttled
+        assert new_tasks[1].bandwidth.throttled_time == tasks[1].bandwidth.throttled_time
+        assert new_log.gantt_data == log.gantt_data
+        assert new_log.history == log.history
+
+
+class TestResultCache:
+    """Tests for cache.ResultCache class"""
+
+    def test_miss_and_corrupted_entry(self, tmp_path):
+        """Test that missing and unreadable entries are misses"""
+        result_cache = cache.ResultCache(str(tmp_path))
+        assert result_cache.get("missing") is None
+        (tmp_path / "bad.json").write_text("{not json")
+        assert result_cache.get("bad") is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries go first above max_bytes"""
+        result_cache = cache.ResultCache(str(tmp_path), max_bytes=10**6)
+        for i, key in enumerate(["a", "b", "c"]):
+            result_cache.put(key, {"data": "x" * 1000})
+            os.utime(result_cache.path(key), (i, i))
+        result_cache.get("a")   #a becomes the most recent
+
+        result_cache.max_bytes = 2100
+        result_cache.put("d", {"data": "x" * 10})
+        assert result_cache.get("b") is None
+        assert result_cache.get("a") is not None
+        assert result_cache.get("c") is not None
+        assert result_cache.get("d") is not None
+
+    def test_unwritable_directory(self, tmp_path):
+        """Test that an entry that cannot be stored is dropped silently"""
+        (tmp_path / "file").write_text("")
+        result_cache = cache.ResultCache(str(tmp_path / "file" / "cache"))
+        result_cache.put("a", {"data": 1})
+        assert result_cache.get("a") is None
+
+    def test_entry_removed_during_eviction(self, tmp_path):
+        """Test that eviction skips entries deleted by another process"""
+        result_cache = cache.ResultCache(str(tmp_path), max_bytes=0)
+        os.symlink(tmp_path / "gone", tmp_path / "dangling.json")
+        result_cache.put("a", {"data": 1})
+        assert result_cache.get("a") is None    #evicted above max_bytes
+
+
+class TestReadWorkload:
+    """Tests for cache.read_workload() function"""
+
+    def write(self, path, text, mtime):
+        path.write_text(text)
+        os.utime(path, (mtime, mtime))
+
+    def test_parsed_copy_is_used(self, tmp_path, monkeypatch):
+        """Test that the second read loads the same rows without parsing the file"""
+        source = tmp_path / "w.txt"
+        self.write(source, "@group /web weight=200\nA 0 -5 3 2 1 group=/web\nB 1.5 0 0.25\n", 1000)
+        expected = utils.read_workload(str(source))
+        assert cache.read_workload(str(source), str(tmp_path / "cache")) == expected
+
+        monkeypatch.setattr(utils, "read_workload", lambda filename: pytest.fail("file parsed again"))
+        assert cache.read_workload(str(source), str(tmp_path / "cache")) == expected
+
+    def test_changed_source(self, tmp_path):
+        """Test that an edited file (other mtime or size) is parsed again"""
+        source = tmp_path / "w.txt"
+        self.write(source, "A 0 0 3\n", 1000)
+        cache.read_workload(str(source), str(tmp_path / "cache"))
+
+        self.write(source, "A 0 0 4\n", 2000)
+        assert cache.read_workload(str(source), str(tmp_path / "cache"))[0][0][3] == [("CPU", 4)]
+        self.write(source, "A 0 0 42\n", 2000)
+        assert cache.read_workload(str(source), str(tmp_path / "cache"))[0][0][3] == [("CPU", 42)]
+
+    def test_corrupted_or_unwritable_copy(self, tmp_path):
+        """Test that a damaged copy or a cache that cannot be written falls back to parsing"""
+        source = tmp_path / "w.txt"
+        self.write(source, "A 0 0 3\n", 1000)
+        cache.read_workload(str(source), str(tmp_path / "cache"))
+        with open(cache.workload_path(str(tmp_path / "cache"), str(source)), "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"\xff\xff\xff")
+        assert cache.read_workload(str(source), str(tmp_path / "cache"))[0] == [["A", 0, 0, [("CPU", 3)], {}]]
+
+        (tmp_path / "file").write_text("")
+        assert cache.read_workload(str(source), str(tmp_path / "file"))[0] == [["A", 0, 0, [("CPU", 3)], {}]]
+
+
+class TestMainCache:
+    """Tests for the cache in the scfs CLI"""
+
+    def test_cached_output_is_identical(self, fpath, tmp_path, capsys):
+        """Test that a second run replays the same output from the cache"""
+        main.main([fpath, "--cache-dir", str(tmp_path)])
+        first = capsys.readouterr().out
+        assert len([name for name in os.listdir(tmp_path) if name.endswith(".json")]) == 1
+
+        main.main([fpath, "--cache-dir", str(tmp_path)])
+        assert capsys.readouterr().out == first
+
+    def test_unwritable_cache_dir(self, fpath, tmp_path, capsys):
+        """Test that the summary is printed when the cache cannot be written"""
+        (tmp_path / "file").write_text("")
+        main.main([fpath, "--cache-dir", str(tmp_path / "file")])
+        assert "| Turnaround |" in capsys.readouterr().out
+
+    def test_no_cache(self, fpath, tmp_path):
+        """Test that --no-cache writes nothing"""
+        main.main([fpath, "--no-cache", "--cache-dir", str(tmp_path)])
+        assert os.listdir(tmp_path) == []
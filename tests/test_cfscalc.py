@@ -31,6 +31,20 @@ class TestCFSCalculatorConstants:
         calc = cfscalc.CFSCalculator()
         assert calc.NICE_0_WEIGHT == 1024
 
+    def test_parameters_override(self):
+        """Test that L and the minimal granularity can be set per calculator"""
+        calc = cfscalc.CFSCalculator(L=12.0, min_granularity=1.5)
+        assert calc.L == 12.0
+        assert calc.MIN_GRANULARITY == 1.5
+        assert cfscalc.CFSCalculator().L == 6.0
+
+    def test_invalid_parameters(self):
+        """Test that non positive parameters are rejected"""
+        with pytest.raises(ValueError):
+            cfscalc.CFSCalculator(L=0)
+        with pytest.raises(ValueError):
+            cfscalc.EEVDFCalculator(min_granularity=-1.0)
+
 
 class TestCalcCurTimeSlice:
     """Tests for CFSCalculator.calc_cur_time_slice() method"""
@@ -228,3 +242,35 @@ class TestUpdateVruntime:
         weight_factor = calc.NICE_0_WEIGHT / t1.get_task_weight()
         expected_vruntime = initial_vruntime + actual_duration * weight_factor
         assert t1.vruntime == expected_vruntime
+
+
+class TestEEVDFCalculator:
+    """Tests for cfscalc.EEVDFCalculator class"""
+
+    def test_default_slice_is_base_slice(self):
+        """Test that tasks without a requested slice get MIN_GRANULARITY"""
+        calc = cfscalc.EEVDFCalculator()
+        rq = runqueue.EEVDFRunqueue()
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+
+        assert calc.calc_cur_time_slice(rq, t1) == calc.MIN_GRANULARITY
+
+    def test_requested_slice_is_honored(self):
+        """Test that the requested slice does not depend on the queue load"""
+        calc = cfscalc.EEVDFCalculator()
+        rq = runqueue.EEVDFRunqueue()
+        for i in range(10):
+            rq.add_task(task.Task(f"T{i}", 0.0, 0, [("CPU", 5)]))
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)], requested_slice=2.5)
+
+        assert calc.calc_cur_time_slice(rq, t1) == 2.5
+
+    def test_update_vruntime_consumes_lag(self):
+        """Test that running decreases the lag by the vruntime gained"""
+        calc = cfscalc.EEVDFCalculator()
+        t1 = task.Task("Task1", 0.0, 5, [("CPU", 5)])
+        t1.vlag = 1.0
+
+        calc.update_vruntime(t1, 1.0)
+
+        assert t1.vlag == pytest.approx(1.0 - t1.vruntime)
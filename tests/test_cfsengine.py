@@ -0,0 +1,228 @@
+"""Unit testing for CFSEngine class"""
+import pytest
+
+import src.cfsengine as cfsengine
+import src.cfscalc as cfscalc
+import src.logger as logger
+import src.metrics as metrics
+import src.runqueue as runqueue
+import src.simulation as simulation
+import src.task as task
+import src.utils as utils
+
+
+def run_engine(tasks, **kwargs):
+    """Run an engine on tasks with a logger writing to a list."""
+    log = logger.CFSLogger()
+    log._write = lambda message: None
+    engine = cfsengine.CFSEngine(logger=log, tasks=tasks, **kwargs)
+    engine.run()
+    return engine, log
+
+
+class TestCFSEngineRun:
+    """Tests for CFSEngine.run() with the default CFS policy"""
+
+    def test_single_task(self):
+        """Test a lone task runs without interruption"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 5)])
+        run_engine([t1])
+
+        assert t1.start_time == 0.0
+        assert t1.end_time == 5.0
+        assert t1.exec_time == 5.0
+
+    def test_io_burst(self):
+        """Test that an I/O burst delays the end of a task"""
+        t1 = task.Task("A", 1.0, 0, [("CPU", 2), ("IO", 3), ("CPU", 1)])
+        run_engine([t1])
+
+        assert t1.start_time == 1.0
+        assert t1.end_time == 7.0
+
+    def test_all_tasks_finish(self, fpath):
+        """Test that every task of td1 finishes and CPU time is conserved"""
+        tasks = utils.build_tasks(utils.file_to_tasks(fpath))
+        _, log = run_engine(tasks)
+
+        for t in tasks:
+            cpu_needed = sum(b[1] for b in t.bursts if b[0] == "CPU")
+            assert t.exec_time == pytest.approx(cpu_needed)
+            assert t.end_time > 0
+        assert sum(end - start for _, start, end in log.gantt_data) == pytest.approx(36.0)
+
+    def test_td1_end_times(self, fpath):
+        """Test the reference schedule of td1"""
+        tasks = utils.build_tasks(utils.file_to_tasks(fpath))
+        run_engine(tasks)
+
+        ends = {t.id: round(t.end_time, 2) for t in tasks}
+        assert ends == {"A": 35.5, "B": 28.79, "C": 27.25, "D": 36.0}
+
+
+class TestCFSEngineEEVDF:
+    """Tests for CFSEngine.run() with the EEVDF runqueue"""
+
+    def make_eevdf(self):
+        logic = cfscalc.EEVDFCalculator()
+        return {"logic": logic, "rqueue": runqueue.EEVDFRunqueue(base_slice=logic.MIN_GRANULARITY)}
+
+    def test_all_tasks_finish(self, fpath):
+        """Test that every task finishes with all its CPU time"""
+        tasks = utils.build_tasks(utils.file_to_tasks(fpath))
+        run_engine(tasks, **self.make_eevdf())
+
+        for t in tasks:
+            cpu_needed = sum(b[1] for b in t.bursts if b[0] == "CPU")
+            assert t.exec_time == pytest.approx(cpu_needed)
+
+    def test_requested_slice_is_used(self):
+        """Test that a task runs its requested slice at once"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 6)], requested_slice=3.0)
+        t2 = task.Task("B", 0.0, 0, [("CPU", 6)], requested_slice=3.0)
+        _, log = run_engine([t1, t2], **self.make_eevdf())
+
+        assert [round(end - start, 2) for _, start, end in log.gantt_data] == [3.0, 3.0, 3.0, 3.0]
+
+    def test_short_slice_lowers_response_time(self):
+        """Test that an interactive task arriving late runs before batch tasks finish their slices"""
+        batch = [task.Task(f"B{i}", 0.0, 0, [("CPU", 30)], requested_slice=6.0) for i in range(4)]
+        inter = task.Task("I", 1.0, 0, [("CPU", 0.5)], requested_slice=0.5)
+        run_engine(batch + [inter], **self.make_eevdf())
+
+        assert inter.start_time - inter.arrival_time <= 6.0
+
+
+class TestCFSEngineIOTies:
+    """Tests for simultaneous I/O returns"""
+
+    def test_simultaneous_io_returns(self):
+        """Test that tasks returning from I/O at the same time are all handled"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 1), ("IO", 3), ("CPU", 1)])
+        t2 = task.Task("B", 0.0, 0, [("CPU", 2), ("IO", 2), ("CPU", 1)])
+        _, log = run_engine([t1, t2])
+
+        assert sum(1 for line in log.history if "RETURN_FROM_IO" in line) == 2
+        assert t1.end_time == pytest.approx(5.0)
+        assert t2.end_time == pytest.approx(6.0)
+
+    def test_batch_keeps_event_order(self):
+        """Test that the events of tasks leaving I/O together are logged in I/O order"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 1), ("IO", 4)])
+        t2 = task.Task("B", 0.0, 0, [("CPU", 1), ("IO", 3), ("CPU", 1)])
+        t3 = task.Task("C", 0.0, 0, [("CPU", 1), ("IO", 2), ("IO", 1)])
+        _, log = run_engine([t1, t2, t3])
+
+        at_5 = [line.split()[2] for line in log.history if line.startswith("[5.0")]
+        assert at_5 == ["TASK_END", "RETURN_FROM_IO", "NEW_IO_BURST"]
+
+
+class TestCFSEngineBatchEnqueue:
+    """Tests for tasks becoming runnable at the same time"""
+
+    def test_many_arrivals(self):
+        """Test that a burst of arrivals is placed and logged like separate arrivals"""
+        tasks = [task.Task(f"T{i}", 0.0 if i < 50 else 1.0, i % 5, [("CPU", 1 + i % 3), ("IO", 2), ("CPU", 1)]) for i in range(100)]
+        engine, log = run_engine(tasks)
+
+        assert sum(1 for line in log.history if " ARRIVAL " in line) == 100
+        assert sum(1 for line in log.history if "RETURN_FROM_IO" in line) == 100
+        assert all(t.end_time is not None for t in tasks)
+        assert not engine.pending_tasks and not engine.waiting_for_io
+
+    def test_grouped_log(self):
+        """Test that past the threshold of the logger a batch is one record per event type"""
+        tasks = [task.Task(f"T{i}", 0.0, 0, [("CPU", 1)]) for i in range(10)]
+        log = logger.CFSLogger()
+        log._write = lambda message: None
+        log.batch_threshold = 3
+        cfsengine.CFSEngine(logger=log, tasks=tasks).run()
+
+        arrivals = [line for line in log.history if " ARRIVAL " in line]
+        assert len(arrivals) == 1
+        assert "10 tasks (T0 .. T9)" in arrivals[0]
+        assert all(t.end_time is not None for t in tasks)
+
+
+class TestCFSEngineRunUntil:
+    """Tests for CFSEngine.run_until() function"""
+
+    def test_returns_next_event(self):
+        """Test that the first event at or after the limit is left for later"""
+        t1 = task.Task("A", 0.0, 0, [("CPU", 2), ("IO", 3), ("CPU", 1)])
+        engine = cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False), tasks=[t1])
+        engine.start()
+
+        assert engine.run_until(2.0) == (2.0, "CPU_STOP")
+        assert engine.run_until(3.0) == (5.0, "IO_RETURN")
+        assert engine.run_until(float("inf")) is None
+        assert t1.end_time == 6.0
+
+
+class TestCFSEnginePlacement:
+    """Tests for the placement policies in a full simulation"""
+
+    MIXED = [
+        ["B1", 0, 0, [("CPU", 40)], {}],
+        ["B2", 0, 0, [("CPU", 40)], {}],
+        ["I1", 0, 0, [("CPU", 1), ("IO", 6), ("CPU", 1), ("IO", 6), ("CPU", 1), ("IO", 6), ("CPU", 1)], {}],
+        ["I2", 2, 0, [("CPU", 1), ("IO", 4), ("CPU", 1), ("IO", 4), ("CPU", 1), ("IO", 4), ("CPU", 1)], {}],
+    ]
+
+    def test_sleeper_credit_helps_interactive_tasks(self):
+        """Test that waking tasks finish earlier with sleeper credit, for the same total work"""
+        default, _ = simulation.simulate(self.MIXED)
+        sleeper, _ = simulation.simulate(self.MIXED, placement="sleeper")
+
+        assert metrics.class_summary(sleeper)["interactive_turnaround"] < metrics.class_summary(default)["interactive_turnaround"]
+        assert max(t.end_time for t in sleeper) == max(t.end_time for t in default)
+
+    def test_start_debit_delays_new_tasks(self):
+        """Test that a task arriving on a busy CPU waits longer with START_DEBIT"""
+        rows = self.MIXED[:2] + [["N", 5, 0, [("CPU", 3)], {}]]
+        default, _ = simulation.simulate(rows)
+        debit, _ = simulation.simulate(rows, placement="start-debit")
+        assert debit[2].start_time > default[2].start_time
+
+    def test_groups_are_refused(self):
+        """Test that placement policies need the flat CFS runqueue"""
+        with pytest.raises(ValueError):
+            simulation.simulate([["A", 0, 0, [("CPU", 1)], {"group": "/a"}]], placement="kernel")
+
+
+class TestCFSEngineRenice:
+    """Tests for the @renice events of CFSEngine"""
+
+    def test_running_task_charged_at_both_weights(self):
+        """Test that the time run before a renice is charged at the old weight"""
+        tasks, engine = simulation.simulate([["A", 0, 0, [("CPU", 10)]]], [("renice", ["A"], {"time": "4", "nice": "-5"})])
+        assert tasks[0].nice == -5
+        assert tasks[0].vruntime == pytest.approx(4.0 + 6.0 * 1024 / task.PRIO_TO_WEIGHT[15])
+        assert tasks[0].end_time == 10.0
+
+    def test_queued_task_gets_a_larger_slice(self):
+        """Test that a reniced queued task gets the slice of its new weight"""
+        rows = [["A", 0, 0, [("CPU", 20)]], ["B", 0, 0, [("CPU", 20)]]]
+        sim_logger = logger.CFSLogger(verbose=False)
+        simulation.simulate(rows, [("renice", ["B"], {"time": "1", "nice": "-10"})], sim_logger=sim_logger)
+        start, end = sim_logger.gantt_data[1][1:]
+        assert sim_logger.gantt_data[1][0] == "B"
+        assert end - start == pytest.approx(6.0 * 9548 / (9548 + 1024))
+
+    def test_renice_before_arrival(self):
+        """Test that a task reniced before it arrives starts with the new weight"""
+        tasks, _ = simulation.simulate([["A", 5, 0, [("CPU", 2)]]], [("renice", ["A"], {"time": "1", "nice": "10"})])
+        assert tasks[0].vruntime == pytest.approx(2.0 * 1024 / 110)
+
+    def test_group_load_follows(self):
+        """Test that the load of the group of a queued task is updated"""
+        rows = [["A", 0, 0, [("CPU", 4)], {"group": "/g"}], ["B", 0, 0, [("CPU", 4)], {"group": "/g"}]]
+        _, engine = simulation.simulate(rows, [("renice", ["B"], {"time": "1", "nice": "5"})])
+        assert engine.rqueue.groups["/g"].load == 0
+
+    def test_unknown_task(self):
+        """Test that a renice of a task not in the workload is refused"""
+        with pytest.raises(ValueError):
+            simulation.renice_events([], [("renice", ["X"], {"time": "1", "nice": "0"})])
+        with pytest.raises(ValueError):
+            simulation.renice_events(utils.build_tasks([["A", 0, 0, [("CPU", 1)]]]), [("renice", ["A"], {"time": "1", "nice": "20"})])
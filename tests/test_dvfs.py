@@ -0,0 +1,89 @@
+"""Unit testing for the DVFS and energy model"""
+import pytest
+
+import src.dvfs as dvfs
+import src.fastengine as fastengine
+import src.logger as logger
+import src.main as main
+import src.simulation as simulation
+import src.utils as utils
+
+OPPS = [("opp", [], {"freq": "1000", "power": "0.5"}), ("opp", [], {"freq": "2000", "power": "2"})]
+
+
+class TestDVFS:
+    """Tests for dvfs.DVFS class"""
+
+    def test_energy(self):
+        """Test that busy time is charged at the power of its frequency, idle time at the idle power"""
+        model = dvfs.DVFS("performance", [(1000, 0.5), (2000, 2.0)], idle_power=0.1)
+        model.update(4.0, True)
+        model.update(10.0, False)
+        model.update(12.0, True)
+        assert model.energy == pytest.approx(6 * 0.1 + 6 * 2.0)
+        assert model.average_power() == pytest.approx(12.6 / 12)
+        assert model.average_freq() == 2000
+
+    def test_schedutil_follows_utilization(self):
+        """Test that a busy CPU gets faster and an idle one slower"""
+        model = dvfs.DVFS("schedutil", [(500, 0.1), (1000, 0.5), (2000, 2.0)])
+        assert model.select(0.0) == 0.25
+        for t in range(1, 200):
+            model.select(float(t))
+        assert model.speed == 1.0
+        model.update(200.0, False)
+        assert model.select(400.0) == 0.25
+        assert model.nr_changes >= 2
+
+    def test_invalid(self):
+        """Test that an unknown governor is refused"""
+        with pytest.raises(ValueError):
+            dvfs.DVFS("ondemand")
+
+
+class TestCFSEngineDVFS:
+    """Tests for the frequency scaling of CFSEngine slices"""
+
+    def test_performance_keeps_the_schedule(self, fpath):
+        """Test that the highest frequency gives the schedule of the fixed-speed engine"""
+        rows = utils.file_to_tasks(fpath)
+        reference, _ = simulation.simulate(rows)
+        tasks, engine = simulation.simulate(rows, OPPS + [("dvfs", [], {"governor": "performance"})])
+        assert [t.end_time for t in tasks] == [t.end_time for t in reference]
+        assert engine.cpufreq.busy_time == pytest.approx(sum(t.exec_time for t in tasks))
+
+    def test_powersave_slows_bursts(self):
+        """Test that a burst takes f_max / f longer at a lower frequency"""
+        tasks, engine = simulation.simulate([["A", 0, 0, [("CPU", 4), ("IO", 2), ("CPU", 1)]]],
+                                            OPPS + [("dvfs", [], {"governor": "powersave", "idle": "0"})])
+        assert tasks[0].end_time == 12.0
+        assert tasks[0].exec_time == 10.0
+        assert engine.cpufreq.energy == pytest.approx(10 * 0.5)
+
+    def test_directive(self):
+        """Test the @dvfs and @opp options"""
+        assert simulation.dvfs_model([]) is None
+        assert simulation.dvfs_model([("dvfs", [], {})]).freqs == [f for f, _ in dvfs.DEFAULT_OPPS]
+        with pytest.raises(ValueError):
+            simulation.dvfs_model([("dvfs", [], {"governor": "ondemand"})])
+        with pytest.raises(ValueError):
+            simulation.dvfs_model([("opp", [], {"freq": "1000"})])
+
+    def test_fast_engine_refused(self):
+        """Test that the optimized engine does not scale the frequency"""
+        tasks = utils.build_tasks([["A", 0, 0, [("CPU", 1)]]])
+        rqueue, logic = simulation.make_scheduler(tasks, [])
+        assert not fastengine.supports(tasks, rqueue, logic, [], None, dvfs.DVFS())
+
+
+class TestCompareGovernors:
+    """Tests for the --governor and --compare-governors options"""
+
+    def test_table(self, fpath, capsys):
+        """Test that each governor gets its energy and perf-per-watt"""
+        main.main([fpath, "--no-cache", "--compare-governors"])
+        output = capsys.readouterr().out
+        assert "ENERGY" in output
+        for governor in dvfs.GOVERNORS:
+            assert f"| {governor:<11} |" in output
+        assert "tasks/J" in output
@@ -0,0 +1,90 @@
+"""Unit testing for the optimized engine and its differential checker"""
+import random
+import pytest
+
+import src.cfscalc as cfscalc
+import src.fastengine as fastengine
+import src.fuzz as fuzz
+import src.logger as logger
+import src.simulation as simulation
+import src.utils as utils
+
+
+class TestFastCFSEngine:
+    """Tests for fastengine.FastCFSEngine class"""
+
+    def test_same_log_as_reference(self, fpath):
+        """Test that the event log and the Gantt chart are the reference ones"""
+        rows = utils.file_to_tasks(fpath)
+        reference = logger.CFSLogger()
+        reference._write = lambda message: None
+        simulation.simulate(rows, sim_logger=reference)
+
+        fast = logger.CFSLogger()
+        fast._write = lambda message: None
+        fastengine.FastCFSEngine(fast, utils.build_tasks(rows)).run()
+
+        assert fast.history == reference.history
+        assert fast.gantt_data == reference.gantt_data
+
+    def test_ties_go_to_first_enqueued(self):
+        """Test that equal vruntimes and I/O returns keep the enqueue order"""
+        rows = [["A", 0, 0, [("CPU", 1), ("IO", 2), ("CPU", 1)]], ["B", 0, 0, [("CPU", 1), ("IO", 1), ("CPU", 1)]],
+                ["C", 0, 0, [("CPU", 2)]]]
+        assert fastengine.verify(rows) > 0
+
+    def test_supports(self):
+        """Test that groups, quotas and EEVDF are not handled"""
+        tasks = utils.build_tasks([["A", 0, 0, [("CPU", 1)], {"quota": "1"}]])
+        assert not fastengine.supports(tasks, *simulation.make_scheduler(tasks, []))
+        tasks = utils.build_tasks([["A", 0, 0, [("CPU", 1)]]])
+        assert fastengine.supports(tasks, *simulation.make_scheduler(tasks, []))
+        assert not fastengine.supports(tasks, *simulation.make_scheduler(tasks, [], eevdf=True))
+        assert not fastengine.supports(tasks, *simulation.make_scheduler(tasks, [], groups=True))
+        renices = simulation.renice_events(tasks, [("renice", ["A"], {"time": "0", "nice": "1"})])
+        assert not fastengine.supports(tasks, *simulation.make_scheduler(tasks, []), renices)
+
+
+class TestVerify:
+    """Tests for fastengine.verify() function"""
+
+    def test_reports_first_divergent_event(self, fpath, monkeypatch):
+        """Test that a broken optimization is caught at its first event"""
+        class BrokenEngine(fastengine.FastCFSEngine):
+            def __init__(self, logger, tasks, logic):
+                super().__init__(logger, tasks, cfscalc.CFSCalculator(L=logic.L * 2))
+
+        monkeypatch.setattr(fastengine, "FastCFSEngine", BrokenEngine)
+        with pytest.raises(fastengine.Divergence) as err:
+            fastengine.verify(utils.file_to_tasks(fpath))
+        assert err.value.index > 0
+        assert err.value.expected != err.value.got
+
+    def test_unsupported_setup(self):
+        """Test that a group workload is refused"""
+        with pytest.raises(ValueError):
+            fastengine.verify([["A", 0, 0, [("CPU", 1)], {"group": "/a"}]])
+
+    def test_recorder_checks_events(self):
+        """Test that the recorder raises at an extra event"""
+        recorder = fastengine.EventRecorder(expected=[(0.0, "START", None, None, "")])
+        recorder.log_event(0.0, "START")
+        with pytest.raises(fastengine.Divergence):
+            recorder.log_event(1.0, "START")
+
+
+class TestFuzz:
+    """Tests for the random workload fuzzer"""
+
+    def test_random_workload_is_valid(self):
+        """Test that generated tasks alternate CPU and I/O and end with CPU"""
+        for seed in range(50):
+            for row in fuzz.random_workload(random.Random(seed)):
+                kinds = [b[0] for b in row[3]]
+                assert kinds[::2] == ["CPU"] * len(kinds[::2])
+                assert kinds[1::2] == ["IO"] * len(kinds[1::2])
+                assert kinds[-1] == "CPU"
+
+    def test_no_divergence(self):
+        """Test the fast engine on random workloads and parameters"""
+        assert fuzz.fuzz(runs=150, seed=0) == []
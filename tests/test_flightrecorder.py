@@ -0,0 +1,88 @@
+"""Unit testing for the flight recorder"""
+import pytest
+
+import src.cfsengine as cfsengine
+import src.flightrecorder as flightrecorder
+import src.logger as logger
+import src.simulation as simulation
+import src.utils as utils
+
+
+class TestRingBuffer:
+    """Tests for flightrecorder.RingBuffer class"""
+
+    def test_keeps_last_items(self):
+        """Test that the oldest items are overwritten in place"""
+        ring = flightrecorder.RingBuffer(3)
+        items = ring.items
+        for i in range(5):
+            ring.append(i)
+
+        assert list(ring) == [2, 3, 4]
+        assert len(ring) == 3
+        assert ring.dropped() == 2
+        assert ring.items is items and len(items) == 3
+
+    def test_not_full(self):
+        """Test a buffer with fewer items than its capacity"""
+        ring = flightrecorder.RingBuffer(4)
+        ring.append("a")
+        assert list(ring) == ["a"]
+        assert ring.dropped() == 0
+
+    def test_invalid_capacity(self):
+        """Test that an empty buffer is refused"""
+        with pytest.raises(ValueError):
+            flightrecorder.RingBuffer(0)
+
+
+class TestFlightRecorder:
+    """Tests for flightrecorder.FlightRecorder class"""
+
+    def run(self, rows, **kwargs):
+        tasks = utils.build_tasks(rows)
+        rqueue, logic = simulation.make_scheduler(tasks, [])
+        recorder = flightrecorder.FlightRecorder(**kwargs)
+        recorder._write = lambda message: None
+        engine = cfsengine.CFSEngine(recorder, tasks, rqueue, logic)
+        return recorder, engine
+
+    def test_same_events_as_full_log(self, fpath):
+        """Test that the buffer holds the last events of the full history"""
+        rows = utils.file_to_tasks(fpath)
+        reference = logger.CFSLogger()
+        reference._write = lambda message: None
+        simulation.simulate(rows, sim_logger=reference)
+        recorder, engine = self.run(rows, capacity=5)
+        engine.run()
+        assert list(recorder.history) == reference.history[-5:]
+
+    def test_nr_running_trigger(self, tmp_path):
+        """Test that the trigger dumps once while the threshold stays crossed"""
+        rows = [[f"T{i}", 0, 0, [("CPU", 4)]] for i in range(4)]
+        dump_file = tmp_path / "dump.txt"
+        recorder, engine = self.run(rows, capacity=10, dump_file=str(dump_file), max_nr_running=2)
+        flightrecorder.run(engine, recorder)
+
+        assert recorder.nr_dumps == 1
+        dump = dump_file.read_text()
+        assert "nr_running 3 > 2" in dump
+        assert "ARRIVAL    |Task T3" in dump
+
+    def test_wait_trigger(self):
+        """Test that a task waiting longer than the threshold fires the trigger"""
+        rows = [["A", 0, 0, [("CPU", 10)]], ["B", 0, 0, [("CPU", 10)]]]
+        recorder, engine = self.run(rows, capacity=10, max_wait=2.5)
+        reasons = []
+        recorder.dump = lambda reason="", time=None: reasons.append((reason, time))
+        flightrecorder.run(engine, recorder)
+
+        assert reasons == [("wait 3.00 ms > 2.5 ms", 3.0)]   #once: every next pick waits as long
+
+    def test_no_trigger(self):
+        """Test that nothing is dumped under the thresholds"""
+        recorder, engine = self.run([["A", 0, 0, [("CPU", 1), ("IO", 1), ("CPU", 1)]]], capacity=4,
+                                    max_nr_running=1, max_wait=1.0)
+        flightrecorder.run(engine, recorder)
+        assert recorder.nr_dumps == 0
+        assert recorder.runnable_since == {}
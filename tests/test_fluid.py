@@ -0,0 +1,74 @@
+"""Unit testing for the fluid (GPS) engine"""
+import pytest
+
+import src.fluid as fluid
+import src.logger as logger
+import src.main as main
+import src.task as task
+import src.utils as utils
+
+
+def run(rows):
+    tasks = utils.build_tasks(rows)
+    sim_logger = logger.CFSLogger(verbose=False)
+    fluid.FluidEngine(sim_logger, tasks).run()
+    return tasks, sim_logger
+
+
+class TestFluidEngine:
+    """Tests for fluid.FluidEngine class"""
+
+    def test_equal_share(self):
+        """Test that tasks of the same weight share the CPU equally"""
+        tasks, _ = run([["A", 0, 0, [("CPU", 4)]], ["B", 0, 0, [("CPU", 4)]]])
+        assert [t.end_time for t in tasks] == [8.0, 8.0]
+
+    def test_weighted_share(self):
+        """Test that a task progresses at weight / total weight"""
+        tasks, _ = run([["A", 0, -5, [("CPU", 4)]], ["B", 0, 0, [("CPU", 4)]]])
+        weight = task.PRIO_TO_WEIGHT[15]
+        assert tasks[0].end_time == pytest.approx(4 * (weight + 1024) / weight)
+        assert tasks[1].end_time == pytest.approx(8.0)
+        assert tasks[0].vruntime == pytest.approx(4 * 1024 / weight)
+
+    def test_io_and_gantt(self):
+        """Test that each CPU burst is one Gantt entry and I/O returns are events"""
+        tasks, sim_logger = run([["A", 1, 0, [("CPU", 2), ("IO", 3), ("CPU", 1)]]])
+        assert tasks[0].end_time == 7.0
+        assert tasks[0].exec_time == 3.0
+        assert sim_logger.gantt_data == [("A", 1.0, 3.0), ("A", 6.0, 7.0)]
+
+    def test_late_arrival(self):
+        """Test that a task arriving later gets its share from then on"""
+        tasks, _ = run([["A", 0, 0, [("CPU", 4)]], ["B", 2, 0, [("CPU", 1)]]])
+        assert tasks[1].end_time == pytest.approx(4.0)
+        assert tasks[0].end_time == pytest.approx(5.0)
+
+
+class TestCompare:
+    """Tests for fluid.compare()"""
+
+    def test_close_to_exact(self, fpath):
+        """Test that turnaround and CPU use stay close to the exact engine"""
+        comparison = fluid.compare(utils.file_to_tasks(fpath))
+        assert set(comparison) == set(fluid.METRICS)
+        assert comparison["avg_turnaround"][2] < 0.1
+        assert comparison["cpu_utilization"][2] < 0.01
+        assert comparison["avg_response"][1] == 0.0     #no slices: every task starts at once
+
+
+class TestFluidOptions:
+    """Tests for the --fluid and --compare-fluid options"""
+
+    def test_fluid_run(self, fpath, capsys):
+        """Test a run of the fluid engine and the comparison table"""
+        main.main([fpath, "--no-cache", "--fluid", "--compare-fluid"])
+        output = capsys.readouterr().out
+        assert "fluid (GPS) start" in output
+        assert "TIME_SLICE_OVER" not in output
+        assert "FLUID APPROXIMATION" in output
+
+    def test_fast_refused(self, fpath):
+        """Test that --fluid and --fast cannot be combined"""
+        with pytest.raises(SystemExit):
+            main.main([fpath, "--no-cache", "--fluid", "--fast"])
@@ -0,0 +1,109 @@
+"""Unit testing for the level-of-detail Gantt export"""
+import pytest
+import json
+import re
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+
+import src.gantt as gantt
+import src.main as main
+
+
+class TestMergeSlices:
+    """Tests for gantt.merge_slices()"""
+
+    def test_merges_contiguous_slices(self):
+        """Test that back-to-back slices of a task become one interval"""
+        data = [["A", 0, 1], ["B", 1, 2], ["A", 2, 3], ["A", 3, 4.5], ["B", 4.5, 5]]
+        assert gantt.merge_slices(data) == {"A": [(0, 1), (2, 4.5)], "B": [(1, 2), (4.5, 5)]}
+
+
+class TestOccupancyRuns:
+    """Tests for gantt.occupancy_runs()"""
+
+    def test_runs(self):
+        """Test partial, full and empty bins as [first, count, level] runs"""
+        runs = gantt.occupancy_runs([(0, 1), (1.5, 2), (2, 6.25)], 0, 1.0, 4)
+        assert runs == [0, 1, 4, 1, 1, 2, 2, 4, 4, 6, 1, 1]
+
+    def test_sub_bin_slices(self):
+        """Test that slices smaller than a bin add up, and stay visible"""
+        assert gantt.occupancy_runs([(0.25, 0.5), (0.75, 1.0)], 0, 1.0, 4) == [0, 1, 2]
+        assert gantt.occupancy_runs([(0.0, 0.01)], 0, 1.0, 4) == [0, 1, 1]
+
+
+class TestGanttPyramid:
+    """Tests for gantt.GanttPyramid class"""
+
+    def slices(self, nr_slices, nr_tasks=4):
+        return [[f"T{i % nr_tasks}", i * 0.5, i * 0.5 + 0.5] for i in range(nr_slices)]
+
+    def test_levels(self):
+        """Test that levels double until the shortest slice"""
+        pyramid = gantt.GanttPyramid(self.slices(64), base_bins=4)
+        assert [bins for bins, _ in pyramid.levels] == [4, 8, 16, 32, 64]
+        assert pyramid.exact
+
+    def test_budget(self):
+        """Test that the bins and runs stay bounded whatever the number of slices"""
+        pyramid = gantt.GanttPyramid(self.slices(20000), base_bins=16, max_bins=256, max_runs=1000)
+        assert pyramid.levels[-1][0] <= 256
+        assert sum(len(runs) // 3 for _, level in pyramid.levels[1:-1] for runs in level) < 1000
+        assert not pyramid.exact
+        assert pyramid.to_dict()["slices"] is None
+
+
+class TestExport:
+    """Tests for gantt.export()"""
+
+    def test_svg(self, tmp_path):
+        """Test that the SVG is well formed and has a row per task"""
+        path = str(tmp_path / "gantt.svg")
+        gantt.export([["A", 0, 1], ["B", 1, 3]], path)
+        root = ET.parse(path).getroot()
+        labels = [e.text for e in root.iter("{http://www.w3.org/2000/svg}text")]
+        assert "Task A" in labels and "Task B" in labels
+
+    def test_html(self, tmp_path):
+        """Test that the page embeds its data and needs no other file"""
+        path = tmp_path / "gantt.html"
+        gantt.export([["A", 0, 1], ["</script>", 1, 3]], str(path), title="td1")
+        page = path.read_text()
+        data = json.loads(page.split("const data = ")[1].split(";\n")[0])
+        assert data["tasks"] == ["</script>", "A"]
+        assert page.count("</script>") == 1
+        assert "src=" not in page and "<link" not in page
+
+    def script(self, tmp_path):
+        path = tmp_path / "gantt.html"
+        gantt.export([["A", 0, 1], ["B", 1, 3]], str(path))
+        page = path.read_text()
+        return page.split("<script>")[1].split("</script>")[0]
+
+    def test_no_browser_global_redeclared(self, tmp_path):
+        """Test that the top-level declarations of the script do not use window properties"""
+        names = set()
+        for declaration in re.findall(r"^(?:let|const) (.*?);?$", self.script(tmp_path), re.M):
+            names.update(re.findall(r"(?:^|, )(\w+) =", declaration))
+        names.update(re.findall(r"^function (\w+)", self.script(tmp_path), re.M))
+        assert "v0" in names and "draw" in names
+        assert not names & {"top", "window", "document", "location", "self", "parent", "frames", "name", "status", "length", "event"}
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_script_loads_with_top_defined(self, tmp_path):
+        """Test that the script gets past its declarations with a non-configurable top, like in a browser"""
+        code = (
+            "const vm = require('vm'); const ctx = vm.createContext({});"
+            "vm.runInContext(\"Object.defineProperty(globalThis, 'top', {value: {}, configurable: false})\", ctx);"
+            "try { vm.runInContext(require('fs').readFileSync(0, 'utf8'), ctx); } catch (e) { console.log(e.name); }"
+        )
+        out = subprocess.run(["node", "-e", code], input=self.script(tmp_path), capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "ReferenceError"  #no document outside a browser, reached after the declarations
+
+    def test_cli(self, fpath, tmp_path, capsys):
+        """Test the --gantt-export option"""
+        path = tmp_path / "gantt.html"
+        main.main([fpath, "--no-cache", "--gantt-export", str(path)])
+        assert "Diagramme de Gantt" in capsys.readouterr().err
+        assert path.stat().st_size > 0
@@ -0,0 +1,135 @@
+"""Unit testing for group scheduling"""
+import pytest
+
+import src.group as group
+import src.cfscalc as cfscalc
+import src.cfsengine as cfsengine
+import src.logger as logger
+import src.task as task
+
+
+class TestTaskGroup:
+    """Tests for group.TaskGroup class"""
+
+    def test_default_weight_is_nice_0(self):
+        """Test that cpu.weight 100 maps to NICE_0_WEIGHT"""
+        g = group.TaskGroup("/a")
+        assert g.get_task_weight() == 1024
+
+    def test_cpu_weight_scaling(self):
+        """Test that cpu.weight scales the entity weight linearly"""
+        g = group.TaskGroup("/a", cpu_weight=200)
+        assert g.get_task_weight() == 2048
+
+    def test_invalid_cpu_weight(self):
+        """Test that out of range cpu.weight values are rejected"""
+        with pytest.raises(ValueError):
+            group.TaskGroup("/a", cpu_weight=0)
+
+    def test_normalize_path(self):
+        """Test group path normalization"""
+        assert group.normalize_path("a//b/") == "/a/b"
+        assert group.normalize_path("/") == "/"
+
+
+class TestGroupRunqueue:
+    """Tests for group.GroupRunqueue class"""
+
+    def test_get_group_creates_parents(self):
+        """Test that a nested group is attached to its parents"""
+        rq = group.GroupRunqueue()
+        g = rq.get_group("/a/b")
+        assert g.parent is rq.groups["/a"]
+        assert g.parent.parent is rq.root
+
+    def test_enqueue_updates_load_incrementally(self):
+        """Test that load and nr_running follow enqueue and dequeue"""
+        rq = group.GroupRunqueue()
+        t1 = task.Task("T1", 0.0, 0, [("CPU", 5)], group="/a")
+        t2 = task.Task("T2", 0.0, -5, [("CPU", 5)], group="/a")
+
+        rq.add_task(t1)
+        rq.add_task(t2)
+        g = rq.groups["/a"]
+
+        assert len(rq) == 2
+        assert g.load == t1.get_task_weight() + t2.get_task_weight()
+        assert g.on_rq
+        assert rq.root.load == g.get_task_weight()
+
+        picked = rq.pick_next_task()
+        assert len(rq) == 1
+        assert g.load == t1.get_task_weight() + t2.get_task_weight() - picked.get_task_weight()
+        assert g.curr and not g.on_rq
+
+    def test_group_is_requeued_after_pick(self):
+        """Test that the running group goes back to its parent at the next pick"""
+        rq = group.GroupRunqueue()
+        rq.add_task(task.Task("T1", 0.0, 0, [("CPU", 5)], group="/a"))
+        rq.add_task(task.Task("T2", 0.0, 0, [("CPU", 5)], group="/a"))
+
+        rq.pick_next_task()
+        rq.pick_next_task()
+        assert len(rq) == 0
+        assert rq.pick_next_task() is None
+        assert not rq.groups["/a"].on_rq
+
+    def test_pick_alternates_between_groups(self):
+        """Test that the group with the lowest vruntime is picked first"""
+        rq = group.GroupRunqueue()
+        rq.add_task(task.Task("A1", 0.0, 0, [("CPU", 5)], group="/a"))
+        rq.add_task(task.Task("B1", 0.0, 0, [("CPU", 5)], group="/b"))
+        rq.groups["/a"].vruntime = 5.0
+        rq.root.rq.tasks.sort(key=lambda e: e.vruntime)
+
+        assert rq.pick_next_task().id == "B1"
+
+
+class TestGroupCalculator:
+    """Tests for cfscalc.GroupCalculator class"""
+
+    def test_slice_is_product_of_shares(self):
+        """Test that the slice is split at each level of the hierarchy"""
+        calc = cfscalc.GroupCalculator()
+        rq = group.GroupRunqueue()
+        for i in range(2):
+            rq.add_task(task.Task(f"A{i}", 0.0, 0, [("CPU", 50)], group="/a"))
+        rq.add_task(task.Task("B", 0.0, 0, [("CPU", 50)], group="/b"))
+
+        rq.groups["/a"].vruntime = -1.0  # make /a the first pick
+        rq.root.rq.tasks.sort(key=lambda e: e.vruntime)
+        picked = rq.pick_next_task()
+
+        assert picked.group == "/a"
+        assert calc.calc_cur_time_slice(rq, picked) == pytest.approx(6.0 * 0.5 * 0.5)
+
+    def test_update_vruntime_charges_ancestors(self):
+        """Test that the groups of the task are charged with their own weight"""
+        calc = cfscalc.GroupCalculator()
+        rq = group.GroupRunqueue()
+        rq.set_group_weight("/a", 200)
+        t1 = task.Task("T1", 0.0, 0, [("CPU", 5)], group="/a/b")
+        rq.add_task(t1)
+
+        calc.update_vruntime(t1, 2.0)
+
+        assert t1.vruntime == pytest.approx(2.0)
+        assert rq.groups["/a/b"].vruntime == pytest.approx(2.0)
+        assert rq.groups["/a"].vruntime == pytest.approx(1.0)
+        assert rq.root.vruntime == 0.0
+
+
+class TestGroupIsolation:
+    """Tests for tenant isolation in a full simulation"""
+
+    def test_small_tenant_gets_its_share(self):
+        """Test that a tenant with one task is not starved by a tenant with many tasks"""
+        big = [task.Task(f"B{i}", 0.0, 0, [("CPU", 20)], group="/big") for i in range(10)]
+        small = task.Task("S", 0.0, 0, [("CPU", 20)], group="/small")
+        log = logger.CFSLogger()
+        log._write = lambda message: None
+        engine = cfsengine.CFSEngine(log, big + [small], group.GroupRunqueue(), cfscalc.GroupCalculator())
+        engine.run()
+
+        # alone, the small tenant would get 1/11 of the CPU, with groups it gets half
+        assert small.end_time == pytest.approx(40.0, abs=6.0)
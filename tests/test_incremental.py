@@ -0,0 +1,154 @@
+"""Unit testing for incremental re-simulation"""
+import pytest
+
+import src.cfsengine as cfsengine
+import src.incremental as incremental
+import src.logger as logger
+import src.main as main
+import src.simulation as simulation
+import src.utils as utils
+
+WORKLOAD = [f"T{i} {i * 7} {i % 5 - 2} 3 2 4" for i in range(30)]
+
+
+def make_engine(lines, verbose=False):
+    rows, directives = utils.parse_lines(lines)
+    tasks = utils.build_tasks(rows)
+    rqueue, logic = simulation.make_scheduler(tasks, directives)
+    log = logger.CFSLogger(verbose=verbose)
+    log._write = lambda message: None
+    return rows, directives, tasks, cfsengine.CFSEngine(logger=log, tasks=tasks, rqueue=rqueue, logic=logic)
+
+
+def results(tasks):
+    return [(t.id, t.start_time, t.end_time, t.exec_time, t.vruntime) for t in tasks]
+
+
+def rerun(old_lines, new_lines, interval=10.0):
+    """Record a run of old_lines, then run new_lines from it; return the new run and a full run."""
+    rows, directives, tasks, engine = make_engine(old_lines, verbose=True)
+    recording = incremental.run(engine, tasks, rows, directives, interval=interval)
+
+    rows, directives, tasks, engine = make_engine(new_lines, verbose=True)
+    new_recording = incremental.run(engine, tasks, rows, directives, recording, interval=interval)
+
+    _, _, full_tasks, full_engine = make_engine(new_lines, verbose=True)
+    full_engine.run()
+    return tasks, engine, new_recording, full_tasks, full_engine
+
+
+class TestEarliestChange:
+    """Tests for incremental.earliest_change() function"""
+
+    def test_same_workload(self):
+        """Test that the file order of different arrivals does not matter"""
+        rows = utils.parse_lines(WORKLOAD)[0]
+        assert incremental.earliest_change(rows, rows[::-1]) is None
+
+    def test_edited_added_removed(self):
+        """Test that the earliest arrival of an edited, added or removed task is found"""
+        rows = utils.parse_lines(WORKLOAD)[0]
+        edited = rows[:20] + [rows[20][:3] + [[("CPU", 9)]] + rows[20][4:]] + rows[21:]
+        assert incremental.earliest_change(rows, edited) == 140.0
+        assert incremental.earliest_change(rows, rows + [["X", 50, 0, [("CPU", 1)], {}]]) == 50.0
+        assert incremental.earliest_change(rows, rows[:-1]) == 203.0
+
+    def test_moved_task(self):
+        """Test that moving a task counts at its old and new arrival"""
+        rows = utils.parse_lines(WORKLOAD)[0]
+        moved = [rows[25][:1] + [30] + rows[25][2:]] + rows[:25] + rows[26:]
+        assert incremental.earliest_change(rows, moved) == 30.0
+
+
+class TestCheckpoint:
+    """Tests for CFSEngine.checkpoint() and CFSEngine.restore()"""
+
+    def test_restore_gives_same_end(self):
+        """Test that running again from a checkpoint reproduces the schedule"""
+        _, _, _, engine = make_engine(WORKLOAD)
+        engine.start()
+        engine.run_until(60.0)
+        cp = engine.checkpoint(60.0)
+        engine.run_until(float("inf"))
+
+        _, _, fresh_tasks, other = make_engine(WORKLOAD)
+        other.restore(cp, [t for t in fresh_tasks if t.arrival_time >= 60.0])
+        other.run_until(float("inf"))
+        assert other.time == engine.time
+        assert other.logger.gantt_data == engine.logger.gantt_data[cp.nr_gantt:]
+
+    def test_checkpoint_is_a_copy(self):
+        """Test that the checkpoint does not change when the engine goes on"""
+        _, _, _, engine = make_engine(WORKLOAD)
+        engine.start()
+        engine.run_until(20.0)
+        running = engine.current_task
+        cp = engine.checkpoint(20.0, [(0, running)])
+        exec_time = running.exec_time
+        engine.run_until(float("inf"))
+
+        assert cp.tasks[0][1] is cp.state["current_task"]
+        assert cp.state["current_task"].exec_time == exec_time
+
+
+class TestIncrementalRun:
+    """Tests for incremental.run() function"""
+
+    def test_late_edit(self):
+        """Test that editing a late task resumes late and matches a full run"""
+        new = WORKLOAD[:25] + ["T25 175 0 8 1 8"] + WORKLOAD[26:]
+        tasks, engine, recording, full_tasks, full_engine = rerun(WORKLOAD, new)
+
+        assert recording.resumed_from == 170.0
+        assert results(tasks) == results(full_tasks)
+        assert engine.logger.history == full_engine.logger.history
+        assert engine.logger.gantt_data == full_engine.logger.gantt_data
+
+    @pytest.mark.parametrize("new", [
+        WORKLOAD + ["X 150 -3 20"],
+        WORKLOAD[:10] + WORKLOAD[11:],
+        WORKLOAD,
+    ])
+    def test_matches_full_run(self, new):
+        """Test added, removed and unchanged tasks"""
+        tasks, engine, _, full_tasks, full_engine = rerun(WORKLOAD, new)
+        assert results(tasks) == results(full_tasks)
+        assert engine.logger.history == full_engine.logger.history
+
+    def test_groups_and_quotas(self):
+        """Test that group and bandwidth state is restored"""
+        old = ["@group /a weight=300 quota=5 period=20"] + [line + (" group=/a" if i % 2 else " quota=4 period=10") for i, line in enumerate(WORKLOAD)]
+        new = old[:28] + ["T27 189 0 1"] + old[29:]
+        tasks, engine, recording, full_tasks, full_engine = rerun(old, new)
+
+        assert recording.resumed_from > 0
+        assert results(tasks) == results(full_tasks)
+        assert engine.rqueue.get_group("/a").bandwidth.nr_throttled == full_engine.rqueue.get_group("/a").bandwidth.nr_throttled
+
+    def test_other_directives_run_again(self):
+        """Test that a recording with other directives is not used"""
+        old = ["@group /a weight=300"] + WORKLOAD
+        new = ["@group /a weight=200"] + WORKLOAD
+        tasks, _, recording, full_tasks, _ = rerun(old, new)
+        assert recording.resumed_from == 0.0
+        assert results(tasks) == results(full_tasks)
+
+
+class TestMainCheckpoints:
+    """Tests for --checkpoints in the scfs CLI"""
+
+    def test_same_output(self, tmp_path, capsys):
+        """Test that a resumed CLI run prints the output of a full run"""
+        old, new = tmp_path / "old.txt", tmp_path / "new.txt"
+        old.write_text("\n".join(WORKLOAD) + "\n")
+        new.write_text("\n".join(WORKLOAD[:-1] + ["T29 203 0 5"]) + "\n")
+        checkpoints = str(tmp_path / "rec.pkl")
+
+        main.main([str(old), "--no-cache", "--checkpoints", checkpoints])
+        capsys.readouterr()
+        main.main([str(new), "--no-cache", "--checkpoints", checkpoints])
+        resumed = capsys.readouterr()
+        main.main([str(new), "--no-cache"])
+
+        assert "Reprise" in resumed.err
+        assert resumed.out == capsys.readouterr().out
@@ -0,0 +1,106 @@
+"""Unit testing for live ingestion"""
+import asyncio
+import io
+import pytest
+
+import src.cfsengine as cfsengine
+import src.live as live
+import src.logger as logger
+import src.simulation as simulation
+import src.utils as utils
+
+
+async def lines_of(text):
+    for line in text.splitlines(keepends=True):
+        yield line
+
+
+def run_stream(text, sim=None):
+    """Run a live simulation on the lines of text, return the simulator and its output."""
+    sim = sim if sim is not None else live.LiveSimulator()
+    out = io.StringIO()
+    asyncio.run(live.run_live(lines_of(text), sim, out))
+    return sim, out.getvalue().splitlines()
+
+
+class TestCFSEngineIncremental:
+    """Tests for the incremental CFSEngine API"""
+
+    def test_run_until_stops_before_limit(self):
+        """Test that events at the limit are left for later"""
+        log = logger.CFSLogger(verbose=False)
+        engine = cfsengine.CFSEngine(logger=log, tasks=utils.build_tasks([["A", 0, 0, [("CPU", 5)]]]))
+        engine.start()
+        engine.run_until(5.0)
+        assert engine.current_task is not None
+        assert engine.next_event() == (5.0, "CPU_STOP")
+
+        engine.run_until(float("inf"))
+        assert engine.next_event() is None
+
+    def test_add_task_keeps_arrival_order(self):
+        """Test that tasks added later are sorted by arrival, after equal arrivals"""
+        engine = cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False))
+        a, b, c = utils.build_tasks([["A", 2, 0, [("CPU", 1)]], ["B", 1, 0, [("CPU", 1)]], ["C", 2, 0, [("CPU", 1)]]])
+        for t in (a, b, c):
+            engine.add_task(t)
+        assert engine.pending_tasks == [b, a, c]
+
+
+class TestLiveSimulator:
+    """Tests for live.LiveSimulator"""
+
+    @pytest.mark.parametrize("file", ["td1.txt", "a.txt"])
+    def test_same_schedule_as_batch(self, fpath, file):
+        """Test that streaming a file gives the events and results of a batch run"""
+        path = fpath.replace("td1.txt", file)
+        batch_log = logger.CFSLogger()
+        batch_log._write = lambda message: None
+        batch_tasks, _ = simulation.simulate(utils.file_to_tasks(path), sim_logger=batch_log)
+
+        with open(path) as f:
+            sim, out = run_stream(f.read())
+
+        assert sim.logger.history == batch_log.history
+        assert out[:len(batch_log.history)] == batch_log.history
+        assert [t.end_time for t in sim.tasks] == [t.end_time for t in batch_tasks]
+        assert sim.late == 0
+
+    def test_time_stops_at_watermark(self):
+        """Test that nothing at or after the newest arrival is simulated"""
+        sim = live.LiveSimulator()
+        sim.feed_line("A 0 0 10\n")
+        sim.feed_line("B 4 0 1\n")
+        assert sim.engine.time < 4.0
+        assert sim.engine.current_task is sim.tasks[0]
+        assert sim.tasks[0].exec_time == 0.0
+
+    def test_late_task_moved_to_watermark(self):
+        """Test that a task received after its arrival time arrives at the watermark"""
+        sim, _ = run_stream("A 5 0 1\nB 2 0 1\n")
+        assert sim.late == 1
+        assert sim.tasks[1].arrival_time == 5.0
+
+    def test_bad_lines_are_skipped(self):
+        """Test that invalid lines do not stop the stream"""
+        sim, _ = run_stream("A 0 0 1\nB x 0 1\n@group /a weight=200\nC 1 0 1\n")
+        assert [t.id for t in sim.tasks] == ["A", "C"]
+        assert [t.end_time for t in sim.tasks] == [1.0, 2.0]
+
+    def test_group_directives(self):
+        """Test that @group directives apply to a group runqueue"""
+        rqueue, logic = simulation.make_scheduler([], [], groups=True)
+        sim, _ = run_stream("@group /a weight=300\nA 0 0 2 group=/a\n", live.LiveSimulator(rqueue, logic))
+        assert rqueue.get_group("/a").weight == 3072
+        assert sim.tasks[0].end_time == 2.0
+
+    def test_backpressure(self):
+        """Test that ingestion waits when the event queue is full"""
+        async def scenario():
+            sim = live.LiveSimulator(maxsize=1)
+            await sim.ingest("A 0 0 5\n")
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(sim.ingest("B 10 0 1\n"), 0.05)
+            assert sim.events.full()
+
+        asyncio.run(scenario())
@@ -4,7 +4,10 @@ import tempfile
 import os
 from unittest.mock import patch, MagicMock
 
+import src.bandwidth as bandwidth
+import src.dvfs as dvfs
 import src.logger as logger
+import src.overhead as overhead
 import src.task as task
 
 
@@ -152,6 +155,39 @@ class TestCFSLoggerLogEvent:
         assert "10.50" in log.history[0]
 
 
+class TestCFSLoggerLogBatch:
+    """Tests for CFSLogger.log_batch() method"""
+
+    def make_events(self):
+        tasks = [task.Task(f"T{i}", 0.0, 0, [("CPU", 5)]) for i in range(4)]
+        return [("ARRIVAL", tasks[0]), ("TASK_END", tasks[1]), ("ARRIVAL", tasks[2]), ("ARRIVAL", tasks[3])]
+
+    def test_one_record_per_event_by_default(self, capsys):
+        """Test that without a threshold every event is logged, in order"""
+        log = logger.CFSLogger()
+        log.log_batch(2.0, self.make_events())
+
+        assert len(log.history) == 4
+        assert ["T0", "T1", "T2", "T3"] == [line.split("|Task ")[1].split()[0] for line in log.history]
+
+    def test_grouped_past_threshold(self, capsys):
+        """Test that past the threshold each event type gets one record"""
+        log = logger.CFSLogger()
+        log.batch_threshold = 3
+        log.log_batch(2.0, self.make_events())
+
+        assert len(log.history) == 2
+        assert "ARRIVAL" in log.history[0] and "3 tasks (T0 .. T3)" in log.history[0]
+        assert "TASK_END" in log.history[1] and "1 tasks (T1)" in log.history[1]
+
+    def test_not_grouped_at_threshold(self, capsys):
+        """Test that a batch of exactly the threshold is logged event by event"""
+        log = logger.CFSLogger()
+        log.batch_threshold = 4
+        log.log_batch(2.0, self.make_events())
+        assert len(log.history) == 4
+
+
 class TestCFSLoggerHistory:
     """Tests for CFSLogger history management"""
     
@@ -448,6 +484,111 @@ class TestCFSLoggerPrintSummary:
         assert len(tasks) == original_len
 
 
+class TestCFSLoggerPrintGroupSummary:
+    """Tests for CFSLogger.print_group_summary() method"""
+
+    def test_print_group_summary_with_empty_tasks(self, capsys):
+        """Test print_group_summary() with empty task list"""
+        log = logger.CFSLogger()
+        log.print_group_summary([])
+
+        captured = capsys.readouterr()
+        assert "No task to show" in captured.out
+
+    def test_print_group_summary_aggregates_subgroups(self, capsys):
+        """Test that parent groups include the tasks of their sub-groups"""
+        log = logger.CFSLogger()
+        tasks = [
+            task.Task("T1", 0.0, 0, [("CPU", 3)], group="/a/x"),
+            task.Task("T2", 0.0, 0, [("CPU", 1)], group="/b")
+        ]
+        for t, end in zip(tasks, (4.0, 1.0)):
+            t.exec_time = t.bursts[0][1]
+            t.start_time = 0.0
+            t.end_time = end
+
+        log.print_group_summary(tasks)
+
+        lines = capsys.readouterr().out.split("\n")
+        row = {line.split("|")[1].strip(): line for line in lines if line.startswith("| /")}
+        assert set(row) == {"/", "/a", "/a/x", "/b"}
+        assert "75.00" in row["/a"]
+        assert "25.00" in row["/b"]
+
+
+class TestCFSLoggerPrintBandwidthSummary:
+    """Tests for CFSLogger.print_bandwidth_summary() method"""
+
+    def test_print_bandwidth_summary_without_quota(self, capsys):
+        """Test print_bandwidth_summary() with nothing to show"""
+        log = logger.CFSLogger()
+        log.print_bandwidth_summary([])
+
+        assert "No quota to show" in capsys.readouterr().out
+
+    def test_print_bandwidth_summary_shows_throttled_time(self, capsys):
+        """Test that the throttled time of each entity is shown"""
+        log = logger.CFSLogger()
+        bw = bandwidth.CFSBandwidth(2.0, 10.0)
+        bw.throttle(2.0)
+        bw.unthrottle(10.0)
+
+        log.print_bandwidth_summary([("/web", bw)])
+
+        output = capsys.readouterr().out
+        assert "/web" in output
+        assert "8.00" in output
+
+
+class TestCFSLoggerPrintPlacementSummary:
+    """Tests for CFSLogger.print_placement_summary() method"""
+
+    def test_one_row_per_policy(self, capsys):
+        """Test that each policy gets its latencies and throughput"""
+        a = task.Task("A", 0.0, 0, [("CPU", 2), ("IO", 2), ("CPU", 2)])
+        a.start_time, a.end_time = 0.0, 8.0
+        log = logger.CFSLogger()
+        log.print_placement_summary([("default", [a]), ("kernel", [a])])
+
+        output = capsys.readouterr().out
+        assert "| default " in output and "| kernel " in output
+        assert "125.00   tasks/s" in output
+
+
+class TestCFSLoggerPrintOverheadSummary:
+    """Tests for CFSLogger.print_overhead_summary() method"""
+
+    def test_useful_cpu(self, capsys):
+        """Test that the overhead and the useful CPU share are shown"""
+        a = task.Task("A", 0.0, 0, [("CPU", 3)])
+        a.start_time, a.end_time, a.exec_time = 0.0, 4.0, 3.0
+        model = overhead.SwitchOverhead(switch_cost=1.0)
+        model.cost("A", 0.0)
+        log = logger.CFSLogger()
+        log.print_overhead_summary([(0.75, [a], model)])
+
+        output = capsys.readouterr().out
+        assert "| 0.75      | 1        | 1.00        | 0.00        | 25.00   % | 75.00    % |" in output
+
+
+class TestCFSLoggerPrintEnergySummary:
+    """Tests for CFSLogger.print_energy_summary() method"""
+
+    def test_perf_per_watt(self, capsys):
+        """Test that energy, power and tasks per joule are shown"""
+        a = task.Task("A", 0.0, 0, [("CPU", 4)])
+        a.start_time, a.end_time, a.exec_time = 0.0, 4.0, 4.0
+        model = dvfs.DVFS("performance", [(1000, 0.5)], idle_power=0.0)
+        model.update(0.0, True)
+        model.update(4.0, False)
+        log = logger.CFSLogger()
+        log.print_energy_summary([("performance", [a], model)])
+
+        output = capsys.readouterr().out
+        assert "| performance | 2.00        | 0.500   W | 1000 MHz | 4.00       |" in output
+        assert "500.00  tasks/J" in output
+
+
 class TestCFSLoggerIntegrationWrite:
     """Integration tests for _write() and print_summary() together"""
     
@@ -0,0 +1,104 @@
+"""Unit testing for the streamed log outputs and their readers"""
+import pytest
+
+import src.fastengine as fastengine
+import src.logger as logger
+import src.logstream as logstream
+import src.main as main
+import src.simulation as simulation
+import src.utils as utils
+
+
+def reference_history(rows):
+    reference = logger.CFSLogger()
+    reference._write = lambda message: None
+    simulation.simulate(rows, sim_logger=reference)
+    return reference.history
+
+
+class TestBlockLogger:
+    """Tests for logstream.BlockLogger class"""
+
+    @pytest.mark.parametrize("suffix", [".log", ".log.gz", ".log.bz2", ".log.xz"])
+    def test_same_lines_as_console(self, fpath, tmp_path, suffix):
+        """Test that the (compressed) file holds the lines of the text log"""
+        rows = utils.file_to_tasks(fpath)
+        path = str(tmp_path / ("events" + suffix))
+        log = logstream.BlockLogger(path, block=64)
+        simulation.simulate(rows, sim_logger=log)
+        log.close()
+
+        assert list(logstream.read_lines(path)) == reference_history(rows)
+        assert log.history == []
+
+    def test_compression(self, tmp_path):
+        """Test that a repetitive log gets at least 10 times smaller"""
+        rows = [[f"T{i}", i, 0, [("CPU", 3), ("IO", 2), ("CPU", 3)]] for i in range(200)]
+        plain, packed = str(tmp_path / "a.log"), str(tmp_path / "a.log.gz")
+        for path in (plain, packed):
+            log = logstream.BlockLogger(path)
+            simulation.simulate(rows, sim_logger=log)
+            log.close()
+        assert (tmp_path / "a.log").stat().st_size > 10 * (tmp_path / "a.log.gz").stat().st_size
+
+
+class TestEventStream:
+    """Tests for logstream.EventStreamLogger and logstream.read_events()"""
+
+    def write(self, rows, path, block=logstream.DEFAULT_BLOCK):
+        log = logstream.EventStreamLogger(path, block)
+        log._write = lambda message: None
+        simulation.simulate(rows, sim_logger=log)
+        log.close()
+        return log
+
+    def test_round_trip(self, fpath, tmp_path):
+        """Test that the decoded events are the events of the text log"""
+        rows = utils.file_to_tasks(fpath)
+        recorder = fastengine.EventRecorder()
+        simulation.simulate(rows, sim_logger=recorder)
+        path = str(tmp_path / "events.bin")
+        log = self.write(rows, path, block=16)
+
+        events = list(logstream.read_events(path, block=5))  #records cut by the blocks
+        assert log.nr_events == len(recorder.events)
+        assert [(e.time, e.event_type, e.task_id, e.message) for e in events] == \
+               [(round(t, 6), kind, task_id, message) for t, kind, task_id, _, message in recorder.events]
+
+    def test_size(self, tmp_path):
+        """Test that the stream is at least 10 times smaller than the text log"""
+        rows = [[f"T{i}", i, i % 5, [("CPU", 3), ("IO", 2.5), ("CPU", 3)]] for i in range(200)]
+        path = tmp_path / "events.bin"
+        self.write(rows, str(path))
+        text_size = sum(len(line) + 1 for line in reference_history(rows))
+        assert text_size > 10 * path.stat().st_size
+
+    def test_truncated(self, tmp_path):
+        """Test that a cut stream is reported"""
+        path = tmp_path / "events.bin"
+        self.write([["A", 0, 0, [("CPU", 1)]]], str(path))
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError):
+            list(logstream.read_events(str(path)))
+
+    def test_not_a_stream(self, tmp_path):
+        """Test that another file is refused"""
+        path = tmp_path / "events.log"
+        path.write_text("[0.000000 ms] START\n")
+        assert not logstream.is_event_stream(str(path))
+        with pytest.raises(ValueError):
+            list(logstream.read_events(str(path)))
+
+
+class TestEventsCommand:
+    """Tests for the scfs events subcommand"""
+
+    def test_head(self, fpath, tmp_path, capsys):
+        """Test that the command decodes the first lines of a stream"""
+        path = str(tmp_path / "events.bin")
+        main.main([fpath, "--no-cache", "--event-stream", path])
+        capsys.readouterr()
+        main.main(["events", path, "--head", "2"])
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert "START" in lines[0] and "ARRIVAL" in lines[1]
@@ -0,0 +1,116 @@
+"""Unit testing for metrics functions"""
+import pytest
+
+import src.metrics as metrics
+import src.task as task
+
+
+def finished_task(task_id, arrival, bursts, start, end):
+    t = task.Task(task_id, arrival, 0, bursts)
+    t.start_time = start
+    t.end_time = end
+    return t
+
+
+class TestTaskMetrics:
+    """Tests for metrics.task_metrics() function"""
+
+    def test_task_metrics(self):
+        """Test the metrics of a task with CPU and I/O bursts"""
+        t = finished_task("A", 1.0, [("CPU", 2), ("IO", 3), ("CPU", 1)], start=2.0, end=10.0)
+        m = metrics.task_metrics(t)
+
+        assert m["response"] == 1.0
+        assert m["turnaround"] == 9.0
+        assert m["cpu"] == 3
+        assert m["io"] == 3
+        assert m["waiting"] == 3.0
+
+    def test_waiting_is_never_negative(self):
+        """Test that waiting time is clamped to 0"""
+        t = finished_task("A", 0.0, [("CPU", 5)], start=0.0, end=4.0)
+        assert metrics.task_metrics(t)["waiting"] == 0.0
+
+    def test_task_never_started(self):
+        """Test that a task without start time has no response time"""
+        t = finished_task("A", 3.0, [], start=None, end=3.0)
+        assert metrics.task_metrics(t)["response"] == 0.0
+
+
+class TestSummarize:
+    """Tests for metrics.summarize() function"""
+
+    def test_summarize_empty(self):
+        """Test that an empty simulation summarizes to zeros"""
+        assert metrics.summarize([])["avg_turnaround"] == 0.0
+
+    def test_summarize(self):
+        """Test averages and CPU utilization"""
+        tasks = [
+            finished_task("A", 0.0, [("CPU", 2)], start=0.0, end=2.0),
+            finished_task("B", 0.0, [("CPU", 2)], start=2.0, end=4.0),
+        ]
+        summary = metrics.summarize(tasks)
+
+        assert summary["avg_response"] == 1.0
+        assert summary["avg_turnaround"] == 3.0
+        assert summary["avg_waiting"] == 1.0
+        assert summary["cpu_utilization"] == pytest.approx(100.0)
+
+
+class TestClassSummary:
+    """Tests for metrics.class_summary() function"""
+
+    def test_interactive_and_batch(self):
+        """Test that tasks with I/O and CPU-only tasks are averaged apart"""
+        tasks = [
+            finished_task("I", 0.0, [("CPU", 1), ("IO", 2), ("CPU", 1)], start=1.0, end=6.0),
+            finished_task("B1", 0.0, [("CPU", 4)], start=0.0, end=8.0),
+            finished_task("B2", 0.0, [("CPU", 2)], start=2.0, end=4.0),
+        ]
+        summary = metrics.class_summary(tasks)
+
+        assert summary["interactive_response"] == 1.0
+        assert summary["interactive_turnaround"] == 6.0
+        assert summary["batch_response"] == 1.0
+        assert summary["batch_turnaround"] == 6.0
+        assert summary["throughput"] == pytest.approx(3 / 8.0 * 1000)
+
+    def test_no_batch_task(self):
+        """Test that an empty class averages to 0"""
+        summary = metrics.class_summary([finished_task("I", 0.0, [("CPU", 1), ("IO", 2), ("CPU", 1)], start=0.0, end=4.0)])
+        assert summary["batch_turnaround"] == 0.0
+
+
+class TestRunningSummary:
+    """Tests for metrics.RunningSummary class"""
+
+    def tasks(self, n):
+        return [finished_task(f"T{i}", i, [("CPU", 1), ("IO", i % 4)], i + i % 3, i + 2 + i % 7) for i in range(n)]
+
+    def test_same_as_analysis(self):
+        """Test that the averages and percentiles match the vectorized summary while every task is sampled"""
+        analysis = pytest.importorskip("src.analysis")
+        tasks = self.tasks(50)
+        running = metrics.RunningSummary(max_rows=5)
+        for t in tasks:
+            running.add(t)
+
+        expected = analysis.summarize(tasks)[1]
+        assert running.summary() == pytest.approx(expected)
+
+    def test_bounded(self):
+        """Test that only max_rows tasks and a reservoir of times are kept"""
+        running = metrics.RunningSummary(max_rows=3, reservoir=10)
+        for t in self.tasks(200):
+            running.add(t)
+
+        assert running.nr_tasks == 200
+        assert len(running.sample) == 10
+        rows = running.rows()
+        assert [row[3]["turnaround"] for row in rows] == [8.0, 8.0, 8.0]
+        assert [row[0] for row in rows] == ["T6", "T13", "T20"]
+
+    def test_empty(self):
+        """Test the summary of no task"""
+        assert metrics.RunningSummary().summary()["avg_turnaround"] == 0.0
@@ -0,0 +1,84 @@
+"""Unit testing for the context-switch overhead model"""
+import math
+
+import pytest
+
+import src.fastengine as fastengine
+import src.logger as logger
+import src.main as main
+import src.overhead as overhead
+import src.simulation as simulation
+import src.utils as utils
+
+
+class TestSwitchOverhead:
+    """Tests for overhead.SwitchOverhead class"""
+
+    def test_cache_warmth(self):
+        """Test that the refill depends on the time since the task last ran, and on its CPU"""
+        model = overhead.SwitchOverhead(switch_cost=0.1, refill=1.0, decay=2.0)
+        assert model.cost("A", 0.0) == pytest.approx(1.1)     #never ran: cold cache
+        model.ran("A", 3.0)
+        assert model.cost("B", 3.0) == pytest.approx(1.1)
+        model.ran("B", 4.0)
+        assert model.cost("A", 4.0) == pytest.approx(0.1 + 1 - math.exp(-0.5))
+        assert model.cost("A", 5.0) == 0.0     #same task again: no switch
+        assert model.cost("B", 9.0, cpu=1) == pytest.approx(1.1)  #other CPU: cold cache
+
+        assert model.nr_switches == 4
+        assert model.total() == pytest.approx(model.switch_time + model.refill_time)
+
+    def test_invalid(self):
+        """Test that negative costs are refused"""
+        with pytest.raises(ValueError):
+            overhead.SwitchOverhead(switch_cost=-1)
+
+
+class TestCFSEngineOverhead:
+    """Tests for the switch overhead in CFSEngine"""
+
+    def test_charged_to_the_cpu_timeline(self):
+        """Test that the overhead delays the slice, in its own Gantt lane, without being charged to the task"""
+        sim_logger = logger.CFSLogger(verbose=False)
+        tasks, engine = simulation.simulate([["A", 0, 0, [("CPU", 4)]]], [("overhead", [], {"switch": "0.5", "refill": "1"})],
+                                            sim_logger=sim_logger)
+        assert sim_logger.gantt_data == [(overhead.LANE, 0.0, 1.5), ("A", 1.5, 5.5)]
+        assert tasks[0].end_time == 5.5
+        assert tasks[0].exec_time == 4.0 and tasks[0].vruntime == 4.0
+        assert engine.overhead.nr_switches == 1
+
+    def test_short_slices_cost_more(self, fpath):
+        """Test that a smaller minimum granularity switches more and leaves less useful CPU"""
+        rows = utils.file_to_tasks(fpath)
+        directives = [("overhead", [], {"switch": "0.05", "refill": "0.2"})]
+        results = []
+        for min_granularity in (0.5, 4.0):
+            tasks, engine = simulation.simulate(rows, directives, params={"min_granularity": min_granularity})
+            results.append(engine.overhead.nr_switches)
+        assert results[0] > results[1]
+
+    def test_directive(self):
+        """Test the @overhead options"""
+        model = simulation.overhead_model([("overhead", [], {"switch": "0.02", "decay": "5"})])
+        assert (model.switch_cost, model.refill, model.decay) == (0.02, 0.0, 5.0)
+        assert simulation.overhead_model([]) is None
+        with pytest.raises(ValueError):
+            simulation.overhead_model([("overhead", [], {"swich": "1"})])
+
+    def test_fast_engine_refused(self):
+        """Test that the optimized engine does not take an overhead model"""
+        tasks = utils.build_tasks([["A", 0, 0, [("CPU", 1)]]])
+        rqueue, logic = simulation.make_scheduler(tasks, [])
+        assert not fastengine.supports(tasks, rqueue, logic, [], overhead.SwitchOverhead(0.1))
+
+
+class TestCompareGranularities:
+    """Tests for the --compare-granularities option"""
+
+    def test_table(self, fpath, capsys):
+        """Test that each granularity gets a row and the best one is reported"""
+        main.main([fpath, "--no-cache", "--compare-granularities", "0.5,2"])
+        captured = capsys.readouterr()
+        assert "CONTEXT SWITCH OVERHEAD" in captured.out
+        assert "| 0.50      |" in captured.out and "| 2.00      |" in captured.out
+        assert "Meilleure granularité minimale" in captured.err
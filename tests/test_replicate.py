@@ -0,0 +1,76 @@
+"""Unit testing for Monte Carlo replication"""
+import math
+import pytest
+
+import src.replicate as replicate
+import src.utils as utils
+
+
+class TestResample:
+    """Tests for replicate.resample() function"""
+
+    def test_same_seed_same_workload(self, fpath):
+        """Test that resampling is reproducible"""
+        rows = utils.file_to_tasks(fpath)
+        assert replicate.resample(rows, 3) == replicate.resample(rows, 3)
+        assert replicate.resample(rows, 3) != replicate.resample(rows, 4)
+
+    def test_structure_is_kept(self, fpath):
+        """Test that ids, nice values and burst kinds are unchanged"""
+        rows = utils.file_to_tasks(fpath)
+        for old, new in zip(rows, replicate.resample(rows, 0, dist="uniform", jitter=1.0)):
+            assert new[0] == old[0]
+            assert new[2] == old[2]
+            assert [b[0] for b in new[3]] == [b[0] for b in old[3]]
+            assert all(b[1] >= 0.01 for b in new[3])
+            assert old[1] <= new[1] <= old[1] + 1.0
+
+    def test_none_distribution_keeps_durations(self, fpath):
+        """Test that dist=none only applies the arrival jitter"""
+        rows = utils.file_to_tasks(fpath)
+        assert [r[3] for r in replicate.resample(rows, 0, dist="none")] == [r[3] for r in rows]
+
+    def test_uniform_bounds(self):
+        """Test that uniform durations stay within the spread"""
+        rows = [["A", 0, 0, [("CPU", 10)] * 50, {}]]
+        durations = [b[1] for b in replicate.resample(rows, 1, dist="uniform", spread=0.1)[0][3]]
+        assert all(9.0 <= d <= 11.0 for d in durations)
+
+
+class TestConfidenceInterval:
+    """Tests for replicate.confidence_interval() function"""
+
+    def test_single_value(self):
+        """Test that one run gives an unbounded interval"""
+        assert replicate.confidence_interval([5.0]) == (5.0, math.inf)
+
+    def test_known_interval(self):
+        """Test the half width against the Student formula"""
+        mean, half_width = replicate.confidence_interval([1.0, 2.0, 3.0])
+        assert mean == 2.0
+        assert half_width == pytest.approx(4.303 * 1.0 / math.sqrt(3))
+
+    def test_t_quantile_tends_to_normal(self):
+        """Test that large samples use the normal quantile"""
+        assert replicate.t_quantile(1000) == 1.960
+
+
+class TestReplicate:
+    """Tests for replicate.replicate() function"""
+
+    def test_runs_in_process(self, fpath):
+        """Test that every replica returns the summary metrics"""
+        results = replicate.replicate(utils.file_to_tasks(fpath), runs=4, workers=1)
+        assert len(results) == 4
+        assert all(set(replicate.METRICS) <= set(r) for r in results)
+
+    def test_pool_matches_in_process(self, fpath):
+        """Test that results do not depend on the number of workers"""
+        rows = utils.file_to_tasks(fpath)
+        assert replicate.replicate(rows, runs=4, workers=2) == replicate.replicate(rows, runs=4, workers=1)
+
+    def test_early_stop(self, fpath):
+        """Test that a loose CI target stops before the maximum number of runs"""
+        rows = utils.file_to_tasks(fpath)
+        results = replicate.replicate(rows, runs=50, workers=1, dist="uniform", spread=0.01, ci_target=0.5)
+        assert len(results) == 5
@@ -162,3 +162,241 @@ class TestRunqueueIntegration:
         
         if min_result:
             assert min_result[1] == pick_result
+
+
+class TestEEVDFRunqueue:
+    """Tests for runqueue.EEVDFRunqueue class"""
+
+    def test_empty_queue(self):
+        """Test that an empty queue has no task to pick"""
+        rq = runqueue.EEVDFRunqueue()
+        assert len(rq) == 0
+        assert rq.avg_vruntime() is None
+        assert rq.pick_next_task() is None
+
+    def test_add_task_sets_deadline(self):
+        """Test that the deadline is vruntime plus the weighted requested slice"""
+        rq = runqueue.EEVDFRunqueue(base_slice=0.75)
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)], requested_slice=3.0)
+
+        rq.add_task(t1)
+        rq.add_task(t2)
+
+        assert t1.deadline == pytest.approx(0.75)
+        assert t2.deadline == pytest.approx(3.0)
+        assert len(rq) == 2
+        assert rq.get_total_weight_from_queue() == 2048
+
+    def test_pick_prefers_shorter_requested_slice(self):
+        """Test that among eligible tasks the earliest deadline wins"""
+        rq = runqueue.EEVDFRunqueue()
+        batch = task.Task("Batch", 0.0, 0, [("CPU", 50)], requested_slice=6.0)
+        interactive = task.Task("Inter", 0.0, 0, [("CPU", 1)], requested_slice=0.5)
+
+        rq.add_task(batch)
+        rq.add_task(interactive)
+
+        assert rq.pick_next_task() == interactive
+        assert rq.pick_next_task() == batch
+        assert len(rq) == 0
+
+    def test_ineligible_task_is_not_picked(self):
+        """Test that a task ahead of the average vruntime waits its turn"""
+        rq = runqueue.EEVDFRunqueue()
+        ahead = task.Task("Ahead", 0.0, 0, [("CPU", 5)], requested_slice=0.1)
+        behind = task.Task("Behind", 0.0, 0, [("CPU", 5)], requested_slice=6.0)
+        rq.add_task(ahead)
+        rq.add_task(behind)
+
+        # move Ahead far in virtual time, keeping its very close deadline
+        rq._remove(ahead)
+        ahead.vruntime = 10.0
+        rq.tree.insert(ahead, (ahead.vruntime, 99), deadline=0.0)
+        rq.sum_weight += ahead.get_task_weight()
+        rq.sum_weighted_vruntime += ahead.get_task_weight() * ahead.vruntime
+
+        assert rq.pick_next_task() == behind
+
+    def test_lag_is_preserved_on_requeue(self):
+        """Test that a task keeps its lag relative to the average vruntime"""
+        rq = runqueue.EEVDFRunqueue()
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        rq.add_task(t1)
+        rq.add_task(t2)
+
+        picked = rq.pick_next_task()
+        assert picked.vlag == pytest.approx(0.0)
+
+        picked.vlag = -0.5  # it ran more than its share
+        rq.add_task(picked)
+        assert picked.vruntime == pytest.approx(0.0 + 0.5 * 2)
+
+
+class TestPlacement:
+    """Tests for the placement policies of runqueue.Runqueue"""
+
+    def test_unknown_policy(self):
+        """Test that an unknown policy is refused"""
+        with pytest.raises(ValueError):
+            runqueue.Runqueue(placement="fair")
+
+    def test_default_ignores_flags(self):
+        """Test that the default policy places every task at the minimum vruntime"""
+        rq = runqueue.Runqueue()
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        t1.vruntime = 10.0
+        rq.add_task(t1)
+        rq.add_task(t2, runqueue.ENQUEUE_WAKEUP)
+        assert t2.vruntime == 10.0
+
+    def test_start_debit(self):
+        """Test that a new task starts one virtual slice after min_vruntime"""
+        rq = runqueue.Runqueue(placement="start-debit", latency=6.0)
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        rq.add_task(t1, runqueue.ENQUEUE_INITIAL)
+        rq.add_task(t2, runqueue.ENQUEUE_INITIAL)
+
+        assert t1.vruntime == 6.0
+        assert t2.vruntime == 3.0   #half the latency with one queued task of the same weight
+        assert rq.pick_next_task() is t2
+        assert rq.min_vruntime == 3.0
+
+    def test_gentle_sleeper_credit(self):
+        """Test that a waking task gets at most half the latency of credit"""
+        rq = runqueue.Runqueue(placement="sleeper", latency=6.0)
+        rq.min_vruntime = 10.0
+        long_sleeper = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        short_sleeper = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        new_task = task.Task("Task3", 0.0, 0, [("CPU", 5)])
+        long_sleeper.vruntime = 2.0
+        short_sleeper.vruntime = 9.0
+
+        rq.add_task(long_sleeper, runqueue.ENQUEUE_WAKEUP)
+        rq.add_task(short_sleeper, runqueue.ENQUEUE_WAKEUP)
+        rq.add_task(new_task, runqueue.ENQUEUE_INITIAL)
+        assert (long_sleeper.vruntime, short_sleeper.vruntime, new_task.vruntime) == (7.0, 9.0, 10.0)
+
+    def test_lag_is_preserved(self):
+        """Test that a task wakes at the distance from min_vruntime it had when it slept"""
+        rq = runqueue.Runqueue(placement="lag")
+        rq.min_vruntime = 10.0
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5), ("IO", 5), ("CPU", 5)])
+        t1.vruntime = 12.0
+        rq.put_to_sleep(t1)
+
+        rq.min_vruntime = 20.0
+        rq.add_task(t1, runqueue.ENQUEUE_WAKEUP)
+        assert t1.vruntime == 22.0
+
+    def test_requeue_keeps_vruntime(self):
+        """Test that a preempted task is put back without placement"""
+        rq = runqueue.Runqueue(placement="kernel")
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        t1.vruntime = 10.0
+        rq.add_task(t1)
+        rq.add_task(t2)
+        assert t2.vruntime == 0.0
+
+
+class TestReweight:
+    """Tests for the reweight_task() methods of the runqueues"""
+
+    def test_cfs_task_stays_in_place(self):
+        """Test that a renice keeps the vruntime order and the queue weight follows"""
+        rq = runqueue.Runqueue()
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        t1.vruntime, t2.vruntime = 1.0, 2.0
+        rq.tasks = [t1, t2]
+
+        rq.reweight_task(t2, -20)
+        assert rq.get_total_weight_from_queue() == 1024 + 88761
+        assert rq.pick_next_task() is t1
+
+    def test_eevdf_keeps_average_vruntime(self):
+        """Test that a queued task moves around V and V does not change"""
+        rq = runqueue.EEVDFRunqueue(base_slice=1.0)
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t2 = task.Task("Task2", 0.0, 0, [("CPU", 5)])
+        rq.add_task(t1)
+        t2.vlag = 1.0
+        rq.add_task(t2)
+        avg = rq.avg_vruntime()
+        lag = avg - t2.vruntime
+
+        rq.reweight_task(t2, -5)
+        ratio = 1024 / task.PRIO_TO_WEIGHT[15]
+        assert rq.avg_vruntime() == pytest.approx(avg)
+        assert avg - t2.vruntime == pytest.approx(lag * ratio)
+        assert rq.sum_weight == 1024 + task.PRIO_TO_WEIGHT[15]
+        assert rq.tasks[0] is t2
+
+    def test_eevdf_sleeping_task(self):
+        """Test that the lag of a task out of the tree is scaled"""
+        rq = runqueue.EEVDFRunqueue()
+        t1 = task.Task("Task1", 0.0, 0, [("CPU", 5)])
+        t1.vlag = 2.0
+        rq.reweight_task(t1, 19)
+        assert t1.vlag == pytest.approx(2.0 * 1024 / 15)
+        assert len(rq) == 0
+
+
+class TestAddTasks:
+    """Tests for runqueue.Runqueue.add_tasks() method"""
+
+    def make_tasks(self, vruntimes, nices=None):
+        tasks = [task.Task(f"T{i}", 0.0, (nices or [0] * len(vruntimes))[i], [("CPU", 5)]) for i in range(len(vruntimes))]
+        for t, vruntime in zip(tasks, vruntimes):
+            t.vruntime = vruntime
+        return tasks
+
+    @pytest.mark.parametrize("placement", list(runqueue.PLACEMENTS))
+    @pytest.mark.parametrize("flags", [0, runqueue.ENQUEUE_INITIAL, runqueue.ENQUEUE_WAKEUP])
+    @pytest.mark.parametrize("queued", [[], [4.0, 2.5]])
+    def test_same_as_add_task(self, placement, flags, queued):
+        """Test that a batch is placed like the same tasks added one by one"""
+        vruntimes = [3.0, 1.0, 7.0, 2.0]
+        nices = [0, 5, -3, 0]
+        results = []
+        for batch in (False, True):
+            rq = runqueue.Runqueue(placement=placement)
+            rq.min_vruntime = 2.0
+            for t in self.make_tasks(queued):
+                rq.add_task(t)
+            tasks = self.make_tasks(vruntimes, nices)
+            for t in tasks:
+                t.vlag = 0.5
+            if batch:
+                rq.add_tasks(tasks, flags)
+            else:
+                for t in tasks:
+                    rq.add_task(t, flags)
+            results.append([(t.id, t.vruntime) for t in rq.tasks])
+        assert results[1] == results[0]
+
+    def test_empty_queue_floor(self):
+        """Test that on an empty queue the first task of the batch is the minimum of the others"""
+        rq = runqueue.Runqueue()
+        tasks = self.make_tasks([3.0, 1.0, 7.0])
+        rq.add_tasks(tasks)
+        assert [t.vruntime for t in tasks] == [3.0, 3.0, 7.0]
+        assert len(rq) == 3
+
+    def test_empty_batch(self):
+        """Test that adding no task changes nothing"""
+        rq = runqueue.Runqueue()
+        rq.add_tasks([])
+        assert len(rq) == 0
+
+    def test_eevdf(self):
+        """Test that the EEVDF runqueue adds the batch in order"""
+        rq = runqueue.EEVDFRunqueue()
+        tasks = self.make_tasks([0.0, 0.0, 0.0])
+        rq.add_tasks(tasks, runqueue.ENQUEUE_INITIAL)
+        assert len(rq) == 3
+        assert rq.get_total_weight_from_queue() == 3 * 1024
@@ -0,0 +1,143 @@
+"""Unit testing for the kernel trace importer"""
+import os
+import pytest
+import tracemalloc
+
+import src.cfsengine as cfsengine
+import src.logger as logger
+import src.metrics as metrics
+import src.schedtrace as schedtrace
+import src.simulation as simulation
+
+EXPECTED = [
+    ["worker-101", 0.0, 0, [("CPU", 3.5), ("IO", 4.0), ("CPU", 1.0)], {}],
+    ["db-202", 2.0, -5, [("CPU", 1.5), ("IO", 7.5), ("CPU", 1.0)], {}],
+]
+
+
+def trace_path(fpath, name):
+    return os.path.join(os.path.dirname(fpath), name)
+
+
+def switch(t, prev_comm, prev_pid, prev_state, next_comm, next_pid):
+    return (f"  x-1 [000] d..2 {t:.6f}: sched_switch: prev_comm={prev_comm} prev_pid={prev_pid} prev_prio=120 "
+            f"prev_state={prev_state} ==> next_comm={next_comm} next_pid={next_pid} next_prio=120\n")
+
+
+def wakeup(t, comm, pid):
+    return f"  x-1 [000] d..2 {t:.6f}: sched_wakeup: comm={comm} pid={pid} prio=120 target_cpu=000\n"
+
+
+class TestReadTrace:
+    """Tests for schedtrace.read_trace() function"""
+
+    @pytest.mark.parametrize("name", ["ftrace.txt", "perf_sched.txt"])
+    def test_bursts_are_rebuilt(self, fpath, name):
+        """Test CPU bursts across preemptions, blocked time as I/O, nice from prio"""
+        with open(trace_path(fpath, name)) as f:
+            assert list(schedtrace.read_trace(f)) == EXPECTED
+
+    def test_prio_to_nice(self):
+        """Test the nice values of CFS and real-time priorities"""
+        assert schedtrace.prio_to_nice(120) == 0
+        assert schedtrace.prio_to_nice(139) == 19
+        assert schedtrace.prio_to_nice(49) == -20
+
+    def test_task_alive_at_the_end(self):
+        """Test that a running task is closed at the last timestamp, a task that never ran is dropped"""
+        lines = [wakeup(1.0, "a", 5), switch(1.0, "swapper/0", 0, "R", "a", 5),
+                 switch(1.002, "a", 5, "S", "swapper/0", 0), wakeup(1.003, "a", 5),
+                 switch(1.004, "swapper/0", 0, "R", "a", 5), wakeup(1.006, "b", 6)]
+        rows = list(schedtrace.read_trace(lines))
+        assert rows[0] == ["a-5", 0.0, 0, [("CPU", 2.0), ("IO", 1.0), ("CPU", 2.0)], {}]
+        assert len(rows) == 1
+
+    def test_max_bursts_cuts_segments(self):
+        """Test that a task is cut after max_bursts bursts, the next segment arriving on wakeup"""
+        lines = []
+        for i in range(4):
+            t = 1.0 + i * 0.01
+            lines += [wakeup(t, "a", 5), switch(t, "swapper/0", 0, "R", "a", 5), switch(t + 0.001, "a", 5, "S", "swapper/0", 0)]
+        rows = list(schedtrace.read_trace(lines, max_bursts=3))
+
+        assert [r[0] for r in rows] == ["a-5", "a-5.1"]
+        assert rows[0][3] == [("CPU", 1.0), ("IO", 9.0), ("CPU", 1.0)]
+        assert rows[1][1] == 20.0
+
+    def test_bounded_memory(self):
+        """Test that a task sleeping for long does not hold every later task back"""
+        importer = schedtrace.TraceImporter(max_span=50.0)
+        importer.feed(wakeup(0.0, "daemon", 2))
+        importer.feed(switch(0.0, "swapper/0", 0, "R", "daemon", 2))
+        importer.feed(switch(0.001, "daemon", 2, "S", "swapper/0", 0))
+
+        held = 0
+        released = []
+        for i in range(1, 2000):
+            t = i * 0.001
+            for line in (wakeup(t, "job", 1000 + i), switch(t, "swapper/0", 0, "R", "job", 1000 + i),
+                         switch(t + 0.0005, "job", 1000 + i, "X", "swapper/0", 0)):
+                released += importer.feed(line)
+            held = max(held, len(importer.finished))
+        released += importer.finish()
+
+        assert held <= 60
+        assert len(released) == 2000
+        arrivals = [r[1] for r in released]
+        assert arrivals == sorted(arrivals)
+
+
+class TestRunStream:
+    """Tests for simulation.run_stream() function"""
+
+    def test_same_as_batch(self, fpath):
+        """Test that streaming the imported tasks gives the batch schedule"""
+        with open(trace_path(fpath, "ftrace.txt")) as f:
+            engine = cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False))
+            tasks = simulation.run_stream(engine, schedtrace.read_trace(f))
+        batch, _ = simulation.simulate([row[:3] + [list(row[3])] + row[4:] for row in EXPECTED])
+
+        assert [(t.id, t.end_time) for t in tasks] == [(t.id, t.end_time) for t in batch]
+
+    def test_running_summary(self, fpath):
+        """Test that with a running summary the finished tasks are folded in and dropped"""
+        with open(trace_path(fpath, "ftrace.txt")) as f:
+            engine = cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False))
+            running = metrics.RunningSummary()
+            assert simulation.run_stream(engine, schedtrace.read_trace(f), running) == []
+        batch, _ = simulation.simulate([row[:3] + [list(row[3])] + row[4:] for row in EXPECTED])
+
+        assert running.nr_tasks == 2
+        assert running.summary()["avg_turnaround"] == pytest.approx(metrics.summarize(batch)["avg_turnaround"])
+
+    def test_running_summary_overlapping_tasks(self):
+        """Test that tasks still running at a sweep are not folded in: the summary is the batch one"""
+        rows = [[f"T{i}", i * 0.5, i % 5, [("CPU", 1.0 + i % 3), ("IO", 2.0), ("CPU", 1.0)], {}] for i in range(300)]
+        running = metrics.RunningSummary(reservoir=1000)
+        simulation.run_stream(cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False)), iter(rows), running)
+        batch, _ = simulation.simulate(rows)
+
+        assert running.nr_tasks == 300
+        expected = metrics.summarize(batch)
+        summary = running.summary()
+        assert {k: summary[k] for k in expected} == pytest.approx(expected)
+
+    def retained(self, nr_tasks):
+        """Memory peak of a streamed run of nr_tasks short overlapping tasks, and what is left after it"""
+        rows = ([f"T{i}", i * 1.5, i % 5, [("CPU", 1.0), ("IO", 2.0), ("CPU", 1.0)], {}] for i in range(nr_tasks))
+        sim_logger = logger.CFSLogger(verbose=False, keep=False)
+        running = metrics.RunningSummary(max_rows=5, reservoir=100)
+        tracemalloc.start()
+        try:
+            simulation.run_stream(cfsengine.CFSEngine(logger=sim_logger), rows, running)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peak, len(sim_logger.gantt_data) + len(sim_logger.history), len(running.top) + len(running.sample)
+
+    def test_memory_flat(self):
+        """Test that the memory of a streamed run does not grow with the number of tasks"""
+        small = self.retained(500)
+        large = self.retained(5000)
+        assert small[1:] == large[1:] == (0, 105)
+        assert large[0] < 1.5 * small[0]
@@ -0,0 +1,79 @@
+"""Unit testing for the local simulation service"""
+import threading
+import pytest
+
+import src.metrics as metrics
+import src.service as service
+import src.simulation as simulation
+import src.utils as utils
+
+
+@pytest.fixture
+def pool():
+    pool = service.SimulationPool(workers=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestRunJob:
+    """Tests for service.run_job() function"""
+
+    def test_same_metrics_as_simulate(self, fpath):
+        """Test that a job gives the metrics of a direct simulation"""
+        with open(fpath) as f:
+            result = service.run_job({"workload": f.read(), "tasks": True})
+        tasks, _ = simulation.simulate(utils.file_to_tasks(fpath))
+
+        assert result["summary"] == metrics.summarize(tasks)
+        assert [r["id"] for r in result["tasks"]] == [t.id for t in tasks]
+        assert result == service.run_job({"path": fpath, "tasks": True})
+
+    def test_calculator_parameters(self):
+        """Test that L changes the time slices of the job"""
+        job = {"workload": "A 0 0 10\nB 0 0 10\n"}
+        default = service.run_job(job)["summary"]
+        longer = service.run_job(job | {"params": {"L": 20.0}})["summary"]
+        assert longer["avg_response"] > default["avg_response"]
+
+    @pytest.mark.parametrize("job", [
+        {"workload": "A x 0 1"},
+        {"path": "/nonexistent"},
+        {"workload": "A 0 0 1", "params": {"latency": 2}},
+        {"workload": "A 0 0 1", "params": {"L": -1}},
+        {},
+    ])
+    def test_errors_are_reported(self, job):
+        """Test that a bad job returns an error instead of raising"""
+        assert "error" in service.run_job(job)
+
+
+class TestService:
+    """Tests for the HTTP service"""
+
+    def test_batch_over_unix_socket(self, pool, tmp_path, fpath):
+        """Test a batch submission, results in job order"""
+        path = str(tmp_path / "scfs.sock")
+        server = service.make_server(pool, socket_path=path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            jobs = [{"path": fpath}, {"workload": "A 0 0 3\n"}, {"workload": "bad"}]
+            results = service.submit(jobs, socket_path=path)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert results[0] == service.run_job(jobs[0])
+        assert results[1]["summary"]["avg_turnaround"] == 3.0
+        assert "error" in results[2]
+
+    def test_single_job_over_tcp(self, pool):
+        """Test a job sent to localhost"""
+        server = service.make_server(pool, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            results = service.submit([{"workload": "A 1 0 2\n"}], port=server.server_address[1])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert results[0]["summary"]["avg_turnaround"] == 2.0
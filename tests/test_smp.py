@@ -0,0 +1,89 @@
+"""Unit testing for the multi-CPU model and its parallel simulation"""
+import random
+
+import pytest
+
+import src.logger as logger
+import src.main as main
+import src.simulation as simulation
+import src.smp as smp
+import src.utils as utils
+
+
+def random_rows(nr_tasks, nr_cpus, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(nr_tasks):
+        bursts = [("CPU" if k % 2 == 0 else "IO", round(rng.uniform(0.5, 6), 2)) for k in range(7)]
+        cpus = ",".join(str(rng.randrange(nr_cpus)) for _ in range(2))
+        rows.append([f"T{i}", round(rng.uniform(0, 30), 2), rng.randrange(-5, 6), bursts, {"cpus": cpus}])
+    return rows
+
+
+class TestAffinity:
+    """Tests for smp.affinity() and smp.lookahead()"""
+
+    def test_cpus(self):
+        """Test the cpus= option and the default CPU of each task"""
+        rows = [["A", 0, 0, [("CPU", 1)], {"cpus": "1,0"}], ["B", 0, 0, [("CPU", 1)]], ["C", 0, 0, [("CPU", 1)]]]
+        assert smp.affinity(rows, 2) == {"A": [1, 0], "B": [1], "C": [0]}
+        with pytest.raises(ValueError):
+            smp.affinity([["A", 0, 0, [("CPU", 1)], {"cpus": "2"}]], 2)
+
+    def test_lookahead(self):
+        """Test that only I/O bursts moving a task to another CPU bound the windows"""
+        rows = [["A", 0, 0, [("CPU", 1), ("IO", 1), ("CPU", 1), ("IO", 3), ("CPU", 1)], {"cpus": "0,0,1"}],
+                ["B", 0, 0, [("CPU", 1), ("IO", 0.5), ("CPU", 1)], {"cpus": "1"}]]
+        tasks, cpus_of, _ = smp.build(rows, 2)
+        assert smp.lookahead(tasks, cpus_of) == 3
+        assert smp.lookahead(tasks[1:], cpus_of) == float("inf")
+
+
+class TestRun:
+    """Tests for smp.run_sequential() and smp.run_parallel()"""
+
+    def test_one_cpu_is_cfsengine(self, fpath):
+        """Test that the model with one CPU gives the events of CFSEngine"""
+        rows = utils.file_to_tasks(fpath)
+        reference = logger.CFSLogger()
+        reference._write = lambda message: None
+        simulation.simulate(rows, sim_logger=reference)
+        result = smp.run_sequential(rows, 1)
+        assert result.events == [reference.history]
+        assert result.gantt == [reference.gantt_data]
+
+    def test_migration(self):
+        """Test that a task runs its next CPU burst on the CPU of its affinity"""
+        rows = [["A", 0, 0, [("CPU", 2), ("IO", 1), ("CPU", 2)], {"cpus": "0,1"}], ["B", 0, 0, [("CPU", 10)], {"cpus": "0"}]]
+        result = smp.run_sequential(rows, 2)
+        assert [g[0] for g in result.gantt[1]] == ["A"]
+        assert result.tasks[0].end_time == pytest.approx(result.gantt[1][0][2])
+        assert sorted(t.id for _, owned, _, _, _ in result.cpus for t in owned) == ["A", "B"]
+
+    def test_parallel_is_sequential(self):
+        """Test that the windowed run in worker processes gives the sequential results"""
+        rows = random_rows(40, 4)
+        reference = smp.run_sequential(rows, 4)
+        result = smp.run_parallel(rows, 4, workers=2)
+        assert smp.differences(reference, result) == []
+        assert result.nr_windows > 1
+        assert [t.end_time for t in result.tasks] == [t.end_time for t in reference.tasks]
+
+    def test_zero_lookahead(self):
+        """Test that a migration after an empty I/O cannot be run in parallel"""
+        rows = [["A", 0, 0, [("CPU", 1), ("IO", 0), ("CPU", 1)], {"cpus": "0,1"}]]
+        with pytest.raises(ValueError):
+            smp.run_parallel(rows, 2, workers=2)
+
+
+class TestSmpCommand:
+    """Tests for the scfs smp subcommand"""
+
+    def test_verify(self, tmp_path, capsys):
+        """Test that the parallel run is checked against the sequential one"""
+        path = tmp_path / "tasks.txt"
+        path.write_text("A 0 0 3 2 3 cpus=0,1\nB 1 0 4 1 4 cpus=1,0\nC 2 0 6\n")
+        main.main(["smp", str(path), "--cpus", "2", "--workers", "2", "--verify"])
+        output = capsys.readouterr().out
+        assert "Identique au déroulement séquentiel" in output
+        assert "CPUS" in output
@@ -0,0 +1,83 @@
+"""Unit testing for the multi-file suite mode"""
+import csv
+import json
+import shutil
+
+import pytest
+
+import src.main as main
+import src.suite as suite
+
+
+@pytest.fixture
+def scenarios(fpath, tmp_path):
+    """Three copies of td1.txt, one of them in a subdirectory"""
+    (tmp_path / "sub").mkdir()
+    for name in ("a.txt", "b.txt", "sub/a.txt"):
+        shutil.copy(fpath, tmp_path / name)
+    return tmp_path
+
+
+class TestExpand:
+    """Tests for suite.expand() and suite.log_names()"""
+
+    def test_globs(self, scenarios):
+        """Test that patterns are expanded in order, recursively and without duplicates"""
+        paths = suite.expand([str(scenarios / "**" / "*.txt"), str(scenarios / "a.txt")])
+        assert paths == [str(scenarios / "a.txt"), str(scenarios / "b.txt"), str(scenarios / "sub" / "a.txt")]
+
+    def test_no_match(self, tmp_path):
+        """Test that a pattern matching nothing is refused"""
+        with pytest.raises(ValueError):
+            suite.expand([str(tmp_path / "*.txt")])
+
+    def test_log_names(self):
+        """Test that files with the same name get distinct logs"""
+        assert suite.log_names(["x/a.txt", "y/a.txt", "b"]) == ["a.log", "a-2.log", "b.log"]
+
+
+class TestRunSuite:
+    """Tests for suite.run_suite()"""
+
+    def test_pool_gives_same_results(self, scenarios):
+        """Test that the process pool gives the results of in-process runs, in file order"""
+        paths = suite.expand([str(scenarios / "**" / "*.txt")])
+        assert suite.run_suite(paths, workers=2) == suite.run_suite(paths, workers=1)
+
+    def test_isolated_logs(self, scenarios, tmp_path):
+        """Test that each run writes its own log"""
+        paths = [str(scenarios / "a.txt"), str(scenarios / "sub" / "a.txt")]
+        suite.run_suite(paths, workers=1, log_dir=str(tmp_path / "logs"))
+        logs = [(tmp_path / "logs" / name).read_text() for name in ("a.log", "a-2.log")]
+        assert logs[0] == logs[1]
+        assert logs[0].count("CFS start") == 1 and "GANTT CHART" in logs[0]
+
+    def test_error_is_reported(self, tmp_path):
+        """Test that an invalid file gives an error result instead of stopping the suite"""
+        path = tmp_path / "bad.txt"
+        path.write_text("A x\n")
+        results = suite.run_suite([str(path), str(tmp_path / "missing.txt")], workers=1)
+        assert all(r["error"] is not None for r in results)
+
+
+class TestSuiteCommand:
+    """Tests for the scfs suite subcommand"""
+
+    def test_results_file(self, scenarios, capsys):
+        """Test the consolidated table and the JSON and CSV results"""
+        for name in ("results.json", "results.csv"):
+            main.main(["suite", str(scenarios / "*.txt"), "--workers", "1", "--results", str(scenarios / name)])
+        assert "SIMULATION SUITE" in capsys.readouterr().out
+
+        results = json.loads((scenarios / "results.json").read_text())
+        assert [r["nr_tasks"] for r in results] == [4, 4]
+        with open(scenarios / "results.csv") as f:
+            rows = list(csv.DictReader(f))
+        assert float(rows[0]["avg_turnaround"]) == pytest.approx(results[0]["avg_turnaround"])
+
+    def test_failure_exit_code(self, tmp_path, capsys):
+        """Test that the command fails when a run fails"""
+        (tmp_path / "bad.txt").write_text("A x\n")
+        with pytest.raises(SystemExit) as err:
+            main.main(["suite", str(tmp_path / "bad.txt"), "--workers", "1"])
+        assert err.value.code == 1
@@ -40,6 +40,17 @@ class TestTaskInitialization:
         assert t3.nice == 19
 
 
+class TestTaskWeight:
+    """Tests for the cached weight of task.Task"""
+
+    def test_weight_follows_nice(self):
+        """Test that setting the nice value updates the weight"""
+        t = task.Task("Task1", 0.0, 0, [("CPU", 1)])
+        assert t.get_task_weight() == 1024
+        t.nice = -5
+        assert t.get_task_weight() == task.PRIO_TO_WEIGHT[15]
+
+
 class TestTaskIsFinished:
     """Tests for task.Task.is_finished() method"""
     
@@ -0,0 +1,90 @@
+"""Unit testing for the scheduler state sampler"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import src.cfsengine as cfsengine
+import src.logger as logger
+import src.main as main
+import src.simulation as simulation
+import src.timeseries as timeseries
+import src.utils as utils
+
+
+def sample(raw_tasks_data, interval, directives=[]):
+    """Run a workload with a sampler, return (tasks, sampler)."""
+    tasks = utils.build_tasks(raw_tasks_data)
+    rqueue, logic = simulation.make_scheduler(tasks, directives)
+    engine = cfsengine.CFSEngine(logger=logger.CFSLogger(verbose=False), tasks=tasks, rqueue=rqueue, logic=logic)
+    sampler = timeseries.Sampler(interval, capacity=2)
+    timeseries.run(engine, sampler)
+    return tasks, sampler
+
+
+class TestSampler:
+    """Tests for timeseries.Sampler class and timeseries.run() function"""
+
+    def test_schedule_is_unchanged(self, fpath):
+        """Test that sampling does not change the simulation, and covers it up to the end"""
+        rows = utils.file_to_tasks(fpath)
+        tasks, sampler = sample(rows, 0.5)
+        reference, _ = simulation.simulate(rows)
+
+        assert [t.end_time for t in tasks] == [t.end_time for t in reference]
+        columns = sampler.columns()
+        assert np.array_equal(columns["time"], np.arange(73) * 0.5)
+        assert columns["cpu_busy"][-1] == 0 and columns["cpu_busy"][:-1].all()
+
+    def test_state_after_events_at_sample_time(self):
+        """Test the sampled values against a hand-computed schedule"""
+        rows = [["A", 0, 0, [("CPU", 2), ("IO", 3), ("CPU", 1)], {}], ["B", 0, 5, [("CPU", 4)], {}]]
+        _, sampler = sample(rows, 1.0)
+        columns = sampler.columns()
+
+        #A runs [0, 2] with B queued, B runs [2, 6] while A is in I/O, A is queued at 5 and runs at 6
+        assert list(columns["nr_running"][:7]) == [1, 1, 0, 0, 0, 1, 0]
+        assert list(columns["io_depth"][:7]) == [0, 0, 1, 1, 1, 0, 0]
+        assert columns["queued_weight"][0] == 335
+
+    def test_intervals_agree(self, fpath):
+        """Test that a fine interval gives the same values at the coarse sample times"""
+        rows = utils.file_to_tasks(fpath)
+        coarse = sample(rows, 1.0)[1].columns()
+        fine = sample(rows, 0.25)[1].columns()
+        for name in timeseries.FIELDS:
+            assert np.array_equal(fine[name][::4], coarse[name])
+
+    def test_throttled_group(self):
+        """Test the throttled count of a group out of quota"""
+        rows = [["A", 0, 0, [("CPU", 30)], {"group": "/g"}], ["B", 0, 0, [("CPU", 30)], {"group": "/g"}]]
+        _, sampler = sample(rows, 5.0, [("group", ["/g"], {"quota": "10", "period": "50"})])
+        assert sampler.columns()["nr_throttled"].max() == 1
+
+    def test_invalid_interval(self):
+        """Test that the interval must be positive"""
+        with pytest.raises(ValueError):
+            timeseries.Sampler(0)
+
+    def test_exports(self, fpath, tmp_path):
+        """Test the CSV header and the NumPy columns"""
+        _, sampler = sample(utils.file_to_tasks(fpath), 1.0)
+        sampler.save(str(tmp_path / "s.csv"))
+        sampler.save(str(tmp_path / "s.npz"))
+
+        lines = (tmp_path / "s.csv").read_text().splitlines()
+        assert lines[0] == ",".join(timeseries.FIELDS)
+        assert len(lines) == sampler.size + 1
+        data = np.load(tmp_path / "s.npz")
+        assert np.array_equal(data["queued_weight"], sampler.columns()["queued_weight"])
+
+
+class TestMainSamples:
+    """Tests for --samples in the scfs CLI"""
+
+    def test_same_output(self, fpath, tmp_path, capsys):
+        """Test that the simulation output does not change with sampling"""
+        main.main([fpath, "--no-cache"])
+        expected = capsys.readouterr().out
+        main.main([fpath, "--no-cache", "--samples", str(tmp_path / "s.csv")])
+        assert capsys.readouterr().out == expected
+        assert (tmp_path / "s.csv").exists()
@@ -75,3 +75,68 @@ class TestFileToTasks:
                     assert burst[0] == "CPU"
                 else:
                     assert burst[0] == "IO"
+
+
+class TestTaskOptions:
+    """Tests for key=value options in task files"""
+
+    def test_split_options(self):
+        """Test that options are separated from positional fields"""
+        fields, options = utils.split_options(["A", "0", "slice=0.5", "0", "3"])
+        assert fields == ["A", "0", "0", "3"]
+        assert options == {"slice": "0.5"}
+
+    def test_file_without_options_has_empty_dict(self, fpath):
+        """Test that formatted tasks always carry an options dict"""
+        tasks = utils.file_to_tasks(fpath)
+        assert all(t[4] == {} for t in tasks)
+
+    def test_file_with_options(self, tmp_path):
+        """Test reading the requested slice of a task"""
+        workload = tmp_path / "w.txt"
+        workload.write_text("A 0 0 1 8 1 slice=0.5\n\nB 2 -4 6\n")
+
+        rows = utils.file_to_tasks(str(workload))
+        tasks = utils.build_tasks(rows)
+
+        assert len(tasks) == 2
+        assert tasks[0].bursts == [("CPU", 1), ("IO", 8), ("CPU", 1)]
+        assert tasks[0].slice == 0.5
+        assert tasks[1].slice is None
+        assert tasks[1].arrival_time == 2.0
+
+
+class TestReadWorkload:
+    """Tests for utils.read_workload() function"""
+
+    def test_directives_are_separated(self, tmp_path):
+        """Test that @directives are not read as tasks"""
+        workload = tmp_path / "w.txt"
+        workload.write_text("@group /web weight=200\nA 0 0 5 group=/web\n")
+
+        rows, directives = utils.read_workload(str(workload))
+        tasks = utils.build_tasks(rows)
+
+        assert directives == [("group", ["/web"], {"weight": "200"})]
+        assert len(tasks) == 1
+        assert tasks[0].group == "/web"
+
+
+class TestFormatLine:
+    """Tests for utils.format_line() and decimal times"""
+
+    def test_decimal_times(self):
+        """Test that times with a decimal part are read as floats"""
+        kind, data = utils.parse_line("A 0.5 -2 1.25 3 2\n")
+        assert kind == "task"
+        assert data == ["A", 0.5, -2, [("CPU", 1.25), ("IO", 3), ("CPU", 2)], {}]
+
+    def test_round_trip(self):
+        """Test that a written line is read back unchanged"""
+        data = ["B", 12.5, 3, [("CPU", 0.001), ("IO", 40.0), ("CPU", 7)], {"slice": "0.5"}]
+        assert utils.parse_line(utils.format_line(data)) == ("task", data)
+
+    def test_short_line_is_rejected(self):
+        """Test that a task line without a CPU burst raises ValueError"""
+        with pytest.raises(ValueError):
+            utils.parse_line("A 0 0")